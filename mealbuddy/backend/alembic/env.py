@@ -5,21 +5,18 @@ from logging.config import fileConfig
 from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 from sqlalchemy.engine import Connection
-from sqlalchemy.ext.asyncio import create_async_engine
 
 from alembic import context
 
 # Import your models and Base metadata
 import sys
-import os
 from pathlib import Path
 
 # Add the backend directory to Python path
 sys.path.append(str(Path(__file__).resolve().parents[3]))
 
 # Import your models and Base metadata
-from app.db.base import Base
-from app.core.config import settings
+from app.db.base import Base, create_engine
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -80,11 +77,8 @@ async def run_migrations_online() -> None:
     In this scenario we need to create an Engine
     and associate a connection with the context.
     """
-    # Convert PostgresDsn to string if needed
-    database_url = str(settings.DATABASE_URL)
-    # Ensure we're using the asyncpg driver
-    database_url = database_url.replace("postgresql://", "postgresql+asyncpg://")
-    connectable = create_async_engine(database_url)
+    # One connection for the whole run; no need to keep a pool
+    connectable = create_engine(poolclass=pool.NullPool)
     
     async with connectable.connect() as connection:
         await connection.run_sync(do_run_migrations)
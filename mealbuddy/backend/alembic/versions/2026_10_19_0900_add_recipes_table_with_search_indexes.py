@@ -0,0 +1,75 @@
+"""Add recipes table with trigram and full-text search indexes
+
+Revision ID: 2026_10_19_0900
+Revises: 2025_07_01_0206
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_19_0900'
+down_revision = '2025_07_01_0206'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    op.create_table(
+        'recipes',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('title', sa.String(length=255), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('instructions', sa.Text(), nullable=True),
+        sa.Column('cuisine_type', sa.String(length=50), nullable=True),
+        sa.Column('prep_time_minutes', sa.Integer(), nullable=True),
+        sa.Column('cook_time_minutes', sa.Integer(), nullable=True),
+        sa.Column(
+            'total_time_minutes', sa.Integer(),
+            sa.Computed('coalesce(prep_time_minutes, 0) + coalesce(cook_time_minutes, 0)', persisted=True),
+        ),
+        sa.Column('serving_size', sa.Integer(), nullable=False, server_default='1'),
+        sa.Column('ingredients', postgresql.JSONB(astext_type=sa.Text()), nullable=False, server_default='[]'),
+        sa.Column('ingredient_names', sa.Text(), nullable=False, server_default=''),
+        sa.Column('allergens', postgresql.JSONB(astext_type=sa.Text()), nullable=False, server_default='[]'),
+        sa.Column('nutrition', postgresql.JSONB(astext_type=sa.Text()), nullable=True),
+        sa.Column('cost_estimate_cents', sa.Integer(), nullable=True),
+        sa.Column('image_url', sa.Text(), nullable=True),
+        sa.Column(
+            'search_vector', postgresql.TSVECTOR(),
+            sa.Computed(
+                "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+                "setweight(to_tsvector('english', coalesce(ingredient_names, '')), 'B') || "
+                "setweight(to_tsvector('english', coalesce(description, '')), 'C')",
+                persisted=True,
+            ),
+        ),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_recipes_id', 'recipes', ['id'])
+    op.create_index('ix_recipes_search_vector', 'recipes', ['search_vector'], postgresql_using='gin')
+    op.create_index(
+        'ix_recipes_title_trgm', 'recipes', ['title'],
+        postgresql_using='gin', postgresql_ops={'title': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_recipes_ingredient_names_trgm', 'recipes', ['ingredient_names'],
+        postgresql_using='gin', postgresql_ops={'ingredient_names': 'gin_trgm_ops'},
+    )
+    op.create_index('ix_recipes_cuisine_total_time', 'recipes', ['cuisine_type', 'total_time_minutes'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recipes_cuisine_total_time', table_name='recipes')
+    op.drop_index('ix_recipes_ingredient_names_trgm', table_name='recipes')
+    op.drop_index('ix_recipes_title_trgm', table_name='recipes')
+    op.drop_index('ix_recipes_search_vector', table_name='recipes')
+    op.drop_index('ix_recipes_id', table_name='recipes')
+    op.drop_table('recipes')
+    # pg_trgm is left installed; other objects may depend on it
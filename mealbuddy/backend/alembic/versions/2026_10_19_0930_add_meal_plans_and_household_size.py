@@ -0,0 +1,66 @@
+"""Add stored meal plans, plan entries and household size
+
+Revision ID: 2026_10_19_0930
+Revises: 2026_10_19_0900
+Create Date: 2026-10-19 09:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_19_0930'
+down_revision = '2026_10_19_0900'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('household_size', sa.Integer(), server_default='1', nullable=False))
+
+    op.create_table(
+        'meal_plans',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('start_date', sa.Date(), nullable=False),
+        sa.Column('plan_data', postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column('version', sa.Integer(), server_default='1', nullable=False),
+        sa.Column('generated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_meal_plans_id', 'meal_plans', ['id'])
+    op.create_index('ix_meal_plans_user_id_start_date', 'meal_plans', ['user_id', 'start_date'])
+
+    op.create_table(
+        'meal_plan_entries',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('plan_id', sa.Integer(), nullable=True),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('meal_type', sa.String(length=20), nullable=False),
+        sa.Column('recipe_id', sa.Integer(), nullable=True),
+        sa.Column('recipe_name', sa.String(), nullable=False),
+        sa.Column('servings', sa.Integer(), server_default='1', nullable=False),
+        sa.Column('is_swapped', sa.Boolean(), server_default=sa.text('false'), nullable=True),
+        sa.Column('logged_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.ForeignKeyConstraint(['plan_id'], ['meal_plans.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['recipe_id'], ['recipes.id'], ondelete='SET NULL'),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_meal_plan_entries_id', 'meal_plan_entries', ['id'])
+    op.create_index('ix_meal_plan_entries_user_id_date', 'meal_plan_entries', ['user_id', 'date'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_meal_plan_entries_user_id_date', table_name='meal_plan_entries')
+    op.drop_index('ix_meal_plan_entries_id', table_name='meal_plan_entries')
+    op.drop_table('meal_plan_entries')
+    op.drop_index('ix_meal_plans_user_id_start_date', table_name='meal_plans')
+    op.drop_index('ix_meal_plans_id', table_name='meal_plans')
+    op.drop_table('meal_plans')
+    op.drop_column('users', 'household_size')
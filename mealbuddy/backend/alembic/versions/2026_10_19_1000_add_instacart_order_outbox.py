@@ -0,0 +1,55 @@
+"""Add the Instacart order outbox
+
+Revision ID: 2026_10_19_1000
+Revises: 2026_10_19_0930
+Create Date: 2026-10-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_19_1000'
+down_revision = '2026_10_19_0930'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'instacart_orders',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('idempotency_key', sa.String(length=64), nullable=False),
+        sa.Column('status', sa.String(length=20), server_default='pending', nullable=False),
+        sa.Column('status_history', postgresql.JSONB(astext_type=sa.Text()), server_default='[]', nullable=False),
+        sa.Column('items', postgresql.JSONB(astext_type=sa.Text()), server_default='[]', nullable=False),
+        sa.Column('estimated_cost_cents', sa.Integer(), nullable=True),
+        sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('next_attempt_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('last_error', sa.String(), nullable=True),
+        sa.Column('instacart_order_id', sa.String(), nullable=True),
+        sa.Column('estimated_delivery_time', sa.String(), nullable=True),
+        sa.Column('total_cost_cents', sa.Integer(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('user_id', 'idempotency_key', name='uq_instacart_orders_user_id_idempotency_key'),
+    )
+    op.create_index('ix_instacart_orders_id', 'instacart_orders', ['id'])
+    op.create_index('ix_instacart_orders_user_id_created_at', 'instacart_orders', ['user_id', 'created_at'])
+    op.create_index(
+        'ix_instacart_orders_due',
+        'instacart_orders',
+        ['next_attempt_at'],
+        postgresql_where=sa.text("status IN ('pending', 'submitting', 'retrying')"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_instacart_orders_due', table_name='instacart_orders')
+    op.drop_index('ix_instacart_orders_user_id_created_at', table_name='instacart_orders')
+    op.drop_index('ix_instacart_orders_id', table_name='instacart_orders')
+    op.drop_table('instacart_orders')
@@ -0,0 +1,22 @@
+"""Index weight logs by user and time
+
+Revision ID: 2026_10_19_1100
+Revises: 2026_10_19_1030
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_19_1100'
+down_revision = '2026_10_19_1030'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_user_weight_log_user_id_logged_at', 'user_weight_log', ['user_id', 'logged_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_user_weight_log_user_id_logged_at', table_name='user_weight_log')
@@ -0,0 +1,52 @@
+"""Add incrementally maintained recipe rating stats
+
+Revision ID: 2026_10_19_1130
+Revises: 2026_10_19_1100
+Create Date: 2026-10-19 11:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_19_1130'
+down_revision = '2026_10_19_1100'
+branch_labels = None
+depends_on = None
+
+# Defaults of RATING_PRIOR_MEAN and RATING_PRIOR_COUNT; the reconcile job
+# recomputes with the configured values
+PRIOR_MEAN = 3.5
+PRIOR_COUNT = 5
+
+
+def upgrade() -> None:
+    op.create_table(
+        'recipe_rating_stats',
+        sa.Column('recipe_name', sa.String(), nullable=False),
+        sa.Column('rating_count', sa.Integer(), nullable=False),
+        sa.Column('rating_sum', sa.Integer(), nullable=False),
+        sa.Column('rating_sum_squares', sa.Integer(), nullable=False),
+        sa.Column('bayesian_average', sa.Float(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=True),
+        sa.PrimaryKeyConstraint('recipe_name'),
+    )
+    op.create_index(
+        'ix_recipe_rating_stats_bayesian_average',
+        'recipe_rating_stats',
+        [sa.text('bayesian_average DESC'), 'recipe_name'],
+    )
+    op.execute(
+        f"""
+        INSERT INTO recipe_rating_stats (recipe_name, rating_count, rating_sum, rating_sum_squares, bayesian_average)
+        SELECT recipe_name, count(*), sum(rating), sum(rating * rating),
+               ({PRIOR_COUNT * PRIOR_MEAN} + sum(rating)) / ({PRIOR_COUNT} + count(*))::numeric
+        FROM recipe_feedback
+        GROUP BY recipe_name
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_recipe_rating_stats_bayesian_average', table_name='recipe_rating_stats')
+    op.drop_table('recipe_rating_stats')
@@ -0,0 +1,138 @@
+"""Partition weight logs and recipe feedback by month
+
+Revision ID: 2026_10_19_1200
+Revises: 2026_10_19_1130
+Create Date: 2026-10-19 12:00:00.000000
+
+Each table is rebuilt as a range-partitioned table with one partition per
+month from its oldest row up to PARTITION_MONTHS_AHEAD months ahead, plus a
+DEFAULT partition; the rows are copied over and ids keep their sequence.
+The primary key becomes (id, partition key), as Postgres requires.
+Afterwards the partition maintenance task (app/db/partitions.py) keeps
+future months created.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '2026_10_19_1200'
+down_revision = '2026_10_19_1130'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+# Table -> (partition key, column definitions, indexes)
+TABLES = {
+    'user_weight_log': (
+        'logged_at',
+        """
+            user_id integer NOT NULL REFERENCES users (id),
+            weight_kg double precision NOT NULL,
+            logged_at timestamptz NOT NULL DEFAULT now()
+        """,
+        {'ix_user_weight_log_id': 'id', 'ix_user_weight_log_user_id_logged_at': 'user_id, logged_at'},
+    ),
+    'recipe_feedback': (
+        'created_at',
+        """
+            user_id integer NOT NULL REFERENCES users (id),
+            recipe_name varchar NOT NULL,
+            rating integer NOT NULL,
+            comment varchar,
+            created_at timestamptz NOT NULL DEFAULT now(),
+            updated_at timestamptz
+        """,
+        {'ix_recipe_feedback_id': 'id', 'ix_recipe_feedback_user_id_created_at': 'user_id, created_at'},
+    ),
+}
+
+
+def _columns(table: str) -> list:
+    return [column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)]
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    for table, (key, columns, indexes) in TABLES.items():
+        exists = sa.inspect(bind).has_table(table)
+        if exists:
+            op.execute(f'ALTER TABLE {table} RENAME TO {table}_unpartitioned')
+            op.execute(f'ALTER INDEX IF EXISTS {table}_pkey RENAME TO {table}_unpartitioned_pkey')
+            for index in indexes:
+                op.execute(f'DROP INDEX IF EXISTS {index}')
+        else:
+            op.execute(f'CREATE SEQUENCE {table}_id_seq')
+
+        op.execute(
+            f"""
+            CREATE TABLE {table} (
+                id integer NOT NULL DEFAULT nextval('{table}_id_seq'),
+                {columns.strip()},
+                CONSTRAINT {table}_pkey PRIMARY KEY (id, {key})
+            ) PARTITION BY RANGE ({key})
+            """
+        )
+        op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+        # One partition per UTC month from the oldest row (or this month) to MONTHS_AHEAD ahead
+        first = f"(SELECT min({key}) FROM {table}_unpartitioned)" if exists else 'NULL'
+        op.execute(
+            f"""
+            DO $$
+            DECLARE
+                month date;
+            BEGIN
+                FOR month IN
+                    SELECT generate_series(
+                        date_trunc('month', least(coalesce({first}, now()), now()) AT TIME ZONE 'UTC'),
+                        date_trunc('month', now() AT TIME ZONE 'UTC') + interval '{MONTHS_AHEAD} months',
+                        interval '1 month'
+                    )::date
+                LOOP
+                    EXECUTE format(
+                        'CREATE TABLE %I PARTITION OF {table} FOR VALUES FROM (%L) TO (%L)',
+                        '{table}_p' || to_char(month, 'YYYY_MM'),
+                        month::timestamp AT TIME ZONE 'UTC',
+                        (month + interval '1 month') AT TIME ZONE 'UTC'
+                    );
+                END LOOP;
+            END
+            $$
+            """
+        )
+        for index, index_columns in indexes.items():
+            op.execute(f'CREATE INDEX {index} ON {table} ({index_columns})')
+
+        if exists:
+            names = _columns(f'{table}_unpartitioned')
+            # The partition key becomes NOT NULL
+            values = [f'coalesce({name}, now())' if name == key else name for name in names]
+            op.execute(
+                f"INSERT INTO {table} ({', '.join(names)}) "
+                f"SELECT {', '.join(values)} FROM {table}_unpartitioned"
+            )
+            op.execute(f'DROP TABLE {table}_unpartitioned')
+
+
+def downgrade() -> None:
+    for table, (key, columns, indexes) in TABLES.items():
+        op.execute(f'ALTER TABLE {table} RENAME TO {table}_partitioned')
+        op.execute(f'ALTER INDEX {table}_pkey RENAME TO {table}_partitioned_pkey')
+        for index in indexes:
+            op.execute(f'DROP INDEX IF EXISTS {index}')
+        op.execute(
+            f"""
+            CREATE TABLE {table} (
+                id integer NOT NULL DEFAULT nextval('{table}_id_seq'),
+                {columns.strip()},
+                CONSTRAINT {table}_pkey PRIMARY KEY (id)
+            )
+            """
+        )
+        op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+        for index, index_columns in indexes.items():
+            op.execute(f'CREATE INDEX {index} ON {table} ({index_columns})')
+        names = ', '.join(_columns(f'{table}_partitioned'))
+        op.execute(f'INSERT INTO {table} ({names}) SELECT {names} FROM {table}_partitioned')
+        op.execute(f'DROP TABLE {table}_partitioned')
@@ -4,19 +4,18 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from pydantic import ValidationError
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
 from app.db.base import get_db
+from app.db.routing import get_read_db
 from app.models.user import User
 from app.schemas.token import TokenData
+from app.services.principal_cache import get_user_by_subject
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/v1/auth/token")
 
-async def get_current_user(
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
-) -> User:
+async def _user_from_token(db: AsyncSession, token: str) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -33,14 +32,37 @@ async def get_current_user(
     except (JWTError, ValidationError):
         raise credentials_exception
     
-    user = db.query(User).filter(User.email == token_data.email).first()
+    user = await get_user_by_subject(db, token_data.email)
     if user is None:
         raise credentials_exception
     return user
 
+async def get_current_user(
+    db: AsyncSession = Depends(get_db),
+    token: str = Depends(oauth2_scheme)
+) -> User:
+    return await _user_from_token(db, token)
+
 async def get_current_active_user(
     current_user: User = Depends(get_current_user),
 ) -> User:
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
     return current_user
+
+async def get_current_active_reader(
+    db: AsyncSession = Depends(get_read_db),
+    token: str = Depends(oauth2_scheme)
+) -> User:
+    """Current user for read-only endpoints, loaded through the read session; must not be modified"""
+    current_user = await _user_from_token(db, token)
+    if not current_user.is_active:
+        raise HTTPException(status_code=400, detail="Inactive user")
+    return current_user
+
+async def get_current_active_superuser(
+    current_user: User = Depends(get_current_active_user),
+) -> User:
+    if not current_user.is_superuser:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not enough privileges")
+    return current_user
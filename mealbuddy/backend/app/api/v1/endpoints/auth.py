@@ -1,20 +1,23 @@
+import uuid
 from datetime import datetime, timedelta
-from typing import Any
+from typing import Any, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, status, Request, Response
 from fastapi.security import OAuth2PasswordRequestForm
 from fastapi.responses import JSONResponse, RedirectResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 
 from app.core.config import settings
+from app.api.v1.deps import get_current_active_reader
 from app.db.base import get_db
 from app.models.user import User
+from app.repositories.users import get_user_for_google_sign_in, update_user
 from app.schemas.user import (
     User as UserSchema,
     UserCreate,
     UserLogin,
     Token,
+    RefreshTokenRequest,
     UserResponse,
     OnboardingData
 )
@@ -24,16 +27,43 @@ from app.services.auth_service import (
     get_current_user,
     get_current_active_user,
     create_user as create_user_service,
-    update_user_last_login,
-    get_password_hash
 )
+from app.services.google_auth import exchange_google_code, verify_google_id_token
+from app.services.login_activity import record_login
+from app.services.refresh_tokens import issue_refresh_token, revoke_refresh_token, rotate_refresh_token
+from app.core.responses import FastJSONRoute
 import httpx
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 GOOGLE_AUTH_URL = "https://accounts.google.com/o/oauth2/auth"
-GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token"
-GOOGLE_USER_INFO_URL = "https://www.googleapis.com/oauth2/v3/userinfo"
+REFRESH_COOKIE_PATH = f"{settings.API_V1_STR}/auth"
+
+
+def _issue_tokens(response: Response, user: User, refresh_token: str) -> dict:
+    """Create an access token and set both tokens as HTTP-only cookies"""
+    access_token = create_access_token(
+        data={"sub": user.email}, expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    )
+    response.set_cookie(
+        key="access_token",
+        value=f"Bearer {access_token}",
+        httponly=True,
+        max_age=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+        secure=not settings.DEBUG,  # Secure flag in production
+        samesite="lax"
+    )
+    # Only ever sent to the auth endpoints
+    response.set_cookie(
+        key="refresh_token",
+        value=refresh_token,
+        httponly=True,
+        max_age=settings.REFRESH_TOKEN_EXPIRE_DAYS * 24 * 3600,
+        path=REFRESH_COOKIE_PATH,
+        secure=not settings.DEBUG,
+        samesite="strict"
+    )
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
 
 @router.post("/login", response_model=Token)
 async def login_for_access_token(
@@ -53,26 +83,12 @@ async def login_for_access_token(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Update last login
-    await update_user_last_login(db, user)
+    # Recorded in memory and written in the next batch
+    record_login(user)
     
-    # Create access token
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
-    
-    # Set secure HTTP-only cookie
-    response.set_cookie(
-        key="access_token",
-        value=f"Bearer {access_token}",
-        httponly=True,
-        max_age=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-        secure=not settings.DEBUG,  # Secure flag in production
-        samesite="lax"
-    )
-    
-    return {"access_token": access_token, "token_type": "bearer"}
+    refresh_token = issue_refresh_token(db, user)
+    await db.commit()
+    return _issue_tokens(response, user, refresh_token)
 
 
 @router.post("/register", response_model=UserSchema)
@@ -98,7 +114,7 @@ async def register_user(
 
 @router.get("/me", response_model=UserSchema)
 async def read_users_me(
-    current_user: User = Depends(get_current_active_user)
+    current_user: User = Depends(get_current_active_reader)
 ) -> Any:
     """
     Get current user
@@ -107,11 +123,20 @@ async def read_users_me(
 
 
 @router.post("/logout")
-async def logout(response: Response) -> dict[str, str]:
+async def logout(
+    request: Request,
+    response: Response,
+    token_in: Optional[RefreshTokenRequest] = None,
+    db: AsyncSession = Depends(get_db)
+) -> dict[str, str]:
     """
-    Logout by removing the access token cookie
+    Logout by revoking the refresh token and removing the token cookies
     """
+    token = (token_in and token_in.refresh_token) or request.cookies.get("refresh_token")
+    if token:
+        await revoke_refresh_token(db, token)
     response.delete_cookie(key="access_token")
+    response.delete_cookie(key="refresh_token", path=REFRESH_COOKIE_PATH)
     return {"message": "Successfully logged out"}
 
 
@@ -125,18 +150,10 @@ async def complete_onboarding(
     Complete user onboarding with profile and preference data
     """
     try:
-        # Update user profile data
-        for field, value in onboarding_data.dict(exclude_unset=True).items():
-            setattr(current_user, field, value)
-        
-        # Mark onboarding as completed
-        current_user.onboarding_completed = True
-        
-        db.add(current_user)
-        await db.commit()
-        await db.refresh(current_user)
-        
-        return current_user
+        # Update user profile data and mark onboarding as completed
+        values = onboarding_data.dict(exclude_unset=True)
+        values["onboarding_completed"] = True
+        return await update_user(db, current_user, values)
     except Exception as e:
         await db.rollback()
         raise HTTPException(
@@ -147,16 +164,26 @@ async def complete_onboarding(
 
 @router.post("/refresh-token", response_model=Token)
 async def refresh_token(
-    current_user: User = Depends(get_current_active_user)
+    request: Request,
+    response: Response,
+    token_in: Optional[RefreshTokenRequest] = None,
+    db: AsyncSession = Depends(get_db)
 ) -> Any:
     """
-    Refresh access token
+    Exchange a refresh token for a new access token and a new refresh token.
+
+    The refresh token is read from the body, or else from its cookie; the
+    presented token cannot be used again.
     """
-    access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    access_token = create_access_token(
-        data={"sub": current_user.email}, expires_delta=access_token_expires
-    )
-    return {"access_token": access_token, "token_type": "bearer"}
+    token = (token_in and token_in.refresh_token) or request.cookies.get("refresh_token")
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token missing",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    user, new_refresh_token = await rotate_refresh_token(db, token)
+    return _issue_tokens(response, user, new_refresh_token)
 
 
 @router.get("/google-login")
@@ -188,75 +215,36 @@ async def google_callback(
 
     redirect_uri = f"{settings.SERVER_HOST}{settings.API_V1_STR}/auth/google-callback"
 
-    async with httpx.AsyncClient() as client:
-        # Exchange authorization code for access token
-        token_response = await client.post(
-            GOOGLE_TOKEN_URL,
-            data={
-                "code": code,
-                "client_id": settings.GOOGLE_CLIENT_ID,
-                "client_secret": settings.GOOGLE_CLIENT_SECRET,
-                "redirect_uri": redirect_uri,
-                "grant_type": "authorization_code",
-            },
-        )
-        token_response.raise_for_status()
-        token_data = token_response.json()
-        access_token = token_data["access_token"]
-
-        # Get user info from Google
-        user_info_response = await client.get(
-            GOOGLE_USER_INFO_URL,
-            headers={
-                "Authorization": f"Bearer {access_token}"
-            },
-        )
-        user_info_response.raise_for_status()
-        user_info = user_info_response.json()
-
-        google_id = user_info["sub"]
-        email = user_info["email"]
-        full_name = user_info.get("name")
-
-        # Check if user exists in our DB
-        user = await db.scalar(select(User).where(User.google_id == google_id))
-
-        if not user:
-            # If user doesn't exist, check by email (for existing users who might link Google later)
-            user = await db.scalar(select(User).where(User.email == email))
-            if user:
-                # Link existing user with Google ID
-                user.google_id = google_id
-                db.add(user)
-                await db.commit()
-                await db.refresh(user)
-            else:
-                # Create new user
-                user_create_data = UserCreate(
-                    email=email,
-                    password=get_password_hash(str(uuid.uuid4())),
-                    password_confirm=get_password_hash(str(uuid.uuid4())),
-                    full_name=full_name,
-                )
-                user = await create_user_service(db, user_create_data)
-                user.google_id = google_id
-                db.add(user)
-                await db.commit()
-                await db.refresh(user)
-
-        # Generate our own JWT token for the user
-        our_access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-        our_access_token = create_access_token(
-            data={"sub": user.email}, expires_delta=our_access_token_expires
-        )
-
-        response.set_cookie(
-            key="access_token",
-            value=f"Bearer {our_access_token}",
-            httponly=True,
-            max_age=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
-            secure=not settings.DEBUG,
-            samesite="lax"
+    # One round trip: the id_token is verified locally instead of fetching userinfo
+    try:
+        token_data = await exchange_google_code(code, redirect_uri)
+    except httpx.HTTPError:
+        raise HTTPException(status_code=400, detail="Could not exchange authorization code with Google")
+    if "id_token" not in token_data:
+        raise HTTPException(status_code=400, detail="Google did not return an ID token")
+    claims = await verify_google_id_token(token_data["id_token"], access_token=token_data.get("access_token"))
+
+    google_id = claims["sub"]
+    email = claims.get("email")
+    if not email or not claims.get("email_verified"):
+        raise HTTPException(status_code=400, detail="Google account email is not verified")
+
+    user = await get_user_for_google_sign_in(db, google_id, email)
+    if user is None:
+        # New user with a random password; create_user hashes it off the loop
+        random_password = str(uuid.uuid4())
+        user_create_data = UserCreate(
+            email=email,
+            password=random_password,
+            password_confirm=random_password,
+            full_name=claims.get("name"),
         )
-
-        return {"access_token": our_access_token, "token_type": "bearer"}
\ No newline at end of file
+        user = await create_user_service(db, user_create_data, google_id=google_id)
+    elif user.google_id != google_id:
+        # Existing email account signing in with Google for the first time
+        user = await update_user(db, user, {"google_id": google_id})
+
+    # Issue our own tokens for the user
+    refresh_token = issue_refresh_token(db, user)
+    await db.commit()
+    return _issue_tokens(response, user, refresh_token)
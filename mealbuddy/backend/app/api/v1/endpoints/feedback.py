@@ -1,40 +1,84 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
 from app.db.base import get_db
+from app.db.routing import get_read_db
 from app.models.user import User
-from app.models.recipe_feedback import RecipeFeedback
-from app.schemas.recipe_feedback import RecipeFeedbackCreate, RecipeFeedbackInDB
-from app.api.v1.deps import get_current_active_user
+from app.repositories.feedback import add_feedback, get_feedback_for_update, list_feedback, update_feedback
+from app.repositories.rating_stats import get_rating_stats, list_top_rated
+from app.schemas.recipe_feedback import (
+    RecipeFeedbackCreate,
+    RecipeFeedbackInDB,
+    RecipeFeedbackUpdate,
+    RecipeRatingStatsOut,
+)
+from app.api.v1.deps import get_current_active_reader, get_current_active_user
+from app.core.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 @router.post("/recipe-feedback", response_model=RecipeFeedbackInDB)
 async def submit_recipe_feedback(
     feedback_in: RecipeFeedbackCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     Submit feedback (rating and optional comment) for a recipe.
     """
-    db_feedback = RecipeFeedback(
-        **feedback_in.dict(),
-        user_id=current_user.id
-    )
-    db.add(db_feedback)
-    db.commit()
-    db.refresh(db_feedback)
-    return db_feedback
+    return await add_feedback(db, current_user.id, feedback_in.dict())
 
 @router.get("/recipe-feedback", response_model=List[RecipeFeedbackInDB])
 async def get_my_recipe_feedback(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_reader),
 ):
     """
     Get all recipe feedback submitted by the current user.
     """
-    feedback = db.query(RecipeFeedback).filter(RecipeFeedback.user_id == current_user.id).all()
-    return feedback
+    return await list_feedback(db, current_user.id)
+
+
+@router.put("/recipe-feedback/{feedback_id}", response_model=RecipeFeedbackInDB)
+async def update_recipe_feedback(
+    feedback_id: int,
+    feedback_in: RecipeFeedbackUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Change the rating and/or comment of feedback the current user submitted.
+    """
+    feedback = await get_feedback_for_update(db, current_user.id, feedback_id)
+    if feedback is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Feedback not found.")
+    return await update_feedback(db, feedback, feedback_in.dict(exclude_unset=True))
+
+@router.get("/recipe-ratings/top", response_model=List[RecipeRatingStatsOut])
+async def get_top_rated_recipes(
+    limit: int = Query(20, ge=1, le=100),
+    min_ratings: int = Query(1, ge=1),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_reader),
+):
+    """
+    Get the best rated recipes, ranked by Bayesian average so that a recipe
+    with a handful of perfect ratings does not outrank a consistently
+    well rated one.
+    """
+    return await list_top_rated(db, limit, min_ratings)
+
+@router.get("/recipe-ratings/{recipe_name}", response_model=RecipeRatingStatsOut)
+async def get_recipe_rating(
+    recipe_name: str,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_reader),
+):
+    """
+    Get a recipe's rating summary.
+    """
+    stats = await get_rating_stats(db, recipe_name)
+    if stats is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No ratings for this recipe.")
+    return stats
@@ -1,65 +1,120 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from fastapi.responses import StreamingResponse, PlainTextResponse
-from typing import List, Dict, Any
-import io
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, Optional
 
 from app.api.v1.deps import get_current_active_user
+from app.core.etag import conditional_response, make_etag
+from app.db.base import get_db
 from app.models.user import User
-from app.services.grocery_list_generator import generate_grocery_list
-from app.services.meal_planner.plan_generator import generate_meal_plan
+from app.services.grocery_export import EXPORT_FORMATS, get_cached_export, stream_cached, stream_export
+from app.services.grocery_list_generator import generate_user_grocery_list
+from app.services.meal_planner.plan_store import get_or_create_meal_plan
+from app.services.price_catalog import get_price_catalog
+from app.services.recipe_index import get_recipe_index
+from app.services.retailers.comparison import compare_retailer_prices
+from app.services.units import to_canonical
+from app.core.responses import FastJSONRoute
+
+router = APIRouter(route_class=FastJSONRoute)
+
+
+def _price_catalog_version() -> Optional[str]:
+    """Identifies the price catalog the list's estimates come from"""
+    catalog = get_price_catalog()
+    return catalog.path.name if catalog is not None else None
 
-router = APIRouter()
 
 @router.get("/grocery-list", response_model=Dict[str, Any])
 async def get_grocery_list(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
-    Generate a grocery list based on the user's meal plan.
+    Generate a grocery list based on the user's meal plan, net of their pantry.
     """
-    # For now, we'll generate a meal plan on the fly to create the grocery list.
-    # In a real scenario, the meal plan would likely be stored and retrieved.
-    meal_plan = await generate_meal_plan(current_user)
-    grocery_list_data = await generate_grocery_list(meal_plan)
+    plan = await get_or_create_meal_plan(db, current_user)
+    index = await get_recipe_index(db)
+    # Pantry, household size and budget changes all bump the user's updated_at;
+    # a catalog ingest changes the price estimates
+    etag = make_etag(
+        "grocery-list", plan.id, plan.version, current_user.updated_at, index.fingerprint, _price_catalog_version()
+    )
+    not_modified = conditional_response(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+    grocery_list_data = await generate_user_grocery_list(db, current_user, plan)
     return grocery_list_data
 
-@router.get("/grocery-list/export/csv")
-async def export_grocery_list_csv(
+@router.get("/grocery-list/prices", response_model=Dict[str, Any])
+async def compare_grocery_list_prices(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
-    Export the grocery list as a CSV file.
+    Compare the grocery list's cost across retailers.
+
+    Returns each retailer's cart total and the cheapest split of the list
+    across retailers.
     """
-    meal_plan = await generate_meal_plan(current_user)
-    grocery_list_data = await generate_grocery_list(meal_plan)
-    
-    output = io.StringIO()
-    output.write("Item,Quantity,Estimated Price\n")
-    for item in grocery_list_data["items"]:
-        output.write(f"{item["item"]},{item["quantity"]},{item["estimated_price"]:.2f}\n")
-    
-    output.seek(0)
-    
-    headers = {
-        "Content-Disposition": "attachment; filename=\"grocery_list.csv\""
-    }
-    return StreamingResponse(output, media_type="text/csv", headers=headers)
+    grocery_list_data = await generate_user_grocery_list(db, current_user)
+    return await compare_retailer_prices(grocery_list_data["items"])
 
-@router.get("/grocery-list/export/text")
-async def export_grocery_list_text(
+@router.get("/prices/{ingredient}/trend", response_model=Dict[str, Any])
+async def get_price_trend(
+    ingredient: str,
+    region: Optional[str] = Query(None, description="Defaults to the national series"),
+    days: int = Query(90, ge=7, le=730),
     current_user: User = Depends(get_current_active_user),
-) -> PlainTextResponse:
+):
     """
-    Export the grocery list as plain text.
+    Current estimated price and price trend of an ingredient from the local price catalog.
     """
-    meal_plan = await generate_meal_plan(current_user)
-    grocery_list_data = await generate_grocery_list(meal_plan)
-    
-    text_output = "Your Grocery List:\n\n"
-    for item in grocery_list_data["items"]:
-        text_output += f"- {item["item"]}: {item["quantity"]}\n"
-    text_output += f"\nTotal Estimated Cost: ${grocery_list_data["total_estimated_cost"]:.2f}\n"
-    if grocery_list_data["budget_optimization_message"]:
-        text_output += f"\n{grocery_list_data["budget_optimization_message"]}\n"
+    catalog = get_price_catalog()
+    # Prices are kept per canonical unit: grams, millilitres or pieces
+    unit = to_canonical(ingredient, "1 g").unit
+    trend = catalog.price_trend(ingredient, unit, region, days) if catalog is not None else None
+    if trend is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No price history for this ingredient")
+    return trend
+
+@router.get("/grocery-list/export/{fmt}")
+async def export_grocery_list(
+    fmt: str,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> StreamingResponse:
+    """
+    Export the grocery list as csv, text, jsonl or printable html.
+
+    The export is streamed as it is rendered and cached per plan version, so
+    repeated downloads of an unchanged list are served without regenerating it.
+    """
+    export_format = EXPORT_FORMATS.get(fmt)
+    if export_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Unsupported export format. Choose one of: {', '.join(EXPORT_FORMATS)}",
+        )
+
+    plan = await get_or_create_meal_plan(db, current_user)
+    index = await get_recipe_index(db)
+    # The list also depends on the pantry, household size and budget, all of
+    # which bump the user's updated_at, on the recipes and on the price catalog
+    cache_key = (
+        current_user.id, plan.id, plan.version, current_user.updated_at,
+        index.fingerprint, _price_catalog_version(), fmt,
+    )
+    cached = get_cached_export(cache_key)
+    if cached is not None:
+        body = stream_cached(cached)
+    else:
+        grocery_list_data = await generate_user_grocery_list(db, current_user, plan)
+        body = stream_export(grocery_list_data, fmt, cache_key)
 
-    return PlainTextResponse(text_output)
\ No newline at end of file
+    headers = {}
+    if fmt != "text":
+        headers["Content-Disposition"] = f"attachment; filename=\"grocery_list.{export_format.extension}\""
+    return StreamingResponse(body, media_type=export_format.media_type, headers=headers)
@@ -1,16 +1,19 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.etag import conditional_response, make_etag
 from app.db.base import get_db
-from app.api.v1.deps import get_current_active_user
+from app.api.v1.deps import get_current_active_reader, get_current_active_user
 from app.models.user import User
+from app.repositories.pantry import get_pantry, set_pantry
 from app.schemas.user import UserInventoryUpdate
 import os
 import uuid
 import base64
 
 from app.services.llama_service import analyze_image_with_llama
+from app.core.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 UPLOAD_DIR = "./uploads"
 
@@ -51,23 +54,26 @@ async def scan_inventory_image(
 @router.put("/inventory")
 async def update_user_inventory(
     inventory_update: UserInventoryUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     Manually update the user's pantry inventory.
     """
-    current_user.pantry_inventory = inventory_update.pantry_inventory
-    db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
-    return {"message": "Pantry inventory updated successfully", "inventory": current_user.pantry_inventory}
+    inventory = await set_pantry(db, current_user, inventory_update.pantry_inventory)
+    return {"message": "Pantry inventory updated successfully", "inventory": inventory}
 
 @router.get("/inventory")
 async def get_user_inventory(
-    current_user: User = Depends(get_current_active_user),
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_active_reader),
 ):
     """
     Get the current user's pantry inventory.
     """
-    return {"inventory": current_user.pantry_inventory}
+    etag = make_etag("inventory", current_user.id, current_user.created_at, current_user.updated_at)
+    not_modified = conditional_response(request, response, etag)
+    if not_modified is not None:
+        return not_modified
+    return {"inventory": get_pantry(current_user)}
@@ -1,14 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from pydantic import BaseModel
-from typing import Dict, Any, List
+import datetime
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic import BaseModel, Field
+from typing import Dict, Any, List, Optional
 
+from app.core.etag import conditional_response, make_etag
 from app.db.base import get_db
 from app.models.user import User
 from app.api.v1.deps import get_current_active_user
-from app.services.meal_planner.plan_generator import generate_meal_plan, swap_meal, shift_meal_plan, suggest_leftover_recipes
+from app.services.meal_planner.plan_generator import generate_meal_plan, swap_meal, shift_meal_plan
+from app.services.meal_planner.plan_store import get_current_meal_plan, get_or_create_meal_plan, save_meal_plan, log_meal
+from app.services.meal_planner.leftovers import suggest_leftover_recipes
+from app.services.recipe_index import get_recipe_index
+from app.core.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 class MealSwapRequest(BaseModel):
     day: str
@@ -17,51 +23,101 @@ class MealSwapRequest(BaseModel):
 class MealShiftRequest(BaseModel):
     days_to_shift: int
 
+class MealLogRequest(BaseModel):
+    meal_type: str
+    date: Optional[datetime.date] = None  # Defaults to today
+    recipe_name: Optional[str] = None  # Required for meals that were not planned
+    servings: Optional[int] = Field(None, ge=1)  # Portions eaten, defaults to household size
+
 @router.get("/meal-plan")
 async def get_meal_plan(
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
-    Generate a meal plan for the current user.
+    Get the current user's meal plan for this week, generating it on first access.
     """
-    meal_plan = await generate_meal_plan(current_user)
-    return meal_plan
+    plan = await get_or_create_meal_plan(db, current_user)
+    not_modified = conditional_response(request, response, make_etag("meal-plan", plan.id, plan.version))
+    if not_modified is not None:
+        return not_modified
+    return plan.plan_data
 
 @router.post("/meal-plan/swap")
 async def swap_meal_endpoint(
     swap_request: MealSwapRequest,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     Swap a meal in the current user's meal plan.
     """
-    # In a real application, the meal plan would be stored in the database
-    # and retrieved here. For now, we regenerate it.
-    current_meal_plan = await generate_meal_plan(current_user)
-    
+    plan = await get_current_meal_plan(db, current_user.id)
+    current_meal_plan = plan.plan_data if plan else await generate_meal_plan(current_user)
+
     updated_meal_plan = await swap_meal(
         current_user, current_meal_plan, swap_request.day, swap_request.meal_type
     )
+    await save_meal_plan(
+        db, current_user, updated_meal_plan, await get_recipe_index(db), plan=plan,
+        swapped_slot=(swap_request.day, swap_request.meal_type),
+    )
     return updated_meal_plan
 
 @router.post("/meal-plan/shift")
 async def shift_meal_plan_endpoint(
     shift_request: MealShiftRequest,
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     Shift the meal plan by a given number of days.
     """
-    current_meal_plan = await generate_meal_plan(current_user)
+    plan = await get_current_meal_plan(db, current_user.id)
+    current_meal_plan = plan.plan_data if plan else await generate_meal_plan(current_user)
     shifted_plan = await shift_meal_plan(current_user, current_meal_plan, shift_request.days_to_shift)
+    await save_meal_plan(db, current_user, shifted_plan, await get_recipe_index(db), plan=plan)
     return shifted_plan
 
+@router.post("/meal-plan/log")
+async def log_meal_endpoint(
+    log_request: MealLogRequest,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+) -> Dict[str, Any]:
+    """
+    Log a meal the user has eaten, planned or not.
+    """
+    try:
+        entry = await log_meal(
+            db,
+            current_user,
+            meal_type=log_request.meal_type,
+            meal_date=log_request.date,
+            recipe_name=log_request.recipe_name,
+            servings=log_request.servings,
+            index=await get_recipe_index(db),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return {
+        "id": entry.id,
+        "date": entry.date,
+        "meal_type": entry.meal_type,
+        "recipe_name": entry.recipe_name,
+        "servings": entry.servings,
+        "logged_at": entry.logged_at,
+    }
+
 @router.get("/meal-plan/leftovers")
 async def get_leftover_suggestions(
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ) -> List[str]:
     """
-    Get suggestions for recipes using leftovers.
+    Get suggestions for recipes using leftovers from recent meals.
     """
-    suggestions = await suggest_leftover_recipes(current_user)
+    suggestions = await suggest_leftover_recipes(db, current_user)
     return suggestions
@@ -1,12 +1,12 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
 
 from app.db.base import get_db
 from app.models.user import User, Goal, ActivityLevel
 from app.api.v1.deps import get_current_active_user
 from app.schemas.nutrition import NutritionData
+from app.core.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 @router.get("/nutrition-dashboard", response_model=NutritionData)
 async def get_nutrition_dashboard(
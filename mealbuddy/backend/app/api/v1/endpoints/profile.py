@@ -1,40 +1,47 @@
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.etag import conditional_response, make_etag
 from app.db.base import get_db
 from app.models.user import User
 from app.schemas.user import UserUpdate, UserPreferencesUpdate, UserNutritionUpdate, UserResponse
-from app.api.v1.deps import get_current_active_user
+from app.api.v1.deps import get_current_active_reader, get_current_active_user
+from app.repositories.users import update_user
+from app.services.meal_planner.leftovers import invalidate_leftover_suggestions
+from app.core.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 @router.get("/profile", response_model=UserResponse)
 async def get_user_profile(
-    current_user: User = Depends(get_current_active_user),
+    request: Request,
+    response: Response,
+    current_user: User = Depends(get_current_active_reader),
 ):
     """
     Get current user's profile.
     """
+    etag = make_etag(
+        "profile", current_user.id, current_user.created_at, current_user.updated_at, current_user.last_login
+    )
+    not_modified = conditional_response(request, response, etag)
+    if not_modified is not None:
+        return not_modified
     return {"success": True, "user": current_user}
 
 
 @router.put("/profile", response_model=UserResponse)
 async def update_user_profile(
     user_in: UserUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     Update current user's profile.
     """
     user_data = user_in.dict(exclude_unset=True)
-    for field, value in user_data.items():
-        setattr(current_user, field, value)
-    
-    db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
+    current_user = await update_user(db, current_user, user_data)
     
     return {"success": True, "user": current_user}
 
@@ -42,19 +49,17 @@ async def update_user_profile(
 @router.put("/profile/preferences", response_model=UserResponse)
 async def update_user_preferences(
     preferences_in: UserPreferencesUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     Update current user's dietary preferences.
     """
     preferences_data = preferences_in.dict(exclude_unset=True)
-    for field, value in preferences_data.items():
-        setattr(current_user, field, value)
-        
-    db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
+    current_user = await update_user(db, current_user, preferences_data)
+    
+    # Household size feeds the leftover estimate
+    invalidate_leftover_suggestions(current_user.id)
     
     return {"success": True, "user": current_user}
 
@@ -62,18 +67,13 @@ async def update_user_preferences(
 @router.put("/profile/nutrition", response_model=UserResponse)
 async def update_user_nutrition(
     nutrition_in: UserNutritionUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     Update current user's nutrition goals.
     """
     nutrition_data = nutrition_in.dict(exclude_unset=True)
-    for field, value in nutrition_data.items():
-        setattr(current_user, field, value)
-        
-    db.add(current_user)
-    db.commit()
-    db.refresh(current_user)
+    current_user = await update_user(db, current_user, nutrition_data)
     
     return {"success": True, "user": current_user}
@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Dict, Any, Optional
 from app.api.v1.deps import get_current_active_user
+from app.db.base import get_db
 from app.models.user import User
+from app.schemas.recipe import RecipeRecommendation, RecipeSearchPage
 from app.services.recipe_matcher import match_recipes_to_ingredients
+from app.services.recipe_search import search_recipes, MAX_PAGE_SIZE
+from app.services.recommender import get_recommender
+from app.core.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
 @router.post("/recipes/match", response_model=List[Dict[str, Any]])
 async def get_matching_recipes(
@@ -19,3 +25,57 @@ async def get_matching_recipes(
     
     recipes = await match_recipes_to_ingredients(ingredients)
     return recipes
+
+@router.get("/recipes/search", response_model=RecipeSearchPage)
+async def search_recipe_catalog(
+    q: Optional[str] = Query(None, max_length=200, description="Recipe name, cuisine or ingredient"),
+    cuisines: Optional[List[str]] = Query(None, description="Defaults to the user's preferred cuisines"),
+    any_cuisine: bool = Query(False, description="Ignore the user's preferred cuisines"),
+    max_total_minutes: Optional[int] = Query(None, gt=0),
+    max_prep_minutes: Optional[int] = Query(None, gt=0),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Search recipes by name, cuisine or ingredient.
+
+    Recipes containing any of the user's allergens are always excluded. Pass the
+    returned `next_cursor` back as `cursor` to fetch the next page.
+    """
+    if cuisines is None and not any_cuisine:
+        cuisines = current_user.preferred_cuisines or None
+
+    try:
+        return await search_recipes(
+            db,
+            query=q,
+            cuisines=cuisines,
+            exclude_allergens=current_user.allergies or None,
+            max_total_minutes=max_total_minutes,
+            max_prep_minutes=max_prep_minutes,
+            limit=limit,
+            cursor=cursor,
+        )
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+
+@router.get("/recipes/recommended", response_model=List[RecipeRecommendation])
+async def get_recommended_recipes(
+    limit: int = Query(20, ge=1, le=100),
+    include_rated: bool = Query(False, description="Also list recipes the user already rated"),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Recipes the current user is likely to rate highly, learned from everyone's
+    recipe feedback. Users without feedback get the generally best liked
+    recipes. Empty until the recommender has been trained.
+    """
+    recommender = get_recommender()
+    if recommender is None:
+        return []
+    return [
+        {"recipe_name": name, "predicted_rating": rating}
+        for name, rating in recommender.recommend(current_user.id, limit, include_rated=include_rated)
+    ]
@@ -1,26 +1,51 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List, Dict, Any
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from app.api.v1.deps import get_current_active_user
+from app.core.config import settings
+from app.db.base import get_db
 from app.models.user import User
-from app.services.grocery_list_generator import generate_grocery_list
-from app.services.meal_planner.plan_generator import generate_meal_plan
-from app.services.instacart_service import place_instacart_order
+from app.schemas.instacart_order import InstacartOrderResponse
+from app.services.grocery_list_generator import generate_user_grocery_list
+from app.services.instacart_service import enqueue_instacart_order, get_instacart_order
+from app.core.responses import FastJSONRoute
 
-router = APIRouter()
+router = APIRouter(route_class=FastJSONRoute)
 
-@router.post("/shopping/instacart", response_model=Dict[str, Any])
+@router.post("/shopping/instacart", response_model=InstacartOrderResponse, status_code=status.HTTP_202_ACCEPTED)
 async def order_with_instacart(
+    response: Response,
+    idempotency_key: Optional[str] = Header(None, max_length=64),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
-    Place a grocery order with Instacart based on the generated grocery list.
+    Queue a grocery order with Instacart based on the generated grocery list.
+
+    The order is placed in the background; poll the returned order for its
+    status. Retrying with the same Idempotency-Key (or, without one, sending
+    the same list again shortly after) returns the existing order rather
+    than placing a new one.
     """
-    # Generate meal plan and grocery list on the fly for the order
-    meal_plan = await generate_meal_plan(current_user)
-    grocery_list = await generate_grocery_list(meal_plan)
+    grocery_list = await generate_user_grocery_list(db, current_user)
 
-    if not grocery_list:
+    if not grocery_list["items"]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Grocery list is empty. Cannot place order.")
 
-    order_details = await place_instacart_order(grocery_list)
-    return order_details
+    order, _ = await enqueue_instacart_order(db, current_user, grocery_list, idempotency_key)
+    response.headers["Location"] = f"{settings.API_V1_STR}/users/shopping/instacart/orders/{order.id}"
+    return order
+
+@router.get("/shopping/instacart/orders/{order_id}", response_model=InstacartOrderResponse)
+async def get_instacart_order_status(
+    order_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Get the status and status history of an Instacart order.
+    """
+    order = await get_instacart_order(db, current_user.id, order_id)
+    if order is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Order not found")
+    return order
@@ -1,40 +1,140 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime, timezone
+from typing import List, Literal, Optional
 
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import decode_cursor, encode_cursor
 from app.db.base import get_db
+from app.db.routing import get_read_db
 from app.models.user import User
-from app.models.user_weight_log import UserWeightLog
-from app.schemas.user_weight_log import UserWeightLogCreate, UserWeightLogInDB
-from app.api.v1.deps import get_current_active_user
+from app.repositories.weight_logs import (
+    add_weight_log,
+    insert_weight_logs,
+    list_weight_logs,
+    pick_bucket,
+    summarize_weight_logs,
+)
+from app.schemas.user_weight_log import UserWeightLogCreate, UserWeightLogInDB, WeightImportResult, WeightSummary
+from app.services.weight_import import parse_readings
+from app.api.v1.deps import get_current_active_reader, get_current_active_user
+from app.core.responses import FastJSONRoute
+
+router = APIRouter(route_class=FastJSONRoute)
+
+MAX_PAGE_SIZE = 500
+MAX_CHART_POINTS = 366
+MAX_IMPORT_READINGS = 100_000
+IMPORT_FORMATS = {
+    "text/csv": "csv",
+    "application/x-ndjson": "jsonl",
+    "application/jsonl": "jsonl",
+    "application/x-jsonlines": "jsonl",
+}
 
-router = APIRouter()
+
+def _as_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Query bounds without an offset are taken as UTC, like imported readings"""
+    if value is None or value.tzinfo is not None:
+        return value
+    return value.replace(tzinfo=timezone.utc)
 
 @router.post("/weight-log", response_model=UserWeightLogInDB)
 async def log_user_weight(
     weight_log_in: UserWeightLogCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_active_user),
 ):
     """
     Log the current user's weight.
     """
-    db_weight_log = UserWeightLog(
-        **weight_log_in.dict(),
-        user_id=current_user.id
-    )
-    db.add(db_weight_log)
-    db.commit()
-    db.refresh(db_weight_log)
-    return db_weight_log
+    return await add_weight_log(db, current_user.id, weight_log_in.dict())
+
+@router.post("/weight-log/import", response_model=WeightImportResult)
+async def import_user_weight_logs(
+    request: Request,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_active_user),
+):
+    """
+    Import weight readings exported from a smart scale or wearable.
+
+    Send the file as the raw request body, `text/csv` (with a header row) or
+    `application/x-ndjson`. Each record needs a timestamp (`timestamp`,
+    `logged_at` or `date`) and `weight_kg`, or `weight` with an optional
+    `unit` (kg, g, lb). Readings at an already logged time are skipped, as
+    are invalid lines; the rest are added in one transaction.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    fmt = IMPORT_FORMATS.get(content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send the readings as text/csv or application/x-ndjson.",
+        )
+
+    report = {"invalid": 0, "errors": []}
+    parsed = imported = 0
+    seen = set()
+    async for batch in parse_readings(request.stream(), fmt, report):
+        parsed += len(batch)
+        if parsed > MAX_IMPORT_READINGS:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"At most {MAX_IMPORT_READINGS} readings per import.",
+            )
+        imported += await insert_weight_logs(db, current_user.id, batch, seen)
+    await db.commit()
+    return {**report, "imported": imported, "duplicates": parsed - imported}
 
 @router.get("/weight-log", response_model=List[UserWeightLogInDB])
 async def get_user_weight_history(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_active_user),
+    response: Response,
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_reader),
+):
+    """
+    Get the current user's weight history, oldest first, one page at a time.
+
+    When more entries follow, the response carries an `X-Next-Cursor` header;
+    pass it back as `cursor` to fetch the next page.
+    """
+    after = None
+    if cursor:
+        try:
+            logged_at, last_id = decode_cursor(cursor, 2)
+            after = (datetime.fromisoformat(logged_at), int(last_id))
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+
+    since, until = _as_utc(since), _as_utc(until)
+    rows, more = await list_weight_logs(db, current_user.id, limit, after=after, since=since, until=until)
+    if more:
+        response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].logged_at.isoformat(), rows[-1].id)
+    return rows
+
+@router.get("/weight-log/summary", response_model=WeightSummary)
+async def get_user_weight_summary(
+    bucket: Optional[Literal["day", "week", "month"]] = Query(None, description="Defaults to the finest that fits `points`"),
+    points: int = Query(180, ge=1, le=MAX_CHART_POINTS),
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: User = Depends(get_current_active_reader),
 ):
     """
-    Get the current user's weight history.
+    Get the current user's weight history for charting: min, average and max
+    per day, week or month, at most `points` buckets (the most recent ones).
     """
-    weight_history = db.query(UserWeightLog).filter(UserWeightLog.user_id == current_user.id).order_by(UserWeightLog.logged_at).all()
-    return weight_history
+    since, until = _as_utc(since), _as_utc(until)
+    if bucket is None:
+        bucket = await pick_bucket(db, current_user.id, points, since=since, until=until)
+    return {
+        "bucket": bucket,
+        "points": await summarize_weight_logs(db, current_user.id, bucket, points, since=since, until=until),
+    }
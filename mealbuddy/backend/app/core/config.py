@@ -1,7 +1,7 @@
 from pydantic_settings import BaseSettings
 import os
 from datetime import timedelta
-from typing import List, Optional
+from typing import Dict, List, Optional
 from pydantic import AnyHttpUrl, EmailStr, PostgresDsn, validator
 
 class Settings(BaseSettings):
@@ -33,6 +33,17 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = "postgres"
     POSTGRES_DB: str = "mealbuddy"
     DATABASE_URL: Optional[PostgresDsn] = None
+    DATABASE_REPLICA_URL: Optional[str] = None  # Read-only endpoints use this streaming replica when set
+    READ_YOUR_WRITES_SECONDS: float = 5.0  # After a write, the client reads from the primary this long
+
+    # Connection pool, per worker process: workers x (DB_POOL_SIZE + DB_MAX_OVERFLOW)
+    # must stay below the server's max_connections, leaving room for migrations and admin
+    DB_POOL_SIZE: int = 10  # Connections kept open
+    DB_MAX_OVERFLOW: int = 10  # Extra connections opened under load, closed when returned
+    DB_POOL_TIMEOUT_SECONDS: float = 10.0  # Wait for a free connection before failing
+    DB_POOL_RECYCLE_SECONDS: int = 1800  # Replace connections older than this
+    DB_POOL_PRE_PING: bool = True  # Test connections on checkout; drops ones the server closed
+    DB_STATEMENT_CACHE_SIZE: int = 100  # asyncpg prepared statements per connection; 0 behind PgBouncer in transaction mode
     
     @validator("DATABASE_URL", pre=True)
     def assemble_db_connection(cls, v: Optional[str], values: dict) -> str:
@@ -52,8 +63,29 @@ class Settings(BaseSettings):
     # Security
     SECRET_KEY: str = os.getenv("SECRET_KEY", "your-secret-key-here")
     ALGORITHM: str = "HS256"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    ACCESS_TOKEN_EXPIRE_MINUTES: int = 15  # Short-lived; clients renew them with a refresh token
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    REFRESH_TOKEN_PRUNE_INTERVAL_SECONDS: float = 3600.0
+    REFRESH_TOKEN_PRUNE_BATCH_SIZE: int = 1000  # Expired rows deleted per statement
+    BCRYPT_ROUNDS: int = 12  # Work factor; existing hashes are upgraded on login when it changes
+    PASSWORD_HASH_WORKERS: int = 2  # Threads hashing/verifying passwords per process
+    AUTH_CACHE_TTL_SECONDS: int = 30  # How long an authenticated user may be served from memory
+    AUTH_CACHE_MAX_ENTRIES: int = 10_000
+    LOGIN_ACTIVITY_FLUSH_SECONDS: float = 5.0  # How often buffered last_login updates are written
+    LOGIN_ACTIVITY_MAX_PENDING: int = 5_000  # Flush early once this many users are buffered
+
+    # Rate limiting: "METHOD /path" under API_V1_STR -> "user:N/period, ip:N/period"
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMITS: Dict[str, str] = {
+        "POST /auth/login": "ip:10/minute",
+        "POST /auth/refresh-token": "ip:30/minute",
+        "POST /users/inventory/scan": "user:6/minute, ip:30/minute",
+        "GET /users/meal-plan": "user:60/minute, ip:300/minute",
+        "POST /users/meal-plan/swap": "user:20/minute, ip:100/minute",
+        "POST /users/recipes/match": "user:20/minute, ip:100/minute",
+    }
+    RATE_LIMIT_MAX_KEYS: int = 100_000  # Buckets kept per process by the in-memory backend
+    RATE_LIMIT_REDIS_URL: Optional[str] = None  # Share buckets across workers through Redis
     
     # Email settings (for email verification and password reset)
     SMTP_TLS: bool = True
@@ -77,6 +109,50 @@ class Settings(BaseSettings):
     # Google OAuth
     GOOGLE_CLIENT_ID: Optional[str] = None
     GOOGLE_CLIENT_SECRET: Optional[str] = None
+    GOOGLE_HTTP_TIMEOUT_SECONDS: float = 10.0
+    
+    # Meal planning
+    RECIPE_INDEX_TTL_SECONDS: int = 600
+    LEFTOVER_LOOKBACK_DAYS: int = 3
+    LEFTOVER_CACHE_TTL_SECONDS: int = 3600
+
+    # Recipe ratings: the Bayesian average treats every recipe as having
+    # RATING_PRIOR_COUNT extra ratings of RATING_PRIOR_MEAN
+    RATING_PRIOR_MEAN: float = 3.5
+    RATING_PRIOR_COUNT: int = 5
+    RATING_STATS_RECONCILE_INTERVAL_SECONDS: float = 3600.0
+
+    # Recipe recommendations (see scripts/train_recommender.py)
+    RECOMMENDER_MODEL_DIR: str = "./data/recommender"
+    RECOMMENDER_FACTORS: int = 32
+    RECOMMENDER_REGULARIZATION: float = 0.1
+    RECOMMENDER_ITERATIONS: int = 15
+
+    # Instacart
+    INSTACART_API_URL: str = "http://localhost:8787"  # Local stand-in server by default
+    INSTACART_API_KEY: Optional[str] = None
+    INSTACART_TIMEOUT_SECONDS: float = 10.0
+    INSTACART_DISPATCHER_ENABLED: bool = True
+    INSTACART_DISPATCH_INTERVAL_SECONDS: float = 1.0
+    INSTACART_DISPATCH_BATCH_SIZE: int = 20
+    INSTACART_MAX_ATTEMPTS: int = 8
+    INSTACART_BACKOFF_BASE_SECONDS: float = 2.0
+    INSTACART_BACKOFF_MAX_SECONDS: float = 600.0
+    INSTACART_DEDUPE_WINDOW_SECONDS: int = 3600  # Identical lists within a window without an Idempotency-Key are one order
+
+    # Retailer price comparison
+    RETAILER_ENDPOINTS: Dict[str, str] = {}  # Retailer name -> price API base URL; local fakes when empty
+    RETAILER_LOOKUP_TIMEOUT_SECONDS: float = 3.0
+    RETAILER_PRICE_CACHE_TTL_SECONDS: int = 900
+
+    # Monthly partitions of user_weight_log and recipe_feedback (see app/db/partitions.py)
+    PARTITION_MONTHS_AHEAD: int = 3  # Empty future partitions kept ready
+    PARTITION_RETENTION_MONTHS: Optional[int] = None  # Archive and drop older months; keep all when unset
+    PARTITION_ARCHIVE_DIR: str = "./data/archive"
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS: float = 6 * 3600.0
+
+    # Local price catalog (see scripts/ingest_prices.py)
+    PRICE_CATALOG_DIR: str = "./data/price_catalog"
     
     # Debug mode
     DEBUG: bool = False
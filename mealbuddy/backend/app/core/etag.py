@@ -0,0 +1,49 @@
+"""
+Conditional GET support.
+
+Resources derive a strong ETag from what versions them (row version,
+updated_at, content fingerprints) rather than from the rendered body, so a
+matching If-None-Match is answered with 304 before any data is generated or
+serialized.
+"""
+import hashlib
+from typing import Any, Optional
+
+from fastapi import Request, Response, status
+
+from app.core.config import settings
+
+
+def make_etag(*parts: Any) -> str:
+    """Strong ETag over the given version parts; changes whenever any part does"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(settings.VERSION.encode("utf-8"))
+    for part in parts:
+        digest.update(b"\x1f")
+        digest.update(repr(part).encode("utf-8"))
+    return f'"{digest.hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match covers `etag` (weak comparison, as for GET)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in header.split(","))
+    return any(candidate.removeprefix("W/") == etag for candidate in candidates)
+
+
+def conditional_response(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """
+    Return a 304 response if the client already has `etag`.
+
+    Otherwise sets the ETag on `response` and returns None, and the endpoint
+    goes on to build its body.
+    """
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return None
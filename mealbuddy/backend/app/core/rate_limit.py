@@ -0,0 +1,245 @@
+"""
+Token-bucket rate limiting for expensive endpoints.
+
+Limits are configured per route (method and path) and apply per client IP
+and, for authenticated requests, per user. Each bucket holds up
+to `capacity` tokens and refills continuously; a request takes one token or
+is rejected with 429 and a Retry-After header. A request takes its token
+from every bucket that applies to it or from none, so a rejected request
+does not use up any of its limits.
+
+The default backend keeps buckets in a bounded in-process dict of
+(tokens, timestamp) pairs, which limits each worker separately. For
+multi-worker deployments set RATE_LIMIT_REDIS_URL to share buckets through
+Redis, or pass any RateLimitBackend to the middleware.
+"""
+import hashlib
+import math
+import re
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from jose import JWTError, jwt
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+
+_PERIODS = {"second": 1.0, "minute": 60.0, "hour": 3600.0, "day": 86400.0}
+_RULE = re.compile(r"^\s*(user|ip)\s*:\s*(\d+)\s*/\s*(second|minute|hour|day)\s*$")
+
+
+class Rate(NamedTuple):
+    capacity: float  # Burst size
+    per_second: float  # Refill rate
+
+
+class RouteLimit(NamedTuple):
+    user: Optional[Rate]
+    ip: Optional[Rate]
+
+
+def parse_route_limit(spec: str) -> RouteLimit:
+    """Parse e.g. "user:20/minute, ip:60/minute"; either part may be left out"""
+    rates: Dict[str, Rate] = {}
+    for part in spec.split(","):
+        match = _RULE.match(part)
+        if match is None:
+            raise ValueError(f"Invalid rate limit {spec!r}")
+        scope, count, period = match.groups()
+        rates[scope] = Rate(float(count), float(count) / _PERIODS[period])
+    return RouteLimit(rates.get("user"), rates.get("ip"))
+
+
+class RateLimitBackend(ABC):
+    @abstractmethod
+    async def acquire(self, buckets: Sequence[Tuple[str, Rate]]) -> float:
+        """
+        Take one token from every (key, rate) bucket if each has one; returns
+        0 if allowed, else seconds until all do (and takes nothing).
+        """
+
+
+class InMemoryTokenBuckets(RateLimitBackend):
+    """
+    Per-process buckets: a dict of key -> (tokens, timestamp).
+
+    Beyond max_keys the oldest bucket is dropped; a dropped bucket simply
+    starts full again, so eviction can only make the limit more lenient.
+    """
+
+    def __init__(self, max_keys: int = 100_000):
+        self.max_keys = max_keys
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+
+    def _tokens(self, key: str, rate: Rate, now: float) -> float:
+        capacity, per_second = rate
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                del self._buckets[next(iter(self._buckets))]
+            return capacity
+        tokens = bucket[0] + (now - bucket[1]) * per_second
+        return capacity if tokens > capacity else tokens
+
+    def take_all(self, buckets: Sequence[Tuple[str, Rate]], now: Optional[float] = None) -> float:
+        if now is None:
+            now = time.monotonic()
+        levels = [self._tokens(key, rate, now) for key, rate in buckets]
+        wait = 0.0
+        for tokens, (_, rate) in zip(levels, buckets):
+            if tokens < 1.0:
+                wait = max(wait, (1.0 - tokens) / rate.per_second)
+        taken = 1.0 if wait == 0.0 else 0.0
+        for tokens, (key, _) in zip(levels, buckets):
+            self._buckets[key] = (tokens - taken, now)
+        return wait
+
+    def take(self, key: str, rate: Rate, now: Optional[float] = None) -> float:
+        return self.take_all([(key, rate)], now)
+
+    async def acquire(self, buckets: Sequence[Tuple[str, Rate]]) -> float:
+        return self.take_all(buckets)
+
+
+# KEYS buckets; ARGV capacity and refill per second for each bucket in turn.
+# Takes a token from every bucket or from none. Uses the server clock so workers agree.
+_REDIS_TAKE = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local levels, wait = {}, 0
+for i, key in ipairs(KEYS) do
+  local capacity, rate = tonumber(ARGV[2 * i - 1]), tonumber(ARGV[2 * i])
+  local bucket = redis.call('HMGET', key, 't', 's')
+  local tokens = tonumber(bucket[1])
+  if tokens == nil then
+    tokens = capacity
+  else
+    tokens = math.min(capacity, tokens + (now - tonumber(bucket[2])) * rate)
+  end
+  if tokens < 1 then wait = math.max(wait, (1 - tokens) / rate) end
+  levels[i] = tokens
+end
+local taken = 0
+if wait == 0 then taken = 1 end
+for i, key in ipairs(KEYS) do
+  local capacity, rate = tonumber(ARGV[2 * i - 1]), tonumber(ARGV[2 * i])
+  redis.call('HSET', key, 't', levels[i] - taken, 's', now)
+  redis.call('EXPIRE', key, math.ceil(capacity / rate) + 1)
+end
+return tostring(wait)
+"""
+
+
+class RedisTokenBuckets(RateLimitBackend):
+    """Buckets shared by all workers, updated atomically by a server-side script"""
+
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        try:
+            from redis import asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_REDIS_URL is set but the redis package is not installed") from e
+        self.prefix = prefix
+        self._take = redis.from_url(url).register_script(_REDIS_TAKE)
+
+    async def acquire(self, buckets: Sequence[Tuple[str, Rate]]) -> float:
+        # Keys contain user subjects (emails); never store those outside the process
+        keys = [self.prefix + hashlib.blake2b(key.encode("utf-8"), digest_size=16).hexdigest() for key, _ in buckets]
+        args = [value for _, rate in buckets for value in (rate.capacity, rate.per_second)]
+        return float(await self._take(keys=keys, args=args))
+
+
+def create_rate_limit_backend() -> RateLimitBackend:
+    if settings.RATE_LIMIT_REDIS_URL:
+        return RedisTokenBuckets(settings.RATE_LIMIT_REDIS_URL)
+    return InMemoryTokenBuckets(settings.RATE_LIMIT_MAX_KEYS)
+
+
+def _bearer_token(scope: Scope) -> Optional[str]:
+    """The request's credential: Authorization header, else the access_token cookie"""
+    for name, value in scope["headers"]:
+        if name == b"authorization" and value[:7].lower() == b"bearer ":
+            return value[7:].decode("latin-1")
+        if name == b"cookie" and b"access_token=" in value:
+            for cookie in value.decode("latin-1").split(";"):
+                key, _, token = cookie.strip().partition("=")
+                if key == "access_token":
+                    return token.strip('"').removeprefix("Bearer ").strip()
+    return None
+
+
+def _token_subject(token: str) -> Optional[str]:
+    """The subject of a valid access token; None if it does not verify"""
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+    except JWTError:
+        return None
+    subject = payload.get("sub")
+    return subject if isinstance(subject, str) else None
+
+
+class RateLimitMiddleware:
+    """
+    ASGI middleware enforcing per-route token buckets.
+
+    `limits` maps "METHOD /path" (relative to API_V1_STR) to a RouteLimit.
+    User buckets are keyed by the verified subject of the bearer token, so
+    refreshing to a new token does not reset the limit. The token is only
+    decoded on limited routes. A forged token cannot drain someone else's
+    bucket, because requests whose token does not verify get no user bucket.
+    They are left to the per-IP limit and then to the endpoint's 401.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limits: Optional[Dict[str, RouteLimit]] = None,
+        backend: Optional[RateLimitBackend] = None,
+        prefix: str = settings.API_V1_STR,
+    ):
+        self.app = app
+        if limits is None:
+            limits = {route: parse_route_limit(spec) for route, spec in settings.RATE_LIMITS.items()}
+        self.limits = {
+            (route.split(" ", 1)[0].upper(), prefix + route.split(" ", 1)[1]): limit for route, limit in limits.items()
+        }
+        self.backend = backend or create_rate_limit_backend()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        limit = self.limits.get((scope["method"], scope["path"]))
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        route = f'{scope["method"]} {scope["path"]}'
+        checks: List[Tuple[str, Rate]] = []
+        if limit.ip is not None:
+            client = scope.get("client")
+            checks.append((f"ip:{client[0] if client else '-'}:{route}", limit.ip))
+        if limit.user is not None:
+            token = _bearer_token(scope)
+            subject = _token_subject(token) if token else None
+            if subject is not None:
+                checks.append((f"user:{subject}:{route}", limit.user))
+        retry_after = await self.backend.acquire(checks) if checks else 0.0
+        if retry_after > 0:
+            await self._reject(send, retry_after)
+            return
+        await self.app(scope, receive, send)
+
+    @staticmethod
+    async def _reject(send: Send, retry_after: float) -> None:
+        body = b'{"detail":"Too many requests"}'
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
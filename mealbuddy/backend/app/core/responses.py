@@ -0,0 +1,111 @@
+"""
+JSON responses rendered straight to bytes.
+
+FastAPI's default path turns a response model into a dict of JSON-ready
+Python objects (or runs plain dicts through `jsonable_encoder`) and then
+encodes that with the stdlib `json` module: every value is visited twice in
+Python. Routes built with `FastJSONRoute` instead have pydantic-core
+validate and dump the response model to JSON bytes in one pass
+(`TypeAdapter.dump_json`), and encode responses without a model, such as
+meal plans and grocery lists, with orjson. `FastJSONResponse` passes the
+bytes through as they are.
+
+orjson is optional: without it, unmodelled responses fall back to
+`jsonable_encoder` plus the stdlib encoder, as before.
+"""
+import json
+from decimal import Decimal
+from typing import Any, Callable, Coroutine, Dict, List, Optional, Tuple
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, get_request_handler
+from pydantic import BaseModel, TypeAdapter
+from typing_extensions import Annotated
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class RawJSON(bytes):
+    """Content that is already encoded JSON"""
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (set, frozenset, tuple)):
+        return list(value)
+    return jsonable_encoder(value)
+
+
+def dumps(content: Any) -> bytes:
+    """Encode arbitrary response content, the way JSONResponse would but faster"""
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(
+        jsonable_encoder(content), ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, RawJSON):
+            return content
+        return dumps(content)
+
+
+class _ModelJSONField:
+    """A route's response field that serializes with one `dump_json` call"""
+
+    def __init__(self, field: Any):
+        self._field = field
+        self._adapter = TypeAdapter(Annotated[field.field_info.annotation, field.field_info])
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._field, name)
+
+    def validate(self, *args: Any, **kwargs: Any) -> Tuple[Any, Optional[List[Dict[str, Any]]]]:
+        return self._field.validate(*args, **kwargs)
+
+    def serialize(self, value: Any, **options: Any) -> RawJSON:
+        return RawJSON(self._adapter.dump_json(value, **options))
+
+
+class _UnmodelledJSONField:
+    """Stands in for a missing response model, replacing `jsonable_encoder`"""
+
+    def validate(self, value: Any, *args: Any, **kwargs: Any) -> Tuple[Any, None]:
+        return value, None
+
+    def serialize(self, value: Any, **options: Any) -> RawJSON:
+        return RawJSON(dumps(value))
+
+
+class FastJSONRoute(APIRoute):
+    """APIRoute whose JSON responses skip the intermediate dict"""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        response_class = getattr(self.response_class, "value", self.response_class)
+        if not issubclass(response_class, FastJSONResponse):
+            return super().get_route_handler()
+        field = self.secure_cloned_response_field
+        return get_request_handler(
+            dependant=self.dependant,
+            body_field=self.body_field,
+            status_code=self.status_code,
+            response_class=self.response_class,
+            response_field=_ModelJSONField(field) if field is not None else _UnmodelledJSONField(),
+            response_model_include=self.response_model_include,
+            response_model_exclude=self.response_model_exclude,
+            response_model_by_alias=self.response_model_by_alias,
+            response_model_exclude_unset=self.response_model_exclude_unset,
+            response_model_exclude_defaults=self.response_model_exclude_defaults,
+            response_model_exclude_none=self.response_model_exclude_none,
+            dependency_overrides_provider=self.dependency_overrides_provider,
+        )
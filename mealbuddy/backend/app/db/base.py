@@ -1,24 +1,110 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.core.config import settings
 
-# Convert PostgresDsn to string and ensure asyncpg is used
-if isinstance(settings.DATABASE_URL, str):
-    database_url = settings.DATABASE_URL
-else:
-    database_url = str(settings.DATABASE_URL)
 
-# Ensure we're using the asyncpg driver
-database_url = database_url.replace("postgresql://", "postgresql+asyncpg://")
+def async_database_url(url: Optional[Any] = None) -> str:
+    """The database URL with the asyncpg driver"""
+    url = str(url or settings.DATABASE_URL)
+    return url.replace("postgresql://", "postgresql+asyncpg://")
+
+
+class InstrumentedAsyncPool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long checkouts take and how often they time out"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+
+    def _do_get(self):
+        # Covers waiting for a free connection and opening an overflow one
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self.timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_seconds_total += waited
+                self.wait_seconds_max = max(self.wait_seconds_max, waited)
+
+    def recreate(self):
+        # Keep counting across engine.dispose() and invalidation
+        pool = super().recreate()
+        pool.checkouts, pool.timeouts = self.checkouts, self.timeouts
+        pool.wait_seconds_total, pool.wait_seconds_max = self.wait_seconds_total, self.wait_seconds_max
+        return pool
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            "size": self.size(),
+            "checked_out": self.checkedout(),
+            "idle": self.checkedin(),
+            "overflow": max(0, self.overflow()),
+            "max_overflow": self._max_overflow,
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_ms_avg": round(self.wait_seconds_total / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+            "wait_ms_max": round(self.wait_seconds_max * 1000, 3),
+        }
+
+
+def create_engine(url: Optional[Any] = None, **overrides: Any) -> AsyncEngine:
+    """
+    The application's engine: pooled and instrumented as configured in Settings.
+
+    Every process (each uvicorn/gunicorn worker) gets its own pool of
+    DB_POOL_SIZE connections plus up to DB_MAX_OVERFLOW more under load.
+    `overrides` are passed to create_async_engine, e.g. poolclass=NullPool
+    for one-off scripts.
+    """
+    options: Dict[str, Any] = {
+        "echo": settings.DEBUG,
+        "poolclass": InstrumentedAsyncPool,
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT_SECONDS,
+        "pool_recycle": settings.DB_POOL_RECYCLE_SECONDS,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        # asyncpg's own statement cache, plus SQLAlchemy's cache of prepared statements per connection
+        "connect_args": {"statement_cache_size": settings.DB_STATEMENT_CACHE_SIZE},
+    }
+    options.update(overrides)
+    if not issubclass(options["poolclass"], AsyncAdaptedQueuePool):
+        # Sizing options only apply to queue pools
+        for key in ("pool_size", "max_overflow", "pool_timeout"):
+            options.pop(key, None)
+    url = make_url(async_database_url(url)).update_query_dict(
+        {"prepared_statement_cache_size": str(settings.DB_STATEMENT_CACHE_SIZE)}
+    )
+    return create_async_engine(url, **options)
+
+
+def pool_metrics(engine: AsyncEngine) -> Dict[str, Any]:
+    pool = engine.sync_engine.pool
+    if isinstance(pool, InstrumentedAsyncPool):
+        return pool.metrics()
+    return {"status": pool.status()}
+
 
 # Create async database engine
-engine = create_async_engine(
-    database_url,
-    echo=settings.DEBUG,
-    future=True
-)
+engine = create_engine()
 
 # Create async session factory
 async_session = async_sessionmaker(
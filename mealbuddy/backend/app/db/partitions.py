@@ -0,0 +1,208 @@
+"""
+Monthly (UTC) range partitions of the append-heavy tables.
+
+user_weight_log (by logged_at) and recipe_feedback (by created_at) are
+partitioned by month, so time-bounded queries only touch the months they
+cover, every index stays the size of one month, and vacuum works on the
+month being written rather than the whole history. A DEFAULT partition
+catches rows older than the first monthly partition (imported history).
+
+A background task keeps PARTITION_MONTHS_AHEAD months of empty partitions
+ready, so inserts never hit a missing month, and with
+PARTITION_RETENTION_MONTHS set it detaches older months, archives each to
+a gzipped CSV in PARTITION_ARCHIVE_DIR and drops it.
+"""
+import asyncio
+import gzip
+import logging
+import re
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Partitioned table -> partition key column
+PARTITIONED_TABLES: Dict[str, str] = {
+    "user_weight_log": "logged_at",
+    "recipe_feedback": "created_at",
+}
+
+_MONTH_SUFFIX = re.compile(r"_p(\d{4})_(\d{2})$")
+
+
+def add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month.year:04d}_{month.month:02d}"
+
+
+def partition_month(table: str, name: str) -> Optional[date]:
+    """The month a partition holds, None for the default partition or a foreign name"""
+    match = _MONTH_SUFFIX.search(name)
+    if match is None or not name.startswith(table):
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+async def list_partitions(conn: AsyncConnection, table: str) -> List[str]:
+    result = await conn.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table ORDER BY child.relname"
+        ),
+        {"table": table},
+    )
+    return list(result.scalars())
+
+
+async def ensure_partitions(conn: AsyncConnection, months_ahead: Optional[int] = None) -> List[str]:
+    """Create this month's and the next months' partitions where missing; returns the new ones"""
+    months_ahead = settings.PARTITION_MONTHS_AHEAD if months_ahead is None else months_ahead
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+    created = []
+    for table in PARTITIONED_TABLES:
+        existing = set(await list_partitions(conn, table))
+        if f"{table}_default" not in existing:
+            await conn.execute(text(f"CREATE TABLE {table}_default PARTITION OF {table} DEFAULT"))
+            created.append(f"{table}_default")
+        for offset in range(months_ahead + 1):
+            month = add_months(this_month, offset)
+            name = partition_name(table, month)
+            if name in existing:
+                continue
+            await conn.execute(text(
+                f"CREATE TABLE {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ('{month.isoformat()} 00:00+00') TO ('{add_months(month, 1).isoformat()} 00:00+00')"
+            ))
+            created.append(name)
+    return created
+
+
+async def archive_partition(engine: AsyncEngine, table: str, name: str, archive_dir: Path) -> Path:
+    """
+    Detach one partition, copy it to `archive_dir/<name>.csv.gz` and drop it.
+
+    Detaching first takes the rows out of queries at once and stops writes
+    to them; the table is only dropped once the archive is completely
+    written, so after a failure it is left detached for a manual retry.
+    """
+    async with engine.begin() as conn:
+        await conn.execute(text(f"ALTER TABLE {table} DETACH PARTITION {name}"))
+
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    path = archive_dir / f"{name}.csv.gz"
+    partial = path.with_suffix(".gz.partial")
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        with gzip.open(partial, "wb") as f:
+            async def write(chunk: bytes) -> None:
+                f.write(chunk)
+
+            await raw.driver_connection.copy_from_table(name, output=write, format="csv", header=True)
+    partial.replace(path)
+
+    async with engine.begin() as conn:
+        await conn.execute(text(f"DROP TABLE {name}"))
+    return path
+
+
+async def archive_old_partitions(
+    engine: AsyncEngine,
+    retention_months: Optional[int] = None,
+    archive_dir: Optional[Path] = None,
+) -> List[Path]:
+    """Archive every monthly partition older than `retention_months`; returns the archive files"""
+    retention_months = retention_months or settings.PARTITION_RETENTION_MONTHS
+    if not retention_months:
+        return []
+    archive_dir = Path(archive_dir or settings.PARTITION_ARCHIVE_DIR)
+    cutoff = add_months(datetime.now(timezone.utc).date().replace(day=1), -retention_months)
+    archived = []
+    for table in PARTITIONED_TABLES:
+        async with engine.connect() as conn:
+            names = await list_partitions(conn, table)
+        for name in names:
+            month = partition_month(table, name)
+            if month is not None and month < cutoff:
+                archived.append(await archive_partition(engine, table, name, archive_dir))
+    return archived
+
+
+async def maintain_partitions(engine: AsyncEngine) -> Tuple[List[str], List[Path]]:
+    """
+    Create missing partitions and archive expired ones. Only one process at
+    a time does the work; the others return at once with nothing done.
+    """
+    async with engine.connect() as lock:
+        acquired = await lock.scalar(text("SELECT pg_try_advisory_lock(hashtext('partition-maintenance'))"))
+        await lock.commit()
+        if not acquired:
+            return [], []
+        try:
+            async with engine.begin() as conn:
+                created = await ensure_partitions(conn)
+            return created, await archive_old_partitions(engine)
+        finally:
+            await lock.execute(text("SELECT pg_advisory_unlock(hashtext('partition-maintenance'))"))
+            await lock.commit()
+
+
+class PartitionMaintainer:
+    """Background task creating future partitions and archiving expired ones"""
+
+    def __init__(self, engine: AsyncEngine):
+        self._engine = engine
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="partition-maintainer")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                created, archived = await maintain_partitions(self._engine)
+                if created:
+                    logger.info("Created partitions %s", ", ".join(created))
+                for path in archived:
+                    logger.info("Archived partition to %s", path)
+            except Exception:
+                logger.exception("Partition maintenance failed")
+            await asyncio.sleep(settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS)
+
+
+_maintainer: Optional[PartitionMaintainer] = None
+
+
+def start_partition_maintainer(engine: AsyncEngine) -> None:
+    global _maintainer
+    if _maintainer is None:
+        _maintainer = PartitionMaintainer(engine)
+        _maintainer.start()
+
+
+async def stop_partition_maintainer() -> None:
+    global _maintainer
+    if _maintainer is not None:
+        await _maintainer.stop()
+        _maintainer = None
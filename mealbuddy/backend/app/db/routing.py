@@ -0,0 +1,126 @@
+"""
+Read-replica routing with read-your-writes stickiness.
+
+Read-only endpoints take their session from `get_read_db`, which uses the
+replica engine when DATABASE_REPLICA_URL is set. A client that just wrote
+could read stale data from a lagging replica, so any request that commits
+a write on the primary gets a short-lived cookie, and while it is present
+that client's reads go to the primary too. The cookie carries the state, so
+stickiness holds across worker processes and app replicas.
+"""
+import time
+from contextvars import ContextVar
+from typing import AsyncIterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import Session
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.db.base import create_engine, get_db
+
+STICKY_COOKIE = "primary_until"
+
+
+class RoutingState:
+    __slots__ = ("sticky", "wrote")
+
+    def __init__(self, sticky: bool):
+        self.sticky = sticky  # Recent write by this client: read from the primary
+        self.wrote = False  # This request committed a write
+
+
+_routing_state: ContextVar[Optional[RoutingState]] = ContextVar("db_routing_state", default=None)
+
+replica_engine = create_engine(settings.DATABASE_REPLICA_URL) if settings.DATABASE_REPLICA_URL else None
+replica_session = (
+    async_sessionmaker(bind=replica_engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+    if replica_engine is not None
+    else None
+)
+
+
+def is_replica_session(db: AsyncSession) -> bool:
+    """Whether a session reads from the replica, so what it loads may be stale"""
+    return replica_engine is not None and db.bind is replica_engine
+
+
+def reads_from_primary() -> bool:
+    state = _routing_state.get()
+    return replica_session is None or (state is not None and state.sticky)
+
+
+async def get_read_db() -> AsyncIterator[AsyncSession]:
+    """Dependency for read-only endpoints: a replica session unless this client must read its own writes"""
+    if reads_from_primary():
+        async for session in get_db():
+            yield session
+        return
+    async with replica_session() as session:
+        try:
+            yield session
+        finally:
+            await session.rollback()
+
+
+@event.listens_for(Session, "after_flush")
+def _note_write(session: Session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _note_statement_write(orm_execute_state) -> None:
+    # Bulk insert/update/delete statements write without a flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info["wrote"] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _mark_sticky(session: Session) -> None:
+    if session.info.pop("wrote", False):
+        state = _routing_state.get()
+        if state is not None:
+            state.wrote = True
+
+
+def _cookie_value(scope: Scope) -> Optional[str]:
+    for name, value in scope["headers"]:
+        if name == b"cookie" and STICKY_COOKIE.encode() in value:
+            for cookie in value.decode("latin-1").split(";"):
+                key, _, found = cookie.strip().partition("=")
+                if key == STICKY_COOKIE:
+                    return found
+    return None
+
+
+class ReadYourWritesMiddleware:
+    """Tracks writes per request and keeps the writing client on the primary for a while"""
+
+    def __init__(self, app: ASGIApp, window_seconds: Optional[float] = None):
+        self.app = app
+        self.window_seconds = settings.READ_YOUR_WRITES_SECONDS if window_seconds is None else window_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        try:
+            sticky = float(_cookie_value(scope) or 0) > time.time()
+        except ValueError:
+            sticky = False
+        # A mutable object, so writes noted deeper in the call stack are visible here
+        state = RoutingState(sticky)
+        token = _routing_state.set(state)
+
+        async def send_with_cookie(message: Message) -> None:
+            if message["type"] == "http.response.start" and state.wrote:
+                until = time.time() + self.window_seconds
+                cookie = f"{STICKY_COOKIE}={until:.3f}; Max-Age={int(self.window_seconds) + 1}; Path=/; HttpOnly; SameSite=Lax"
+                message["headers"] = list(message.get("headers", [])) + [(b"set-cookie", cookie.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            _routing_state.reset(token)
@@ -1,24 +1,69 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Depends
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
 
 from app.api.v1.api import api_router
+from app.api.v1.deps import get_current_active_superuser
 from app.core.config import settings
-from app.db.base import get_db
+from app.core.rate_limit import RateLimitMiddleware
+from app.core.responses import FastJSONResponse, FastJSONRoute
+from app.db.routing import ReadYourWritesMiddleware, replica_engine
+from app.db.base import get_db, async_session, engine, pool_metrics
+from app.db.partitions import start_partition_maintainer, stop_partition_maintainer
 from app.schemas.token import Token, UserCreate, UserInDB
 from app.models.user import User
 from app.core.security import get_password_hash, create_access_token
+from app.services.google_auth import close_google_http_client
+from app.services.instacart_service import start_dispatcher, stop_dispatcher
+from app.services.login_activity import start_login_activity, stop_login_activity
+from app.services.principal_cache import principal_cache
+from app.services.rating_stats import start_rating_stats_reconciler, stop_rating_stats_reconciler
+from app.services.refresh_tokens import start_refresh_token_pruner, stop_refresh_token_pruner
+from app.services.retailers.http import close_http_client
 from datetime import timedelta
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    if settings.INSTACART_DISPATCHER_ENABLED:
+        start_dispatcher(async_session)
+    start_login_activity(async_session)
+    start_refresh_token_pruner(async_session)
+    start_rating_stats_reconciler(async_session)
+    start_partition_maintainer(engine)
+    yield
+    await stop_partition_maintainer()
+    await stop_rating_stats_reconciler()
+    await stop_refresh_token_pruner()
+    await stop_dispatcher()
+    await stop_login_activity()
+    await close_http_client()
+    await close_google_http_client()
+    await engine.dispose()
+    if replica_engine is not None:
+        await replica_engine.dispose()
+
+
 app = FastAPI(
     title="MealBuddy API",
     description="API for MealBuddy - AI-Powered Meal Planning",
     version="0.1.0",
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse,
 )
+app.router.route_class = FastJSONRoute
+
+# Middleware added later wraps the earlier ones: CORS is outermost, so
+# preflights never use up rate limits and 429 responses carry CORS headers
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
+app.add_middleware(ReadYourWritesMiddleware)
 
 # CORS middleware configuration
 app.add_middleware(
@@ -27,6 +72,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
 # Include API router
@@ -40,6 +86,14 @@ async def root():
 async def health_check():
     return {"status": "healthy"}
 
+@app.get("/metrics")
+async def metrics(current_user: User = Depends(get_current_active_superuser)):
+    """Auth cache and connection pool statistics, for superusers only"""
+    stats = {"auth_cache": principal_cache.stats(), "db_pool": pool_metrics(engine)}
+    if replica_engine is not None:
+        stats["db_replica_pool"] = pool_metrics(replica_engine)
+    return stats
+
 # Root endpoint for OpenAPI schema
 @app.get("/openapi.json")
 async def get_openapi_schema():
@@ -0,0 +1,57 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index, UniqueConstraint
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.db.base import Base
+
+
+class InstacartOrderStatus:
+    PENDING = "pending"        # Accepted, waiting for the dispatcher
+    SUBMITTING = "submitting"  # Claimed by a dispatcher, request in flight
+    RETRYING = "retrying"      # Last attempt failed transiently, next_attempt_at is set
+    PLACED = "placed"          # Instacart accepted the order
+    FAILED = "failed"          # Rejected, or out of attempts
+
+    OPEN = (PENDING, SUBMITTING, RETRYING)
+
+
+class InstacartOrder(Base):
+    """Outbox row for a grocery order to be placed with Instacart"""
+    __tablename__ = "instacart_orders"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    idempotency_key = Column(String(64), nullable=False)  # Sent on every attempt, so retries never double-place
+    status = Column(String(20), nullable=False, default=InstacartOrderStatus.PENDING)
+    status_history = Column(JSONB, nullable=False, default=list)  # [{"status", "at", "detail"}]
+
+    items = Column(JSONB, nullable=False, default=list)  # Grocery list items at the time of ordering
+    estimated_cost_cents = Column(Integer, nullable=True)
+
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=True)  # Null once settled
+    last_error = Column(String, nullable=True)
+
+    # Filled in once placed
+    instacart_order_id = Column(String, nullable=True)
+    estimated_delivery_time = Column(String, nullable=True)
+    total_cost_cents = Column(Integer, nullable=True)
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    user = relationship("User")
+
+    __table_args__ = (
+        UniqueConstraint("user_id", "idempotency_key", name="uq_instacart_orders_user_id_idempotency_key"),
+        # The dispatcher only ever scans open orders that are due
+        Index(
+            "ix_instacart_orders_due",
+            "next_attempt_at",
+            postgresql_where=status.in_(InstacartOrderStatus.OPEN),
+        ),
+        Index("ix_instacart_orders_user_id_created_at", "user_id", "created_at"),
+    )
+
+    def __repr__(self):
+        return f"<InstacartOrder(id={self.id}, user_id={self.user_id}, status='{self.status}')>"
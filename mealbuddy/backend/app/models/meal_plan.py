@@ -0,0 +1,56 @@
+from sqlalchemy import Boolean, Column, Integer, String, Date, DateTime, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.sql import func
+from sqlalchemy.orm import relationship
+from app.db.base import Base
+
+
+class MealPlan(Base):
+    """A generated weekly meal plan instance"""
+    __tablename__ = "meal_plans"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    start_date = Column(Date, nullable=False)  # First day (Monday) of the 7-day plan
+    plan_data = Column(JSONB, nullable=False, default=dict)  # Plan as returned to the client
+    version = Column(Integer, nullable=False, default=1)  # Bumped on every swap/shift
+
+    generated_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    user = relationship("User")
+    entries = relationship("MealPlanEntry", back_populates="plan", cascade="all, delete-orphan")
+
+    __table_args__ = (
+        Index("ix_meal_plans_user_id_start_date", "user_id", "start_date"),
+    )
+
+    def __repr__(self):
+        return f"<MealPlan(id={self.id}, user_id={self.user_id}, start_date={self.start_date}, version={self.version})>"
+
+
+class MealPlanEntry(Base):
+    """Individual meal slot within a plan"""
+    __tablename__ = "meal_plan_entries"
+
+    id = Column(Integer, primary_key=True, index=True)
+    plan_id = Column(Integer, ForeignKey("meal_plans.id", ondelete="CASCADE"), nullable=True)  # Null for off-plan meals
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+    date = Column(Date, nullable=False)
+    meal_type = Column(String(20), nullable=False)  # e.g. 'breakfast', 'lunch', 'dinner', 'snack'
+    recipe_id = Column(Integer, ForeignKey("recipes.id", ondelete="SET NULL"), nullable=True)
+    recipe_name = Column(String, nullable=False)
+    servings = Column(Integer, nullable=False, default=1)  # Portions eaten at the meal itself
+    is_swapped = Column(Boolean(), default=False)  # True if user manually swapped it
+    logged_at = Column(DateTime(timezone=True), nullable=True)  # Set once the user logs the meal
+
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    plan = relationship("MealPlan", back_populates="entries")
+
+    __table_args__ = (
+        Index("ix_meal_plan_entries_user_id_date", "user_id", "date"),
+    )
+
+    def __repr__(self):
+        return f"<MealPlanEntry(id={self.id}, date={self.date}, meal_type='{self.meal_type}', recipe_name='{self.recipe_name}')>"
@@ -0,0 +1,91 @@
+from sqlalchemy import Column, Computed, DDL, Index, Integer, String, Text, DateTime, event
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
+from sqlalchemy.orm import validates
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class Recipe(Base):
+    """Recipe catalog model used for search, matching and meal planning"""
+    __tablename__ = "recipes"
+
+    id = Column(Integer, primary_key=True, index=True)
+    title = Column(String(255), nullable=False)
+    description = Column(Text, nullable=True)
+    instructions = Column(Text, nullable=True)
+    cuisine_type = Column(String(50), nullable=True)  # Stored lowercase, e.g. "italian"
+
+    # Timing and servings
+    prep_time_minutes = Column(Integer, nullable=True)
+    cook_time_minutes = Column(Integer, nullable=True)
+    total_time_minutes = Column(
+        Integer,
+        Computed("coalesce(prep_time_minutes, 0) + coalesce(cook_time_minutes, 0)", persisted=True),
+    )
+    serving_size = Column(Integer, nullable=False, default=1)  # Number of servings
+
+    # Ingredients, e.g. [{"item": "chicken breast", "quantity": "500g"}, ...]
+    ingredients = Column(JSONB, nullable=False, default=list)
+    # Space separated ingredient names, kept in sync with `ingredients` for text search
+    ingredient_names = Column(Text, nullable=False, default="")
+    allergens = Column(JSONB, nullable=False, default=list)  # e.g. ["peanuts", "gluten"]
+
+    nutrition = Column(JSONB, default=dict)  # {calories, protein_g, fat_g, carbs_g}
+    cost_estimate_cents = Column(Integer, nullable=True)
+    image_url = Column(Text, nullable=True)
+
+    # Weighted full-text document: title (A), ingredients (B), description (C)
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(ingredient_names, '')), 'B') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'C')",
+            persisted=True,
+        ),
+    )
+
+    # Timestamps
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        Index("ix_recipes_search_vector", "search_vector", postgresql_using="gin"),
+        Index(
+            "ix_recipes_title_trgm", "title",
+            postgresql_using="gin", postgresql_ops={"title": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_recipes_ingredient_names_trgm", "ingredient_names",
+            postgresql_using="gin", postgresql_ops={"ingredient_names": "gin_trgm_ops"},
+        ),
+        Index("ix_recipes_cuisine_total_time", "cuisine_type", "total_time_minutes"),
+    )
+
+    @validates("cuisine_type")
+    def _normalize_cuisine(self, key, value):
+        return value.strip().lower() if value else value
+
+    @validates("allergens")
+    def _normalize_allergens(self, key, value):
+        return [allergen.strip().lower() for allergen in (value or [])]
+
+    @validates("ingredients")
+    def _sync_ingredient_names(self, key, value):
+        value = value or []
+        self.ingredient_names = " ".join(
+            str(ingredient.get("item", "")).strip().lower() for ingredient in value
+        )
+        return value
+
+    def __repr__(self):
+        return f"<Recipe(id={self.id}, title='{self.title}')>"
+
+
+# The trigram indexes need pg_trgm; make sure it exists when tables are created
+# outside of Alembic (e.g. scripts.db_utils.init_db).
+event.listen(
+    Recipe.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
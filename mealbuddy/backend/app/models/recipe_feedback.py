@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
@@ -7,16 +7,22 @@ class RecipeFeedback(Base):
     """Recipe feedback model for user ratings and comments"""
     __tablename__ = "recipe_feedback"
 
-    id = Column(Integer, primary_key=True, index=True)
+    # The primary key includes created_at, as the table is partitioned by it (see app/db/partitions.py)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     recipe_name = Column(String, nullable=False)
     rating = Column(Integer, nullable=False) # e.g., 1-5 stars
     comment = Column(String, nullable=True)
     
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    created_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
     user = relationship("User")
 
+    __table_args__ = (
+        Index("ix_recipe_feedback_user_id_created_at", "user_id", "created_at"),
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
     def __repr__(self):
         return f"<RecipeFeedback(id={self.id}, user_id={self.user_id}, recipe_name='{self.recipe_name}', rating={self.rating})>"
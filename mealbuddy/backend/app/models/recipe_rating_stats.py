@@ -0,0 +1,40 @@
+from sqlalchemy import Column, Integer, Float, String, DateTime, Index
+from sqlalchemy.sql import func
+from app.db.base import Base
+
+
+class RecipeRatingStats(Base):
+    """
+    Running rating aggregates per recipe, kept in step with recipe_feedback.
+
+    Updated in the same transaction as every feedback insert or rating change
+    and periodically reconciled against recipe_feedback.
+    """
+    __tablename__ = "recipe_rating_stats"
+
+    recipe_name = Column(String, primary_key=True)  # As in recipe_feedback.recipe_name
+    rating_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Integer, nullable=False, default=0)
+    rating_sum_squares = Column(Integer, nullable=False, default=0)  # For the variance
+    # Mean shrunk towards RATING_PRIOR_MEAN by RATING_PRIOR_COUNT virtual ratings
+    bayesian_average = Column(Float, nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+    __table_args__ = (
+        # Top-rated listings read the head of this index
+        Index("ix_recipe_rating_stats_bayesian_average", bayesian_average.desc(), "recipe_name"),
+    )
+
+    @property
+    def average_rating(self) -> float:
+        return self.rating_sum / self.rating_count if self.rating_count else 0.0
+
+    @property
+    def rating_stddev(self) -> float:
+        if not self.rating_count:
+            return 0.0
+        variance = self.rating_sum_squares / self.rating_count - self.average_rating ** 2
+        return max(variance, 0.0) ** 0.5
+
+    def __repr__(self):
+        return f"<RecipeRatingStats(recipe_name='{self.recipe_name}', rating_count={self.rating_count}, bayesian_average={self.bayesian_average})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Boolean, Column, Integer, String, DateTime, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
@@ -72,6 +72,7 @@ class User(Base):
     
     # Budget and nutrition goals
     weekly_budget_cents = Column(Integer, nullable=True)  # Weekly budget in cents
+    household_size = Column(Integer, nullable=False, default=1)  # People eating each planned meal
     target_daily_calories = Column(Integer, nullable=True)
     target_protein_g = Column(Integer, nullable=True)
     target_carbs_g = Column(Integer, nullable=True)
@@ -96,12 +97,21 @@ class User(Base):
 
 
 class RefreshToken(Base):
-    """Refresh token model for JWT refresh tokens"""
+    """
+    Refresh token, stored as the SHA-256 of the token handed to the client.
+
+    Every refresh rotates the token: the presented row is marked used and a
+    new one is issued in the same family. Presenting a used or revoked token
+    again means it leaked, and revokes the whole family.
+    """
     __tablename__ = "refresh_tokens"
     
     id = Column(Integer, primary_key=True, index=True)
-    token = Column(String, unique=True, index=True, nullable=False)
+    token_hash = Column(String(64), nullable=False)  # Looked up through its unique index
+    family_id = Column(String(32), index=True, nullable=False)  # Shared by all rotations of one login
     expires_at = Column(DateTime(timezone=True), nullable=False)
+    used_at = Column(DateTime(timezone=True), nullable=True)  # Set when rotated
+    revoked_at = Column(DateTime(timezone=True), nullable=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     
     # Relationships
@@ -110,6 +120,12 @@ class RefreshToken(Base):
     # Timestamps
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+
+    __table_args__ = (
+        UniqueConstraint("token_hash", name="uq_refresh_tokens_token_hash"),
+        Index("ix_refresh_tokens_user_id_expires_at", "user_id", "expires_at"),
+        Index("ix_refresh_tokens_expires_at", "expires_at"),  # Pruning scan
+    )
     
     def __repr__(self):
         return f"<RefreshToken(id={self.id}, user_id={self.user_id})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, DateTime, ForeignKey, Index
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from app.db.base import Base
@@ -7,12 +7,19 @@ class UserWeightLog(Base):
     """User weight log model to track historical weight data"""
     __tablename__ = "user_weight_log"
 
-    id = Column(Integer, primary_key=True, index=True)
+    # The primary key includes logged_at, as the table is partitioned by it (see app/db/partitions.py)
+    id = Column(Integer, primary_key=True, autoincrement=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     weight_kg = Column(Float, nullable=False) # Weight in kilograms
-    logged_at = Column(DateTime(timezone=True), server_default=func.now())
+    logged_at = Column(DateTime(timezone=True), primary_key=True, server_default=func.now())
 
     user = relationship("User")
 
+    __table_args__ = (
+        # History pages and chart aggregates scan one user's rows in time order
+        Index("ix_user_weight_log_user_id_logged_at", "user_id", "logged_at"),
+        {"postgresql_partition_by": "RANGE (logged_at)"},
+    )
+
     def __repr__(self):
         return f"<UserWeightLog(id={self.id}, user_id={self.user_id}, weight_kg={self.weight_kg}, logged_at={self.logged_at})>"
@@ -0,0 +1,47 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.recipe_feedback import RecipeFeedback
+from app.repositories.rating_stats import change_rating, record_rating
+
+
+async def add_feedback(db: AsyncSession, user_id: int, values: Dict[str, Any]) -> RecipeFeedback:
+    feedback = RecipeFeedback(**values, user_id=user_id)
+    db.add(feedback)
+    await record_rating(db, feedback.recipe_name, feedback.rating)
+    await db.commit()
+    await db.refresh(feedback)
+    return feedback
+
+
+async def list_feedback(db: AsyncSession, user_id: int) -> List[RecipeFeedback]:
+    """Feedback a user submitted, newest first"""
+    result = await db.execute(
+        select(RecipeFeedback)
+        .where(RecipeFeedback.user_id == user_id)
+        # Follows the (user_id, created_at) index; ids are only ordered within a partition
+        .order_by(RecipeFeedback.created_at.desc(), RecipeFeedback.id.desc())
+    )
+    return list(result.scalars())
+
+
+async def get_feedback_for_update(db: AsyncSession, user_id: int, feedback_id: int) -> Optional[RecipeFeedback]:
+    """A user's feedback row, locked until the transaction ends"""
+    result = await db.execute(
+        select(RecipeFeedback)
+        .where(RecipeFeedback.id == feedback_id, RecipeFeedback.user_id == user_id)
+        .with_for_update()
+    )
+    return result.scalar_one_or_none()
+
+
+async def update_feedback(db: AsyncSession, feedback: RecipeFeedback, values: Dict[str, Any]) -> RecipeFeedback:
+    old_rating = feedback.rating
+    for field, value in values.items():
+        setattr(feedback, field, value)
+    await change_rating(db, feedback.recipe_name, old_rating, feedback.rating)
+    await db.commit()
+    await db.refresh(feedback)
+    return feedback
@@ -0,0 +1,17 @@
+from typing import Dict, List
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+from app.repositories.users import update_user
+
+
+def get_pantry(user: User) -> List[Dict[str, str]]:
+    """The user's pantry inventory; stored on the user row, so no query"""
+    return user.pantry_inventory or []
+
+
+async def set_pantry(db: AsyncSession, user: User, inventory: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """Replace the user's pantry inventory"""
+    user = await update_user(db, user, {"pantry_inventory": inventory})
+    return get_pantry(user)
@@ -0,0 +1,102 @@
+from typing import List, Optional
+
+from sqlalchemy import delete, func, select, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.recipe_feedback import RecipeFeedback
+from app.models.recipe_rating_stats import RecipeRatingStats
+
+_stats = RecipeRatingStats.__table__
+
+
+def _bayesian_average(count, total):
+    """Works on plain numbers and on SQL expressions alike"""
+    prior_count = settings.RATING_PRIOR_COUNT
+    return (prior_count * float(settings.RATING_PRIOR_MEAN) + total) / (prior_count + count)
+
+
+async def _apply_rating_delta(db: AsyncSession, recipe_name: str, count: int, total: int, squares: int) -> None:
+    # One upsert: the row lock it takes serializes concurrent raters of a recipe
+    stmt = insert(RecipeRatingStats).values(
+        recipe_name=recipe_name,
+        rating_count=count,
+        rating_sum=total,
+        rating_sum_squares=squares,
+        bayesian_average=_bayesian_average(count, total),
+    )
+    new_count = _stats.c.rating_count + stmt.excluded.rating_count
+    new_sum = _stats.c.rating_sum + stmt.excluded.rating_sum
+    await db.execute(stmt.on_conflict_do_update(
+        index_elements=[_stats.c.recipe_name],
+        set_={
+            "rating_count": new_count,
+            "rating_sum": new_sum,
+            "rating_sum_squares": _stats.c.rating_sum_squares + stmt.excluded.rating_sum_squares,
+            "bayesian_average": _bayesian_average(new_count, new_sum),
+            "updated_at": func.now(),
+        },
+    ))
+
+
+async def record_rating(db: AsyncSession, recipe_name: str, rating: int) -> None:
+    """Count a new rating; call in the transaction that adds the feedback"""
+    await _apply_rating_delta(db, recipe_name, 1, rating, rating * rating)
+
+
+async def change_rating(db: AsyncSession, recipe_name: str, old: int, new: int) -> None:
+    """Replace a counted rating; call in the transaction that updates the feedback"""
+    if old != new:
+        await _apply_rating_delta(db, recipe_name, 0, new - old, new * new - old * old)
+
+
+async def get_rating_stats(db: AsyncSession, recipe_name: str) -> Optional[RecipeRatingStats]:
+    return await db.get(RecipeRatingStats, recipe_name)
+
+
+async def list_top_rated(db: AsyncSession, limit: int, min_ratings: int = 1) -> List[RecipeRatingStats]:
+    """Recipes by Bayesian average, best first"""
+    result = await db.execute(
+        select(RecipeRatingStats)
+        .where(RecipeRatingStats.rating_count >= min_ratings)
+        .order_by(RecipeRatingStats.bayesian_average.desc(), RecipeRatingStats.recipe_name)
+        .limit(limit)
+    )
+    return list(result.scalars())
+
+
+async def reconcile_rating_stats(db: AsyncSession) -> int:
+    """
+    Recompute every recipe's aggregates from recipe_feedback and fix rows
+    that drifted (or follow a changed prior). Commits; returns the number of
+    rows corrected.
+
+    The stats table is locked against writes first, so a rating committed
+    concurrently is either already in the recount or applied on top of it
+    once the lock is released, never lost. Reads are not blocked.
+    """
+    await db.execute(text("LOCK TABLE recipe_rating_stats IN EXCLUSIVE MODE"))
+    rating = RecipeFeedback.rating
+    count, total = func.count(), func.sum(rating)
+    recount = insert(RecipeRatingStats).from_select(
+        ["recipe_name", "rating_count", "rating_sum", "rating_sum_squares", "bayesian_average"],
+        select(
+            RecipeFeedback.recipe_name, count, total, func.sum(rating * rating), _bayesian_average(count, total),
+        ).group_by(RecipeFeedback.recipe_name),
+    )
+    columns = ("rating_count", "rating_sum", "rating_sum_squares", "bayesian_average")
+    upserted = await db.execute(recount.on_conflict_do_update(
+        index_elements=[_stats.c.recipe_name],
+        set_={**{name: recount.excluded[name] for name in columns}, "updated_at": func.now()},
+        where=func.row(*(_stats.c[name] for name in columns)).is_distinct_from(
+            func.row(*(recount.excluded[name] for name in columns))
+        ),
+    ))
+    orphaned = await db.execute(
+        delete(RecipeRatingStats)
+        .where(~select(RecipeFeedback.id).where(RecipeFeedback.recipe_name == RecipeRatingStats.recipe_name).exists())
+        .execution_options(synchronize_session=False)
+    )
+    await db.commit()
+    return upserted.rowcount + orphaned.rowcount
@@ -0,0 +1,37 @@
+from typing import Any, Dict, Optional
+
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user import User
+
+
+async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
+    result = await db.execute(select(User).where(User.email == email))
+    return result.scalar_one_or_none()
+
+
+async def get_user_for_google_sign_in(db: AsyncSession, google_id: str, email: str) -> Optional[User]:
+    """The user linked to a Google account, else the one with its email; one query"""
+    result = await db.execute(
+        select(User)
+        .where(or_(User.google_id == google_id, User.email == email))
+        .order_by((User.google_id == google_id).desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def save_user(db: AsyncSession, user: User) -> User:
+    """Insert or update a user and reload its server-side defaults"""
+    db.add(user)
+    await db.commit()
+    await db.refresh(user)
+    return user
+
+
+async def update_user(db: AsyncSession, user: User, values: Dict[str, Any]) -> User:
+    """Apply field values to a user and save it"""
+    for field, value in values.items():
+        setattr(user, field, value)
+    return await save_user(db, user)
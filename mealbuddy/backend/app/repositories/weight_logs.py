@@ -0,0 +1,158 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Set, Tuple
+
+from sqlalchemy import and_, func, insert, literal_column, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.user_weight_log import UserWeightLog
+
+# Bucket widths in days, used to pick the finest bucket that fits the point cap
+BUCKET_DAYS = {"day": 1, "week": 7, "month": 31}
+
+
+async def add_weight_log(db: AsyncSession, user_id: int, values: Dict[str, Any]) -> UserWeightLog:
+    weight_log = UserWeightLog(**values, user_id=user_id)
+    db.add(weight_log)
+    await db.commit()
+    await db.refresh(weight_log)
+    return weight_log
+
+
+async def insert_weight_logs(
+    db: AsyncSession,
+    user_id: int,
+    readings: Sequence[Tuple[datetime, float]],
+    seen: Set[datetime],
+) -> int:
+    """
+    Add one batch of imported (logged_at, weight_kg) readings in a single
+    multi-row INSERT, skipping timestamps the user already has or that are in
+    `seen` (earlier batches of the same import), which is updated. Does not
+    commit, so an import is one transaction. Returns the number inserted.
+    """
+    fresh: Dict[datetime, float] = {}
+    for logged_at, weight_kg in readings:
+        if logged_at not in seen:
+            fresh[logged_at] = weight_kg
+    if fresh:
+        result = await db.execute(
+            select(UserWeightLog.logged_at)
+            .where(UserWeightLog.user_id == user_id, UserWeightLog.logged_at.in_(list(fresh)))
+        )
+        for (logged_at,) in result:
+            fresh.pop(logged_at, None)
+            seen.add(logged_at)
+    seen.update(fresh)
+    if not fresh:
+        return 0
+    await db.execute(
+        insert(UserWeightLog.__table__).values([
+            {"user_id": user_id, "logged_at": logged_at, "weight_kg": weight_kg}
+            for logged_at, weight_kg in fresh.items()
+        ])
+    )
+    return len(fresh)
+
+
+def _in_range(user_id: int, since: Optional[datetime], until: Optional[datetime]) -> List[Any]:
+    filters = [UserWeightLog.user_id == user_id]
+    if since is not None:
+        filters.append(UserWeightLog.logged_at >= since)
+    if until is not None:
+        filters.append(UserWeightLog.logged_at < until)
+    return filters
+
+
+async def list_weight_logs(
+    db: AsyncSession,
+    user_id: int,
+    limit: int,
+    after: Optional[Tuple[datetime, int]] = None,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> Tuple[List[UserWeightLog], bool]:
+    """
+    One page of a user's weight history, oldest first.
+
+    `after` is the (logged_at, id) of the previous page's last row. Returns
+    the rows and whether more follow.
+    """
+    filters = _in_range(user_id, since, until)
+    if after is not None:
+        logged_at, last_id = after
+        filters.append(
+            or_(UserWeightLog.logged_at > logged_at, and_(UserWeightLog.logged_at == logged_at, UserWeightLog.id > last_id))
+        )
+    # Fetch one extra row to know whether another page exists
+    result = await db.execute(
+        select(UserWeightLog)
+        .where(*filters)
+        .order_by(UserWeightLog.logged_at, UserWeightLog.id)
+        .limit(limit + 1)
+    )
+    rows = list(result.scalars())
+    return rows[:limit], len(rows) > limit
+
+
+async def pick_bucket(
+    db: AsyncSession,
+    user_id: int,
+    max_points: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> str:
+    """The finest bucket that covers the user's history in at most max_points buckets"""
+    if since is None or until is None:
+        result = await db.execute(
+            select(func.min(UserWeightLog.logged_at), func.max(UserWeightLog.logged_at))
+            .where(*_in_range(user_id, since, until))
+        )
+        first, last = result.one()
+        since, until = since or first, until or last
+    if since is None or until is None:
+        return "day"
+    span_days = (until - since) / timedelta(days=1) + 1
+    for bucket, days in BUCKET_DAYS.items():
+        if span_days / days <= max_points:
+            return bucket
+    return "month"
+
+
+async def summarize_weight_logs(
+    db: AsyncSession,
+    user_id: int,
+    bucket: str,
+    max_points: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Min, average and max weight per day, week or month (UTC), aggregated in SQL.
+
+    At most max_points buckets are returned: the most recent ones, oldest first.
+    """
+    if bucket not in BUCKET_DAYS:
+        raise ValueError(f"Unknown bucket {bucket!r}")
+    # Inlined rather than bound, so the GROUP BY expression matches the selected one
+    start = func.date_trunc(
+        literal_column(f"'{bucket}'"), func.timezone(literal_column("'UTC'"), UserWeightLog.logged_at)
+    ).label("bucket_start")
+    latest = (
+        select(
+            start,
+            func.min(UserWeightLog.weight_kg).label("min_kg"),
+            func.avg(UserWeightLog.weight_kg).label("avg_kg"),
+            func.max(UserWeightLog.weight_kg).label("max_kg"),
+            func.count().label("entries"),
+        )
+        .where(*_in_range(user_id, since, until))
+        .group_by(start)
+        .order_by(start.desc())
+        .limit(max_points)
+        .subquery()
+    )
+    result = await db.execute(select(latest).order_by(latest.c.bucket_start))
+    return [
+        {**row._mapping, "avg_kg": round(float(row.avg_kg), 2)}
+        for row in result
+    ]
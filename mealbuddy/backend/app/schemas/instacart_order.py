@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+
+
+class InstacartOrderResponse(BaseModel):
+    id: int
+    status: str  # pending, submitting, retrying, placed, failed
+    status_history: List[Dict[str, Any]] = []
+    items: List[Dict[str, Any]] = []
+    estimated_cost_cents: Optional[int] = None
+    attempts: int = 0
+    next_attempt_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+    instacart_order_id: Optional[str] = None
+    estimated_delivery_time: Optional[str] = None
+    total_cost_cents: Optional[int] = None
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
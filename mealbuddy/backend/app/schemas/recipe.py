@@ -0,0 +1,33 @@
+from pydantic import BaseModel
+from typing import Optional, List
+
+
+class RecipeSummary(BaseModel):
+    id: int
+    title: str
+    description: Optional[str] = None
+    cuisine_type: Optional[str] = None
+    prep_time_minutes: Optional[int] = None
+    cook_time_minutes: Optional[int] = None
+    total_time_minutes: Optional[int] = None
+    serving_size: int = 1
+    allergens: List[str] = []
+    cost_estimate_cents: Optional[int] = None
+    image_url: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+
+
+class RecipeSearchResult(RecipeSummary):
+    score: Optional[float] = None  # Relevance, only set for text queries
+
+
+class RecipeSearchPage(BaseModel):
+    items: List[RecipeSearchResult]
+    next_cursor: Optional[str] = None
+
+
+class RecipeRecommendation(BaseModel):
+    recipe_name: str
+    predicted_rating: float  # 1-5, as the user would likely rate it
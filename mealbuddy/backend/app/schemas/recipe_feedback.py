@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, validator
 from typing import Optional
 from datetime import datetime
 
@@ -10,6 +10,17 @@ class RecipeFeedbackBase(BaseModel):
 class RecipeFeedbackCreate(RecipeFeedbackBase):
     pass
 
+class RecipeFeedbackUpdate(BaseModel):
+    rating: Optional[int] = Field(None, ge=1, le=5)
+    comment: Optional[str] = None
+
+    @validator('rating')
+    def rating_not_null(cls, v):
+        # Omit the rating to keep it; a rating can't be removed
+        if v is None:
+            raise ValueError('rating may not be null')
+        return v
+
 class RecipeFeedbackInDB(RecipeFeedbackBase):
     id: int
     user_id: int
@@ -18,3 +29,13 @@ class RecipeFeedbackInDB(RecipeFeedbackBase):
 
     class Config:
         orm_mode = True
+
+class RecipeRatingStatsOut(BaseModel):
+    recipe_name: str
+    rating_count: int
+    average_rating: float
+    rating_stddev: float
+    bayesian_average: float  # What recipes are ranked by
+
+    class Config:
+        orm_mode = True
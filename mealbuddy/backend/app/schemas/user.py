@@ -46,6 +46,7 @@ class UserPreferencesUpdate(BaseModel):
     disliked_ingredients: Optional[List[str]] = []
     preferred_cuisines: Optional[List[str]] = []
     weekly_budget_cents: Optional[int] = Field(None, ge=0)
+    household_size: Optional[int] = Field(None, ge=1, le=20)
 
 
 class UserNutritionUpdate(BaseModel):
@@ -70,6 +71,7 @@ class UserInDBBase(UserBase):
     disliked_ingredients: List[str] = []
     preferred_cuisines: List[str] = []
     weekly_budget_cents: Optional[int] = None
+    household_size: int = 1
     target_daily_calories: Optional[int] = None
     target_protein_g: Optional[int] = None
     target_carbs_g: Optional[int] = None
@@ -98,6 +100,12 @@ class Token(BaseModel):
     """Schema for JWT token"""
     access_token: str
     token_type: str = "bearer"
+    refresh_token: Optional[str] = None
+
+
+class RefreshTokenRequest(BaseModel):
+    """Schema for a token refresh; the refresh_token cookie is used when omitted"""
+    refresh_token: Optional[str] = None
 
 
 class TokenData(BaseModel):
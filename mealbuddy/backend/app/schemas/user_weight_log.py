@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class UserWeightLogBase(BaseModel):
@@ -15,3 +15,20 @@ class UserWeightLogInDB(UserWeightLogBase):
 
     class Config:
         orm_mode = True
+
+class WeightSummaryPoint(BaseModel):
+    bucket_start: datetime  # UTC start of the day, week (Monday) or month
+    min_kg: float
+    avg_kg: float
+    max_kg: float
+    entries: int
+
+class WeightSummary(BaseModel):
+    bucket: str
+    points: List[WeightSummaryPoint]
+
+class WeightImportResult(BaseModel):
+    imported: int
+    duplicates: int  # Timestamps already logged, or repeated within the file
+    invalid: int
+    errors: List[str]  # The first few invalid lines, with line numbers
@@ -4,17 +4,16 @@ from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
+from app.core.security import hash_password, verify_and_update_password
 from app.db.base import get_db
 from app.models.user import User
+from app.repositories.users import get_user_by_email, save_user
+from app.services.principal_cache import get_user_by_subject
 from app.schemas.user import TokenData, User as UserSchema, UserCreate, UserInDB
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # OAuth2 scheme for token authentication
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl=f"{settings.API_V1_STR}/auth/login")
 
@@ -33,31 +32,18 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against a hash"""
-    return pwd_context.verify(plain_password, hashed_password)
-
-
-def get_password_hash(password: str) -> str:
-    """Generate a password hash"""
-    return pwd_context.hash(password)
-
-
-async def get_user(db: AsyncSession, email: str) -> Optional[User]:
-    """Get a user by email"""
-    result = await db.execute(
-        sa.select(User).where(User.email == email)
-    )
-    return result.scalar_one_or_none()
-
-
 async def authenticate_user(db: AsyncSession, email: str, password: str) -> Optional[User]:
     """Authenticate a user with email and password"""
-    user = await get_user(db, email)
+    user = await get_user_by_email(db, email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = await verify_and_update_password(password, user.hashed_password)
+    if not valid:
         return None
+    if new_hash:
+        # The work factor changed since this hash was made
+        user.hashed_password = new_hash
+        await save_user(db, user)
     return user
 
 
@@ -81,7 +67,7 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
     
-    user = await get_user(db, email=token_data.email)
+    user = await get_user_by_subject(db, token_data.email)
     if user is None:
         raise credentials_exception
     return user
@@ -96,10 +82,10 @@ async def get_current_active_user(
     return current_user
 
 
-async def create_user(db: AsyncSession, user_in: UserCreate) -> User:
+async def create_user(db: AsyncSession, user_in: UserCreate, google_id: Optional[str] = None) -> User:
     """Create a new user"""
     # Check if user already exists
-    existing_user = await get_user(db, user_in.email)
+    existing_user = await get_user_by_email(db, user_in.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -107,7 +93,7 @@ async def create_user(db: AsyncSession, user_in: UserCreate) -> User:
         )
     
     # Create new user
-    hashed_password = get_password_hash(user_in.password)
+    hashed_password = await hash_password(user_in.password)
     db_user = User(
         email=user_in.email,
         hashed_password=hashed_password,
@@ -115,19 +101,8 @@ async def create_user(db: AsyncSession, user_in: UserCreate) -> User:
         is_active=True,
         is_superuser=False,
         is_verified=False,
+        google_id=google_id,
     )
     
-    db.add(db_user)
-    await db.commit()
-    await db.refresh(db_user)
-    return db_user
+    return await save_user(db, db_user)
 
-
-async def update_user_last_login(db: AsyncSession, user: User) -> None:
-    """Update the user's last login timestamp"""
-    user.last_login = datetime.utcnow()
-    user.login_count = (user.login_count or 0) + 1
-    db.add(user)
-    await db.commit()
-    await db.refresh(user)
-    return user
@@ -0,0 +1,245 @@
+"""
+Fit a grocery list to the user's weekly budget with ingredient substitutions.
+
+Each list item is a group of options: keep it, or swap it for one of its
+cheaper substitutes. Choosing one option per group so that the savings reach
+the budget gap while the nutritional and preference deviation stays minimal
+is a multiple-choice knapsack, solved exactly by dynamic programming over
+savings in cents. The DP table is one numpy vector updated once per option,
+so a typical week (a few dozen items, a gap of some tens of dollars) solves
+in well under a millisecond.
+"""
+import math
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.services.recipe_index import normalize_name
+from app.services.units import UnitConversionError, convert, to_canonical
+
+# Used when the user has not set a weekly budget
+DEFAULT_WEEKLY_BUDGET_CENTS = 5000
+
+# Macronutrients per 100 g: (protein, carbs, fat)
+MACROS_PER_100G = {
+    "chicken breast": (22.5, 0.0, 2.6),
+    "chicken thighs": (19.7, 0.0, 7.6),
+    "salmon fillets": (20.4, 0.0, 13.4),
+    "tuna": (25.5, 0.0, 1.0),
+    "tilapia": (20.1, 0.0, 1.7),
+    "ground beef": (17.2, 0.0, 20.0),
+    "ground turkey": (17.5, 0.0, 8.3),
+    "berries": (0.7, 14.5, 0.3),
+    "frozen berries": (0.7, 14.5, 0.3),
+    "spinach": (2.9, 3.6, 0.4),
+    "frozen spinach": (3.6, 4.2, 0.4),
+    "quinoa": (14.1, 64.2, 6.1),
+    "brown rice": (7.9, 77.2, 2.9),
+    "black beans": (7.0, 23.0, 0.5),
+    "dried black beans": (21.6, 62.4, 1.4),
+    "cheese": (25.0, 1.3, 33.0),
+    "cheddar block": (25.0, 1.3, 33.0),
+    "avocado": (2.0, 8.5, 14.7),
+    "oats": (16.9, 66.3, 6.9),
+    "eggs": (12.6, 0.7, 9.5),
+    "tofu": (8.1, 1.9, 4.8),
+    "potatoes": (2.0, 17.0, 0.1),
+    "carrots": (0.9, 9.6, 0.2),
+}
+
+# ingredient -> [(substitute, grams of substitute per gram of ingredient, preference penalty)]
+# The penalty expresses how noticeable the swap is at the table, on the same
+# scale as the macro deviation.
+SUBSTITUTES = {
+    "chicken breast": [("chicken thighs", 1.0, 0.02)],
+    "salmon fillets": [("tilapia", 1.0, 0.04), ("tuna", 1.0, 0.06)],
+    "ground beef": [("ground turkey", 1.0, 0.03)],
+    "berries": [("frozen berries", 1.0, 0.01)],
+    "spinach": [("frozen spinach", 1.0, 0.02)],
+    "quinoa": [("brown rice", 1.0, 0.03)],
+    "black beans": [("dried black beans", 0.4, 0.02)],  # dried beans roughly 2.5x when cooked
+    "cheese": [("cheddar block", 1.0, 0.01)],
+}
+
+# Allergen categories of substitutes, matched against the user's allergies
+SUBSTITUTE_ALLERGENS = {
+    "tilapia": frozenset({"fish"}),
+    "tuna": frozenset({"fish"}),
+    "cheddar block": frozenset({"dairy", "milk", "lactose"}),
+}
+
+# Deviation limits: a single swap may shift at most this share of the week's
+# macronutrient mass, and all swaps together (macros plus preference penalties)
+# at most MAX_TOTAL_DEVIATION.
+MAX_SWAP_MACRO_DEVIATION = 0.15
+MAX_TOTAL_DEVIATION = 0.35
+
+
+class _Option(NamedTuple):
+    substitute: str
+    amount: float
+    unit: str
+    price: float
+    savings_cents: int
+    macro_deviation: float
+    deviation: float
+
+
+def _grams(name: str, amount: float, unit: str) -> Optional[float]:
+    try:
+        return convert(amount, unit, "g", name)
+    except UnitConversionError:
+        return None
+
+
+def _macros(name: str, grams: float) -> Optional[np.ndarray]:
+    per_100g = MACROS_PER_100G.get(name)
+    return np.asarray(per_100g) * grams / 100 if per_100g is not None else None
+
+
+def _candidate_options(
+    item: Dict[str, Any],
+    unit_price: Callable[[str, str], Optional[float]],
+    week_macro_grams: float,
+    excluded: Sequence[str],
+    allergies: frozenset,
+) -> List[_Option]:
+    """Cheaper substitutes for one list item that stay within the per-swap limits"""
+    name = item["item"]
+    grams = _grams(name, item["amount"], item["unit"])
+    macros = _macros(name, grams) if grams else None
+    if macros is None:
+        return []
+
+    options = []
+    for substitute, ratio, penalty in SUBSTITUTES.get(name, ()):
+        if substitute in excluded or SUBSTITUTE_ALLERGENS.get(substitute, frozenset()) & allergies:
+            continue
+        sub_grams = grams * ratio
+        amount, unit = to_canonical(substitute, f"{sub_grams} g")
+        price_per_unit = unit_price(substitute, unit)
+        sub_macros = _macros(substitute, sub_grams)
+        if price_per_unit is None or sub_macros is None:
+            continue
+        price = round(amount * price_per_unit, 2)
+        savings_cents = int(round((item["estimated_price"] - price) * 100))
+        macro_deviation = float(np.abs(sub_macros - macros).sum()) / week_macro_grams
+        if savings_cents <= 0 or macro_deviation > MAX_SWAP_MACRO_DEVIATION:
+            continue
+        options.append(_Option(
+            substitute, amount, unit, price, savings_cents, macro_deviation, macro_deviation + penalty
+        ))
+    return options
+
+
+def _solve(groups: List[List[_Option]], target_cents: int) -> List[Optional[_Option]]:
+    """
+    Multiple-choice knapsack: pick at most one option per group.
+
+    best[s] is the minimum total deviation that saves at least s cents. Among
+    the savings levels reachable within MAX_TOTAL_DEVIATION, the solver takes
+    the budget gap if it can, otherwise the largest savings it can reach.
+    """
+    levels = np.arange(target_cents + 1)
+    best = np.full(target_cents + 1, np.inf)
+    best[0] = 0.0
+    choices = []
+    for options in groups:
+        updated = best.copy()
+        choice = np.zeros(target_cents + 1, dtype=np.int16)
+        for number, option in enumerate(options, start=1):
+            candidate = best[np.maximum(levels - option.savings_cents, 0)] + option.deviation
+            better = candidate < updated
+            updated[better] = candidate[better]
+            choice[better] = number
+        best = updated
+        choices.append(choice)
+
+    # best is non-decreasing in s, so the last feasible level is the largest saving
+    level = int(np.searchsorted(best, MAX_TOTAL_DEVIATION, side="right")) - 1
+    picked: List[Optional[_Option]] = [None] * len(groups)
+    for g in range(len(groups) - 1, -1, -1):
+        number = int(choices[g][level])
+        if number:
+            picked[g] = groups[g][number - 1]
+            level = max(level - picked[g].savings_cents, 0)
+    return picked
+
+
+def optimize_budget(
+    items: List[Dict[str, Any]],
+    total_estimated_cost: float,
+    unit_price: Callable[[str, str], Optional[float]],
+    weekly_budget_cents: Optional[int] = None,
+    allergies: Sequence[str] = (),
+    disliked_ingredients: Sequence[str] = (),
+) -> Dict[str, Any]:
+    """
+    Suggest substitutions that bring a grocery list within the weekly budget.
+
+    Returns the chosen substitutions, the resulting total and a short message
+    for the user. The list items themselves are left untouched.
+    """
+    budget_cents = weekly_budget_cents if weekly_budget_cents is not None else DEFAULT_WEEKLY_BUDGET_CENTS
+    result = {
+        "weekly_budget": round(budget_cents / 100, 2),
+        "original_total": total_estimated_cost,
+        "optimized_total": total_estimated_cost,
+        "substitutions": [],
+        "within_budget": True,
+    }
+    gap_cents = int(math.ceil(round(total_estimated_cost * 100 - budget_cents, 6)))
+    if gap_cents <= 0:
+        result["message"] = "Your grocery list is within your weekly budget!"
+        return result
+
+    week_macro_grams = 0.0
+    for item in items:
+        grams = _grams(item["item"], item["amount"], item["unit"])
+        macros = _macros(item["item"], grams) if grams else None
+        if macros is not None:
+            week_macro_grams += float(macros.sum())
+
+    groups: List[Tuple[Dict[str, Any], List[_Option]]] = []
+    if week_macro_grams > 0:
+        excluded = [normalize_name(d) for d in disliked_ingredients]
+        allergy_set = frozenset(normalize_name(a) for a in allergies)
+        for item in items:
+            options = _candidate_options(item, unit_price, week_macro_grams, excluded, allergy_set)
+            if options:
+                groups.append((item, options))
+
+    picked = _solve([options for _, options in groups], gap_cents) if groups else []
+    savings = 0.0
+    for (item, _), option in zip(groups, picked):
+        if option is None:
+            continue
+        savings += item["estimated_price"] - option.price
+        result["substitutions"].append({
+            "item": item["item"],
+            "substitute": option.substitute,
+            "amount": round(option.amount, 2),
+            "unit": option.unit,
+            "original_price": item["estimated_price"],
+            "new_price": option.price,
+            "savings": round(item["estimated_price"] - option.price, 2),
+            "macro_deviation": round(option.macro_deviation, 4),
+        })
+
+    optimized_total = round(total_estimated_cost - savings, 2)
+    result["optimized_total"] = optimized_total
+    result["within_budget"] = optimized_total * 100 <= budget_cents + 1e-6
+    over = f"${total_estimated_cost - budget_cents / 100:.2f} over your ${budget_cents / 100:.2f} budget"
+    if not result["substitutions"]:
+        result["message"] = f"Your grocery list is {over}, and no close substitutes were found."
+    elif result["within_budget"]:
+        result["message"] = (
+            f"Your grocery list is {over}. {len(result['substitutions'])} substitution(s) "
+            f"bring it to ${optimized_total:.2f}."
+        )
+    else:
+        result["message"] = (
+            f"Your grocery list is {over}. The closest substitutions bring it to "
+            f"${optimized_total:.2f}; consider simpler meals to close the rest."
+        )
+    return result
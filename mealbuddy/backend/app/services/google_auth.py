@@ -0,0 +1,156 @@
+"""
+Google sign-in.
+
+The authorization code exchange returns an OpenID id_token alongside the
+access token; its claims carry everything we need (subject, email, name), so
+it is verified locally against Google's signing keys instead of calling the
+userinfo endpoint. The key set (JWKS) is cached for as long as Google's
+Cache-Control allows and refetched early when a token names an unknown key,
+which is how Google's key rotation shows up. If a refetch fails the keys
+already held keep being used; without any, sign-in answers 503.
+"""
+import asyncio
+import logging
+import re
+import time
+from typing import Any, Dict, Optional
+
+import httpx
+from fastapi import HTTPException, status
+from jose import JWTError, jwt
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_TOKEN_URL = "https://oauth2.googleapis.com/token"
+GOOGLE_JWKS_URL = "https://www.googleapis.com/oauth2/v3/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+_DEFAULT_JWKS_TTL_SECONDS = 3600.0
+_MIN_JWKS_REFRESH_SECONDS = 60.0  # Unknown key ids cannot make us refetch more often than this
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_google_http_client() -> httpx.AsyncClient:
+    """Connection-pooled client shared by all Google calls"""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=settings.GOOGLE_HTTP_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=50, max_keepalive_connections=10),
+        )
+    return _client
+
+
+async def close_google_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def _max_age(cache_control: str) -> Optional[float]:
+    match = re.search(r"max-age=(\d+)", cache_control or "")
+    return float(match.group(1)) if match else None
+
+
+class JwksCache:
+    """Google's signing keys, refreshed when stale or when an unknown key id appears"""
+
+    def __init__(self, url: str = GOOGLE_JWKS_URL, client: Optional[httpx.AsyncClient] = None):
+        self.url = url
+        self._client = client
+        self._keys: Dict[str, Dict[str, Any]] = {}
+        self._expires_at = 0.0
+        self._fetched_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def _refresh(self) -> None:
+        client = self._client or get_google_http_client()
+        response = await client.get(self.url)
+        response.raise_for_status()
+        keys = {key["kid"]: key for key in response.json()["keys"]}
+        if not keys:
+            raise ValueError("empty key set")
+        self._keys = keys
+        now = time.monotonic()
+        self._fetched_at = now
+        self._expires_at = now + (_max_age(response.headers.get("cache-control")) or _DEFAULT_JWKS_TTL_SECONDS)
+
+    async def get_key(self, kid: str) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        if kid in self._keys and now < self._expires_at:
+            return self._keys[kid]
+        async with self._lock:
+            # Another request may have refreshed while we waited
+            now = time.monotonic()
+            stale = now >= self._expires_at
+            unknown = kid not in self._keys and now - self._fetched_at >= _MIN_JWKS_REFRESH_SECONDS
+            if stale or unknown:
+                try:
+                    await self._refresh()
+                except (httpx.HTTPError, KeyError, TypeError, ValueError) as e:
+                    if not self._keys:
+                        logger.error("Fetching Google's signing keys failed: %r", e)
+                        raise HTTPException(
+                            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Google sign-in is temporarily unavailable",
+                        )
+                    # Keep the keys we have and try again after a short pause
+                    logger.warning("Refreshing Google's signing keys failed, keeping the cached ones: %r", e)
+                    self._fetched_at = now
+                    self._expires_at = now + _MIN_JWKS_REFRESH_SECONDS
+        return self._keys.get(kid)
+
+
+google_jwks = JwksCache()
+
+
+def _invalid_google_token(reason: str) -> HTTPException:
+    return HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=f"Invalid Google ID token: {reason}")
+
+
+async def verify_google_id_token(
+    id_token: str,
+    access_token: Optional[str] = None,
+    jwks: Optional[JwksCache] = None,
+) -> Dict[str, Any]:
+    """Claims of a Google-issued ID token for our client id; raises 401 if it does not verify"""
+    try:
+        header = jwt.get_unverified_header(id_token)
+    except JWTError as e:
+        raise _invalid_google_token(str(e))
+    key = await (jwks or google_jwks).get_key(header.get("kid", ""))
+    if key is None:
+        raise _invalid_google_token("unknown signing key")
+    try:
+        claims = jwt.decode(
+            id_token,
+            key,
+            algorithms=["RS256"],
+            audience=settings.GOOGLE_CLIENT_ID,
+            access_token=access_token,
+        )
+    except JWTError as e:
+        raise _invalid_google_token(str(e))
+    if claims.get("iss") not in GOOGLE_ISSUERS:
+        raise _invalid_google_token("wrong issuer")
+    return claims
+
+
+async def exchange_google_code(code: str, redirect_uri: str) -> Dict[str, Any]:
+    """Trade an authorization code for Google's token response (access_token, id_token, ...)"""
+    response = await get_google_http_client().post(
+        GOOGLE_TOKEN_URL,
+        data={
+            "code": code,
+            "client_id": settings.GOOGLE_CLIENT_ID,
+            "client_secret": settings.GOOGLE_CLIENT_SECRET,
+            "redirect_uri": redirect_uri,
+            "grant_type": "authorization_code",
+        },
+    )
+    response.raise_for_status()
+    return response.json()
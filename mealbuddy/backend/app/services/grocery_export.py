@@ -0,0 +1,156 @@
+"""
+Streaming grocery list export.
+
+Each format has a generator-based writer that yields the document in chunks,
+so the response is written as it is produced rather than assembled in memory.
+Rendered exports are cached per (plan, plan version, profile version, format):
+a repeated export replays the cached bytes without regenerating the list.
+"""
+import csv
+import html
+import json
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, Iterator, List, NamedTuple, Optional
+
+# Rows rendered per yielded chunk
+CHUNK_ROWS = 64
+_CACHE_MAX_BYTES = 32 * 1024 * 1024
+_CACHE_MAX_ENTRY_BYTES = 1024 * 1024
+
+
+class _ChunkBuffer:
+    """Minimal file-like sink for csv.writer that hands back what was written"""
+
+    def __init__(self):
+        self._parts: List[str] = []
+
+    def write(self, data: str) -> None:
+        self._parts.append(data)
+
+    def drain(self) -> str:
+        data = "".join(self._parts)
+        self._parts.clear()
+        return data
+
+
+def iter_csv(grocery_list: Dict[str, Any]) -> Iterator[str]:
+    buffer = _ChunkBuffer()
+    writer = csv.writer(buffer)
+    writer.writerow(["Item", "Quantity", "Estimated Price"])
+    for number, item in enumerate(grocery_list["items"], start=1):
+        writer.writerow([item["item"], item["quantity"], f"{item['estimated_price']:.2f}"])
+        if number % CHUNK_ROWS == 0:
+            yield buffer.drain()
+    yield buffer.drain()
+
+
+def iter_text(grocery_list: Dict[str, Any]) -> Iterator[str]:
+    yield "Your Grocery List:\n\n"
+    items = grocery_list["items"]
+    for start in range(0, len(items), CHUNK_ROWS):
+        yield "".join(f"- {item['item']}: {item['quantity']}\n" for item in items[start:start + CHUNK_ROWS])
+    yield f"\nTotal Estimated Cost: ${grocery_list['total_estimated_cost']:.2f}\n"
+    if grocery_list.get("budget_optimization_message"):
+        yield f"\n{grocery_list['budget_optimization_message']}\n"
+
+
+def iter_jsonl(grocery_list: Dict[str, Any]) -> Iterator[str]:
+    """One JSON object per item, then a summary line"""
+    items = grocery_list["items"]
+    for start in range(0, len(items), CHUNK_ROWS):
+        yield "".join(json.dumps(item) + "\n" for item in items[start:start + CHUNK_ROWS])
+    yield json.dumps({
+        "total_estimated_cost": grocery_list["total_estimated_cost"],
+        "budget_optimization": grocery_list.get("budget_optimization"),
+        "unmatched_meals": grocery_list.get("unmatched_meals", []),
+    }) + "\n"
+
+
+def iter_html(grocery_list: Dict[str, Any]) -> Iterator[str]:
+    """Printable checklist; print it to PDF from the browser"""
+    yield (
+        "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Grocery List</title>\n"
+        "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse;width:100%}"
+        "td,th{border-bottom:1px solid #ccc;padding:.3em;text-align:left}td.box{width:1.5em}"
+        "td.price,th.price{text-align:right}@media print{body{margin:0}}</style>\n"
+        "</head><body>\n<h1>Grocery List</h1>\n<table>\n"
+        "<tr><th></th><th>Item</th><th>Quantity</th><th class=\"price\">Estimated Price</th></tr>\n"
+    )
+    items = grocery_list["items"]
+    for start in range(0, len(items), CHUNK_ROWS):
+        yield "".join(
+            f"<tr><td class=\"box\">&#9744;</td><td>{html.escape(item['item'])}</td>"
+            f"<td>{html.escape(item['quantity'])}</td>"
+            f"<td class=\"price\">${item['estimated_price']:.2f}</td></tr>\n"
+            for item in items[start:start + CHUNK_ROWS]
+        )
+    yield f"</table>\n<p><strong>Total Estimated Cost: ${grocery_list['total_estimated_cost']:.2f}</strong></p>\n"
+    if grocery_list.get("budget_optimization_message"):
+        yield f"<p>{html.escape(grocery_list['budget_optimization_message'])}</p>\n"
+    yield "</body></html>\n"
+
+
+class ExportFormat(NamedTuple):
+    writer: Callable[[Dict[str, Any]], Iterator[str]]
+    media_type: str
+    extension: str
+
+
+EXPORT_FORMATS: Dict[str, ExportFormat] = {
+    "csv": ExportFormat(iter_csv, "text/csv", "csv"),
+    "text": ExportFormat(iter_text, "text/plain", "txt"),
+    "jsonl": ExportFormat(iter_jsonl, "application/x-ndjson", "jsonl"),
+    "html": ExportFormat(iter_html, "text/html", "html"),
+}
+
+
+# cache key -> rendered chunks, least recently used first
+_export_cache: "OrderedDict[Hashable, List[bytes]]" = OrderedDict()
+_export_cache_bytes = 0
+
+
+def get_cached_export(key: Hashable) -> Optional[List[bytes]]:
+    chunks = _export_cache.get(key)
+    if chunks is not None:
+        _export_cache.move_to_end(key)
+    return chunks
+
+
+def _store_export(key: Hashable, chunks: List[bytes]) -> None:
+    global _export_cache_bytes
+    size = sum(len(chunk) for chunk in chunks)
+    old = _export_cache.pop(key, None)
+    if old is not None:
+        _export_cache_bytes -= sum(len(chunk) for chunk in old)
+    _export_cache[key] = chunks
+    _export_cache_bytes += size
+    while _export_cache_bytes > _CACHE_MAX_BYTES:
+        _, evicted = _export_cache.popitem(last=False)
+        _export_cache_bytes -= sum(len(chunk) for chunk in evicted)
+
+
+async def stream_cached(chunks: List[bytes]) -> AsyncIterator[bytes]:
+    for chunk in chunks:
+        yield chunk
+
+
+async def stream_export(grocery_list: Dict[str, Any], fmt: str, key: Hashable) -> AsyncIterator[bytes]:
+    """
+    Render `grocery_list` in format `fmt`, yielding encoded chunks.
+
+    The chunks are kept and stored under `key` once the whole export has been
+    sent, so an interrupted download never leaves a truncated cache entry.
+    Exports too large to cache are streamed without being retained.
+    """
+    rendered: Optional[List[bytes]] = []
+    size = 0
+    for text in EXPORT_FORMATS[fmt].writer(grocery_list):
+        chunk = text.encode("utf-8")
+        if rendered is not None:
+            size += len(chunk)
+            rendered.append(chunk)
+            if size > _CACHE_MAX_ENTRY_BYTES:
+                rendered = None
+        yield chunk
+    if rendered is not None:
+        _store_export(key, rendered)
@@ -1,46 +1,242 @@
-from typing import List, Dict, Any
-
-async def generate_grocery_list(meal_plan: Dict[str, Any]) -> Dict[str, Any]:
-    """
-    Dummy grocery list generation service.
-    In a real application, this would parse the meal plan and generate a list of ingredients.
-    """
-    print(f"Simulating grocery list generation for meal plan: {meal_plan}")
-    
-    # For demonstration, return a static dummy grocery list
-    grocery_items = [
-        {"item": "chicken breast", "quantity": "1 kg", "estimated_price": 12.50},
-        {"item": "salmon fillets", "quantity": "500g", "estimated_price": 15.00},
-        {"item": "oats", "quantity": "1 box", "estimated_price": 4.00},
-        {"item": "berries", "quantity": "200g", "estimated_price": 3.50},
-        {"item": "spinach", "quantity": "1 bag", "estimated_price": 2.00},
-        {"item": "quinoa", "quantity": "500g", "estimated_price": 6.00},
-        {"item": "black beans", "quantity": "1 can", "estimated_price": 1.50},
-        {"item": "corn", "quantity": "1 can", "estimated_price": 1.20},
-        {"item": "tofu", "quantity": "1 block", "estimated_price": 3.00},
-        {"item": "spaghetti", "quantity": "1 pack", "estimated_price": 2.50},
-        {"item": "ground beef", "quantity": "500g", "estimated_price": 8.00},
-        {"item": "avocado", "quantity": "2", "estimated_price": 4.00},
-        {"item": "tuna", "quantity": "1 can", "estimated_price": 2.00},
-        {"item": "bread", "quantity": "1 loaf", "estimated_price": 3.00},
-        {"item": "pizza dough", "quantity": "1 pack", "estimated_price": 4.00},
-        {"item": "cheese", "quantity": "200g", "estimated_price": 5.00},
-        {"item": "eggs", "quantity": "1 dozen", "estimated_price": 4.50},
-        {"item": "potatoes", "quantity": "1 kg", "estimated_price": 3.00},
-        {"item": "carrots", "quantity": "500g", "estimated_price": 1.80},
-    ]
-
-    total_estimated_cost = sum(item["estimated_price"] for item in grocery_items)
-    budget_optimization_message = ""
-
-    # Simulate some budget optimization logic
-    if total_estimated_cost > 50:
-        budget_optimization_message = "Consider swapping some items for more budget-friendly alternatives to stay under $50."
-    else:
-        budget_optimization_message = "Your grocery list is budget-friendly!"
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.meal_plan import MealPlan
+from app.models.user import User
+from app.services.budget_optimizer import optimize_budget
+from app.services.meal_planner.plan_store import get_or_create_meal_plan, iter_plan_meals
+from app.services.price_catalog import get_price_catalog
+from app.services.recipe_index import IndexedRecipe, RecipeIndex, get_recipe_index, normalize_name
+from app.services.units import to_canonical
+
+# Reference shelf prices: ingredient -> (price in dollars, amount, unit)
+INGREDIENT_PRICES = {
+    "chicken breast": (12.50, 1, "kg"),
+    "salmon fillets": (15.00, 500, "g"),
+    "oats": (4.00, 1, "box"),
+    "berries": (3.50, 200, "g"),
+    "spinach": (2.00, 1, "bag"),
+    "quinoa": (6.00, 500, "g"),
+    "black beans": (1.50, 1, "can"),
+    "corn": (1.20, 1, "can"),
+    "tofu": (3.00, 1, "block"),
+    "spaghetti": (2.50, 1, "pack"),
+    "ground beef": (8.00, 500, "g"),
+    "avocado": (2.00, 1, ""),
+    "tuna": (2.00, 1, "can"),
+    "bread": (3.00, 1, "loaf"),
+    "pizza dough": (4.00, 1, "pack"),
+    "cheese": (5.00, 200, "g"),
+    "eggs": (4.50, 1, "dozen"),
+    "potatoes": (3.00, 1, "kg"),
+    "carrots": (1.80, 500, "g"),
+    # Budget substitutes (see budget_optimizer.SUBSTITUTES)
+    "chicken thighs": (8.00, 1, "kg"),
+    "tilapia": (7.00, 500, "g"),
+    "ground turkey": (6.00, 500, "g"),
+    "frozen berries": (4.00, 500, "g"),
+    "frozen spinach": (1.50, 300, "g"),
+    "brown rice": (2.50, 1, "kg"),
+    "dried black beans": (2.00, 1, "kg"),
+    "cheddar block": (7.00, 450, "g"),
+}
+
+
+def _unit_prices() -> Dict[Tuple[str, str], float]:
+    prices = {}
+    for name, (price, amount, unit) in INGREDIENT_PRICES.items():
+        canonical_amount, canonical_unit = to_canonical(name, f"{amount} {unit}")
+        prices[(name, canonical_unit)] = price / canonical_amount
+    return prices
+
+
+# (ingredient, canonical unit) -> dollars per canonical unit
+_UNIT_PRICES = _unit_prices()
+
+
+def unit_price(name: str, unit: str) -> Optional[float]:
+    """
+    Dollars per canonical unit of an ingredient.
+
+    Uses the current price from the local price catalog when it has the
+    ingredient, otherwise the reference shelf price.
+    """
+    catalog = get_price_catalog()
+    price = catalog.current_price(name, unit) if catalog is not None else None
+    return price if price is not None else _UNIT_PRICES.get((name, unit))
+
+
+def reference_price(item: str, amount: float, unit: str) -> Optional[float]:
+    """Estimated price in dollars for `amount` `unit` of an item, if known"""
+    name = normalize_name(item)
+    canonical_amount, canonical_unit = to_canonical(name, f"{amount} {unit}")
+    price = unit_price(name, canonical_unit)
+    return canonical_amount * price if price is not None else None
+
+
+# Grouping keys are interned to small integer codes shared by every compiled recipe
+_KEY_CODES: Dict[Tuple[str, str], int] = {}
+_KEYS: List[Tuple[str, str]] = []
+
+
+def _key_code(key: Tuple[str, str]) -> int:
+    code = _KEY_CODES.get(key)
+    if code is None:
+        code = _KEY_CODES[key] = len(_KEYS)
+        _KEYS.append(key)
+    return code
+
+
+@lru_cache(maxsize=4096)
+def _compile_recipe(recipe: IndexedRecipe) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Precompute a recipe's per-serving ingredient vectors in canonical units.
+
+    Returns (key codes, canonical amounts per serving, fallback cost per
+    serving). The fallback cost spreads the recipe's cost estimate over its
+    ingredients and is used for items without a reference price.
+    """
+    codes, amounts = [], []
+    for name, quantity in recipe.ingredients:
+        amount, unit = to_canonical(name, quantity)
+        codes.append(_key_code((name, unit)))
+        amounts.append(amount / recipe.serving_size)
+    fallback = (recipe.cost_estimate_cents or 0) / 100 / recipe.serving_size / max(len(codes), 1)
+    return (
+        np.asarray(codes, dtype=np.int64),
+        np.asarray(amounts, dtype=np.float64),
+        np.full(len(codes), fallback, dtype=np.float64),
+    )
+
+
+def _format_quantity(amount: float, unit: str) -> str:
+    if unit == "g" and amount >= 1000:
+        return f"{amount / 1000:.2f} kg"
+    if unit == "ml" and amount >= 1000:
+        return f"{amount / 1000:.2f} l"
+    if unit in ("g", "ml"):
+        return f"{amount:.0f}{unit}"
+    count = f"{amount:.2f}".rstrip("0").rstrip(".")
+    return count if unit == "each" else f"{count} {unit}"
+
+
+def build_grocery_list(
+    meal_plan: Dict[str, Any],
+    index: RecipeIndex,
+    pantry_inventory: Optional[List[Dict[str, str]]] = None,
+    household_size: int = 1,
+    weekly_budget_cents: Optional[int] = None,
+    allergies: Sequence[str] = (),
+    disliked_ingredients: Sequence[str] = (),
+) -> Dict[str, Any]:
+    """
+    Aggregate a meal plan into a consolidated grocery list.
+
+    Every plan entry is resolved to a catalog recipe whose ingredients were
+    precompiled into canonical-unit vectors; the vectors are scaled by the
+    servings needed, concatenated and summed per ingredient with a single
+    group-by. Pantry quantities are then subtracted, prices attached and
+    substitutions suggested when the total exceeds the weekly budget.
+    """
+    parts, unmatched = [], []
+    for _, _, meal_name in iter_plan_meals(meal_plan):
+        recipe = index.resolve(meal_name)
+        if recipe is None:
+            unmatched.append(meal_name)
+            continue
+        codes, amounts, fallback = _compile_recipe(recipe)
+        parts.append((codes, amounts * household_size, fallback * household_size))
+
+    items: List[Dict[str, Any]] = []
+    if parts:
+        codes = np.concatenate([p[0] for p in parts])
+        groups, inverse = np.unique(codes, return_inverse=True)
+        needed = np.bincount(inverse, weights=np.concatenate([p[1] for p in parts]))
+        fallback_cost = np.bincount(inverse, weights=np.concatenate([p[2] for p in parts]))
+
+        # Subtract what is already in the pantry
+        in_pantry = np.zeros_like(needed)
+        if pantry_inventory:
+            position = {code: i for i, code in enumerate(groups.tolist())}
+            for pantry_item in pantry_inventory:
+                name = normalize_name(pantry_item.get("item", ""))
+                amount, unit = to_canonical(name, pantry_item.get("quantity", ""))
+                code = _KEY_CODES.get((name, unit))
+                if code in position:
+                    in_pantry[position[code]] += amount
+        to_buy = np.clip(needed - in_pantry, 0.0, None)
+        remaining_share = np.divide(to_buy, needed, out=np.zeros_like(needed), where=needed > 0)
+
+        unit_prices = np.array(
+            [unit_price(*_KEYS[code]) for code in groups.tolist()], dtype=np.float64
+        )  # None (no price known) becomes NaN
+        prices = np.where(np.isnan(unit_prices), fallback_cost * remaining_share, to_buy * unit_prices)
+
+        keep = to_buy > 1e-9
+        # Back to plain Python values once, rather than per numpy scalar
+        rows = zip(
+            groups[keep].tolist(),
+            to_buy[keep].tolist(),
+            np.round(to_buy[keep], 2).tolist(),
+            np.round(prices[keep], 2).tolist(),
+        )
+        for code, amount, rounded_amount, price in rows:
+            name, unit = _KEYS[code]
+            items.append({
+                "item": name,
+                "quantity": _format_quantity(amount, unit),
+                "amount": rounded_amount,
+                "unit": unit,
+                "estimated_price": price,
+            })
+
+    total_estimated_cost = round(sum(item["estimated_price"] for item in items), 2)
+    budget_optimization = optimize_budget(
+        items, total_estimated_cost, unit_price, weekly_budget_cents, allergies, disliked_ingredients
+    )
 
     return {
-        "items": grocery_items,
+        "items": items,
         "total_estimated_cost": total_estimated_cost,
-        "budget_optimization_message": budget_optimization_message
-    }
\ No newline at end of file
+        "budget_optimization": budget_optimization,
+        "budget_optimization_message": budget_optimization["message"],
+        "unmatched_meals": unmatched,
+    }
+
+
+async def generate_grocery_list(
+    meal_plan: Dict[str, Any],
+    index: RecipeIndex,
+    pantry_inventory: Optional[List[Dict[str, str]]] = None,
+    household_size: int = 1,
+    weekly_budget_cents: Optional[int] = None,
+    allergies: Sequence[str] = (),
+    disliked_ingredients: Sequence[str] = (),
+) -> Dict[str, Any]:
+    """
+    Generate the grocery list for a meal plan, net of the user's pantry.
+    """
+    return build_grocery_list(
+        meal_plan, index, pantry_inventory, household_size,
+        weekly_budget_cents, allergies, disliked_ingredients,
+    )
+
+
+async def generate_user_grocery_list(db: AsyncSession, user: User, plan: Optional[MealPlan] = None) -> Dict[str, Any]:
+    """
+    Grocery list for the user's current stored meal plan.
+    """
+    plan = plan or await get_or_create_meal_plan(db, user)
+    index = await get_recipe_index(db)
+    return await generate_grocery_list(
+        plan.plan_data,
+        index,
+        user.pantry_inventory,
+        user.household_size or 1,
+        user.weekly_budget_cents,
+        user.allergies or [],
+        user.disliked_ingredients or [],
+    )
@@ -1,24 +1,345 @@
-from typing import List, Dict, Any
-import uuid
+"""
+Instacart ordering through a persistent outbox.
+
+Placing an order only writes an `instacart_orders` row; the request returns
+immediately. A background dispatcher claims due rows, resolves the items to
+Instacart products with one batched lookup per batch of orders, and submits
+each order with its idempotency key, so a retry after a timeout can never
+place the same order twice. Transient failures are retried with jittered
+exponential backoff, and every status change is recorded on the row for
+clients to poll.
+"""
 import asyncio
+import hashlib
+import logging
+import random
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.models.instacart_order import InstacartOrder, InstacartOrderStatus
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+# How long a claimed order may stay in flight before another dispatcher retries it
+_CLAIM_LEASE = timedelta(seconds=120)
+
+
+class InstacartError(Exception):
+    """The order was rejected and retrying will not help"""
+
+
+class InstacartRetryableError(InstacartError):
+    """Timeouts, connection errors, 429 and 5xx responses"""
+
+
+def backoff_delay(attempt: int) -> float:
+    """Full-jitter exponential backoff for the given (1-based) attempt"""
+    ceiling = min(settings.INSTACART_BACKOFF_MAX_SECONDS, settings.INSTACART_BACKOFF_BASE_SECONDS * 2 ** (attempt - 1))
+    return random.uniform(0, ceiling)
+
+
+def default_idempotency_key(
+    user_id: int,
+    items: Sequence[Dict[str, Any]],
+    now: Optional[datetime] = None,
+) -> str:
+    """
+    Key derived from the list contents and the current dedupe window, so a
+    double-submitted list is one order while ordering the same list again
+    later places a new one.
+    """
+    now = now or datetime.now(timezone.utc)
+    window = int(now.timestamp()) // settings.INSTACART_DEDUPE_WINDOW_SECONDS
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{user_id}\x1d{window}".encode("utf-8"))
+    for item in items:
+        digest.update(f"\x1f{item['item']}\x1e{item['quantity']}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _transition(order: InstacartOrder, status: str, detail: Optional[str] = None) -> None:
+    order.status = status
+    entry = {"status": status, "at": datetime.now(timezone.utc).isoformat()}
+    if detail:
+        entry["detail"] = detail
+    # Reassign so the JSONB change is tracked
+    order.status_history = [*(order.status_history or []), entry]
+
+
+class InstacartClient:
+    """Thin async client for the Instacart API (or the local stand-in server)"""
+
+    def __init__(self, http: Optional[httpx.AsyncClient] = None):
+        headers = {"Authorization": f"Bearer {settings.INSTACART_API_KEY}"} if settings.INSTACART_API_KEY else {}
+        self._http = http or httpx.AsyncClient(
+            base_url=settings.INSTACART_API_URL,
+            headers=headers,
+            timeout=settings.INSTACART_TIMEOUT_SECONDS,
+        )
+
+    async def aclose(self) -> None:
+        await self._http.aclose()
 
-async def place_instacart_order(grocery_list: List[Dict[str, str]]) -> Dict[str, Any]:
+    async def _post(self, path: str, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        try:
+            response = await self._http.post(path, json=payload, headers=headers)
+        except httpx.HTTPError as e:
+            raise InstacartRetryableError(f"{type(e).__name__}: {e}") from e
+        if response.status_code == 429 or response.status_code >= 500:
+            raise InstacartRetryableError(f"HTTP {response.status_code}")
+        if response.status_code >= 400:
+            raise InstacartError(f"HTTP {response.status_code}: {response.text[:200]}")
+        # Every request is safe to repeat, so an unreadable response is retried
+        try:
+            data = response.json()
+        except ValueError as e:
+            raise InstacartRetryableError(f"Invalid JSON in HTTP {response.status_code} response") from e
+        if not isinstance(data, dict):
+            raise InstacartRetryableError(f"Unexpected HTTP {response.status_code} response: {response.text[:200]}")
+        return data
+
+    async def lookup_products(self, names: Iterable[str]) -> Dict[str, Optional[str]]:
+        """Resolve item names to product ids with a single request"""
+        names = sorted(set(names))
+        if not names:
+            return {}
+        data = await self._post("/v1/products/lookup", {"queries": names})
+        try:
+            return {match["query"]: match.get("product_id") for match in data.get("matches", [])}
+        except (AttributeError, KeyError, TypeError) as e:
+            raise InstacartRetryableError(f"Malformed product lookup response: {e!r}") from e
+
+    async def create_order(self, idempotency_key: str, line_items: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return await self._post(
+            "/v1/orders",
+            {"line_items": line_items},
+            headers={"Idempotency-Key": idempotency_key},
+        )
+
+
+async def enqueue_instacart_order(
+    db: AsyncSession,
+    user: User,
+    grocery_list: Dict[str, Any],
+    idempotency_key: Optional[str] = None,
+) -> Tuple[InstacartOrder, bool]:
     """
-    Dummy Instacart service to simulate placing a grocery order.
-    In a real application, this would involve actual API calls to Instacart.
+    Write an order to the outbox.
+
+    Returns (order, created). Re-submitting with the same idempotency key
+    returns the existing order instead of creating another one.
     """
-    print(f"Simulating Instacart order for: {grocery_list}")
-    # Simulate network delay
-    await asyncio.sleep(2)
-    
-    order_id = str(uuid.uuid4())
-    estimated_delivery_time = "30-60 minutes"
-    total_cost = sum(10 for _ in grocery_list) # Dummy cost
-
-    return {
-        "order_id": order_id,
-        "status": "Order Placed",
-        "estimated_delivery_time": estimated_delivery_time,
-        "total_cost": f"${total_cost:.2f}",
-        "message": "Your order has been placed with Instacart!"
-    }
+    items = [
+        {"item": item["item"], "quantity": item["quantity"], "amount": item["amount"], "unit": item["unit"]}
+        for item in grocery_list["items"]
+    ]
+    now = datetime.now(timezone.utc)
+    key = idempotency_key or default_idempotency_key(user.id, items, now)
+    result = await db.execute(
+        insert(InstacartOrder)
+        .values(
+            user_id=user.id,
+            idempotency_key=key,
+            status=InstacartOrderStatus.PENDING,
+            status_history=[{"status": InstacartOrderStatus.PENDING, "at": now.isoformat()}],
+            items=items,
+            estimated_cost_cents=int(round(grocery_list["total_estimated_cost"] * 100)),
+            attempts=0,
+            next_attempt_at=now,
+        )
+        .on_conflict_do_nothing(constraint="uq_instacart_orders_user_id_idempotency_key")
+        .returning(InstacartOrder.id)
+    )
+    created = result.scalar_one_or_none() is not None
+    await db.commit()
+
+    order = (await db.execute(
+        select(InstacartOrder).where(InstacartOrder.user_id == user.id, InstacartOrder.idempotency_key == key)
+    )).scalar_one()
+    if created:
+        wake_dispatcher()
+    return order, created
+
+
+async def get_instacart_order(db: AsyncSession, user_id: int, order_id: int) -> Optional[InstacartOrder]:
+    result = await db.execute(
+        select(InstacartOrder).where(InstacartOrder.id == order_id, InstacartOrder.user_id == user_id)
+    )
+    return result.scalar_one_or_none()
+
+
+class InstacartDispatcher:
+    """
+    Background worker draining the order outbox.
+
+    Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so several
+    workers or replicas can run dispatchers side by side.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker, client: Optional[InstacartClient] = None):
+        self._session_factory = session_factory
+        self._client = client or InstacartClient()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="instacart-dispatcher")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._client.aclose()
+
+    def wake(self) -> None:
+        self._wakeup.set()
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                dispatched = await self.dispatch_due_orders()
+            except Exception:
+                logger.exception("Instacart dispatch pass failed")
+                dispatched = 0
+            if dispatched < settings.INSTACART_DISPATCH_BATCH_SIZE:
+                # Caught up: sleep until the next poll or a new order arrives
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), settings.INSTACART_DISPATCH_INTERVAL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+
+    async def dispatch_due_orders(self) -> int:
+        """Claim one batch of due orders, send them and record the outcome"""
+        async with self._session_factory() as db:
+            now = datetime.now(timezone.utc)
+            result = await db.execute(
+                select(InstacartOrder)
+                .where(
+                    InstacartOrder.status.in_(InstacartOrderStatus.OPEN),
+                    InstacartOrder.next_attempt_at <= now,
+                )
+                .order_by(InstacartOrder.next_attempt_at)
+                .limit(settings.INSTACART_DISPATCH_BATCH_SIZE)
+                .with_for_update(skip_locked=True)
+            )
+            orders = list(result.scalars())
+            if not orders:
+                return 0
+            due = []
+            for order in orders:
+                if order.attempts >= settings.INSTACART_MAX_ATTEMPTS:
+                    # Its last attempt never recorded an outcome (the worker died or the
+                    # batch failed); give up rather than resend it forever
+                    order.next_attempt_at = None
+                    _transition(order, InstacartOrderStatus.FAILED, f"no outcome after {order.attempts} attempts")
+                    continue
+                order.attempts += 1
+                # Lease: if this worker dies mid-send, the order becomes due again
+                order.next_attempt_at = now + _CLAIM_LEASE
+                _transition(order, InstacartOrderStatus.SUBMITTING, f"attempt {order.attempts}")
+                due.append(order)
+            await db.commit()
+
+            if due:
+                await self.process_batch(due)
+                await db.commit()
+            return len(orders)
+
+    async def process_batch(self, orders: Sequence[InstacartOrder]) -> None:
+        """Look up all items of the batch at once, then submit the orders concurrently"""
+        try:
+            products = await self._client.lookup_products(
+                item["item"] for order in orders for item in order.items
+            )
+        except InstacartError as e:
+            for order in orders:
+                self._record_failure(order, e)
+            return
+        # One order failing unexpectedly must not lose the others' outcomes
+        results = await asyncio.gather(*(self._submit(order, products) for order in orders), return_exceptions=True)
+        for order, result in zip(orders, results):
+            if isinstance(result, Exception):
+                logger.error("Submitting Instacart order %s failed", order.id, exc_info=result)
+                self._record_failure(order, InstacartRetryableError(f"Unexpected error: {result!r}"))
+
+    async def _submit(self, order: InstacartOrder, products: Dict[str, Optional[str]]) -> None:
+        line_items, unavailable = [], []
+        for item in order.items:
+            product_id = products.get(item["item"])
+            if product_id is None:
+                unavailable.append(item["item"])
+                continue
+            line_items.append({"product_id": product_id, "quantity": item["amount"], "unit": item["unit"]})
+        if not line_items:
+            self._record_failure(order, InstacartError("None of the items are available on Instacart"))
+            return
+
+        try:
+            placed = await self._client.create_order(order.idempotency_key, line_items)
+        except InstacartError as e:
+            self._record_failure(order, e)
+            return
+
+        try:
+            instacart_order_id = str(placed["order_id"])
+            total_cents = placed.get("total_cents")
+            total_cents = int(total_cents) if total_cents is not None else None
+            delivery_time = placed.get("estimated_delivery_time")
+        except (KeyError, TypeError, ValueError) as e:
+            # Resending with the same idempotency key returns the order if it was placed
+            self._record_failure(order, InstacartRetryableError(f"Malformed order response: {e!r}"))
+            return
+
+        order.instacart_order_id = instacart_order_id
+        order.estimated_delivery_time = str(delivery_time) if delivery_time is not None else None
+        order.total_cost_cents = total_cents
+        order.next_attempt_at = None
+        order.last_error = None
+        detail = f"unavailable: {', '.join(unavailable)}" if unavailable else None
+        _transition(order, InstacartOrderStatus.PLACED, detail)
+
+    def _record_failure(self, order: InstacartOrder, error: InstacartError) -> None:
+        order.last_error = str(error)
+        if isinstance(error, InstacartRetryableError) and order.attempts < settings.INSTACART_MAX_ATTEMPTS:
+            order.next_attempt_at = datetime.now(timezone.utc) + timedelta(seconds=backoff_delay(order.attempts))
+            _transition(order, InstacartOrderStatus.RETRYING, str(error))
+        else:
+            order.next_attempt_at = None
+            _transition(order, InstacartOrderStatus.FAILED, str(error))
+
+
+_dispatcher: Optional[InstacartDispatcher] = None
+
+
+def start_dispatcher(session_factory: async_sessionmaker) -> InstacartDispatcher:
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = InstacartDispatcher(session_factory)
+        _dispatcher.start()
+    return _dispatcher
+
+
+async def stop_dispatcher() -> None:
+    global _dispatcher
+    if _dispatcher is not None:
+        await _dispatcher.stop()
+        _dispatcher = None
+
+
+def wake_dispatcher() -> None:
+    """Nudge the local dispatcher so a new order is sent without waiting for the next poll"""
+    if _dispatcher is not None:
+        _dispatcher.wake()
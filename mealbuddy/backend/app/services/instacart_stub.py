@@ -0,0 +1,85 @@
+"""
+Local stand-in for the Instacart API.
+
+Implements the two endpoints the dispatcher uses, honours Idempotency-Key the
+way the real API does, and can be told to fail the first N order requests to
+exercise retries. Used by the tests through httpx's ASGI transport, and can be
+run for local development:
+
+    uvicorn app.services.instacart_stub:app --port 8787
+"""
+import uuid
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Header, HTTPException, status
+from pydantic import BaseModel
+
+from app.services.grocery_list_generator import INGREDIENT_PRICES
+from app.services.units import convert, UnitConversionError
+
+
+class ProductLookupRequest(BaseModel):
+    queries: List[str]
+
+
+class LineItem(BaseModel):
+    product_id: str
+    quantity: float
+    unit: str
+
+
+class OrderRequest(BaseModel):
+    line_items: List[LineItem]
+
+
+def create_stub_app(fail_first_orders: int = 0, catalog: Optional[Dict[str, tuple]] = None) -> FastAPI:
+    """
+    Build a stub server.
+
+    `catalog` maps item name -> (price in dollars, amount, unit) and defaults
+    to the grocery reference prices; names outside it are unavailable.
+    """
+    stub = FastAPI(title="Instacart stand-in")
+    catalog = INGREDIENT_PRICES if catalog is None else catalog
+    products = {f"prod_{i}": name for i, name in enumerate(sorted(catalog))}
+    product_ids = {name: product_id for product_id, name in products.items()}
+    orders_by_key: Dict[str, Dict[str, Any]] = {}
+    stub.state.failures_left = fail_first_orders
+    stub.state.order_requests = 0
+
+    @stub.post("/v1/products/lookup")
+    async def lookup_products(request: ProductLookupRequest):
+        return {"matches": [{"query": q, "product_id": product_ids.get(q)} for q in request.queries]}
+
+    @stub.post("/v1/orders")
+    async def create_order(order: OrderRequest, idempotency_key: str = Header(...)):
+        stub.state.order_requests += 1
+        if stub.state.failures_left > 0:
+            stub.state.failures_left -= 1
+            raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Try again later")
+        if idempotency_key in orders_by_key:
+            return orders_by_key[idempotency_key]
+
+        total = 0.0
+        for line in order.line_items:
+            name = products.get(line.product_id)
+            if name is None:
+                raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=f"Unknown product {line.product_id}")
+            price, amount, unit = catalog[name]
+            try:
+                total += price * convert(line.quantity, line.unit, unit or "each", name) / amount
+            except UnitConversionError:
+                total += price
+        placed = {
+            "order_id": str(uuid.uuid4()),
+            "status": "placed",
+            "estimated_delivery_time": "30-60 minutes",
+            "total_cents": int(round(total * 100)),
+        }
+        orders_by_key[idempotency_key] = placed
+        return placed
+
+    return stub
+
+
+app = create_stub_app()
@@ -0,0 +1,151 @@
+"""
+Buffered recording of user logins.
+
+A login only notes the user in memory; a background task periodically writes
+all pending last_login/login_count changes in one
+UPDATE users ... FROM (VALUES ...) statement. Logins skip two database round
+trips, and the users row is no longer rewritten on every authentication,
+where it contended with profile writes.
+"""
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from sqlalchemy import DateTime, Integer, column, func, update, values
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.sql import Update
+
+from app.core.config import settings
+from app.models.user import User
+from app.services.principal_cache import invalidate_principal
+
+logger = logging.getLogger(__name__)
+
+
+class _PendingLogin:
+    __slots__ = ("email", "last_login", "count")
+
+    def __init__(self, email: str, last_login: datetime, count: int = 1):
+        self.email = email
+        self.last_login = last_login
+        self.count = count
+
+
+def build_flush_statement(pending: Dict[int, _PendingLogin]) -> Update:
+    """One UPDATE applying every pending login, joined against a VALUES list"""
+    rows = values(
+        column("id", Integer),
+        column("last_login", DateTime(timezone=True)),
+        column("logins", Integer),
+        name="logins",
+    ).data([(user_id, login.last_login, login.count) for user_id, login in pending.items()])
+    return (
+        update(User)
+        .where(User.id == rows.c.id)
+        .values(
+            last_login=func.greatest(func.coalesce(User.last_login, rows.c.last_login), rows.c.last_login),
+            login_count=func.coalesce(User.login_count, 0) + rows.c.logins,
+            # Keep updated_at meaning "profile changed"
+            updated_at=User.updated_at,
+        )
+        .execution_options(synchronize_session=False)
+    )
+
+
+class LoginActivityRecorder:
+    """Buffers logins per user and flushes them in batches"""
+
+    def __init__(self):
+        self._pending: Dict[int, _PendingLogin] = {}
+        self._session_factory: Optional[async_sessionmaker] = None
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def record(self, user: User, when: Optional[datetime] = None) -> None:
+        """Note a login; written to the database on the next flush"""
+        when = when or datetime.now(timezone.utc)
+        pending = self._pending.get(user.id)
+        if pending is None:
+            self._pending[user.id] = _PendingLogin(user.email, when)
+        else:
+            pending.last_login = max(pending.last_login, when)
+            pending.count += 1
+        if len(self._pending) >= settings.LOGIN_ACTIVITY_MAX_PENDING:
+            self._wakeup.set()
+
+    def _requeue(self, batch: Dict[int, _PendingLogin]) -> None:
+        for user_id, login in batch.items():
+            pending = self._pending.get(user_id)
+            if pending is None:
+                self._pending[user_id] = login
+            else:
+                pending.last_login = max(pending.last_login, login.last_login)
+                pending.count += login.count
+
+    async def flush(self) -> int:
+        """Write all pending logins; returns the number of users updated"""
+        if not self._pending or self._session_factory is None:
+            return 0
+        batch, self._pending = self._pending, {}
+        try:
+            async with self._session_factory() as db:
+                await db.execute(build_flush_statement(batch))
+                await db.commit()
+        except Exception:
+            # Keep the logins for the next attempt
+            self._requeue(batch)
+            raise
+        # The bulk UPDATE bypasses the ORM events that keep the cache fresh
+        for login in batch.values():
+            invalidate_principal(login.email)
+        return len(batch)
+
+    def start(self, session_factory: async_sessionmaker) -> None:
+        self._session_factory = session_factory
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="login-activity-flusher")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.flush()
+        except Exception:
+            logger.exception("Final login activity flush failed; %d users not updated", len(self._pending))
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), settings.LOGIN_ACTIVITY_FLUSH_SECONDS)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                logger.exception("Login activity flush failed")
+
+
+login_activity = LoginActivityRecorder()
+
+
+def record_login(user: User) -> None:
+    login_activity.record(user)
+
+
+def start_login_activity(session_factory: async_sessionmaker) -> None:
+    login_activity.start(session_factory)
+
+
+async def stop_login_activity() -> None:
+    """Stop the periodic flush and write whatever is still buffered"""
+    await login_activity.stop()
@@ -0,0 +1,153 @@
+import heapq
+import time
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Dict, List, Optional, Sequence
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.meal_plan import MealPlanEntry
+from app.models.user import User
+from app.services.recipe_index import RecipeIndex, get_recipe_index, normalize_name
+
+LEFTOVER_SUGGESTION_LIMIT = 4
+# Ingredients found in more than this share of the catalog (salt, oil, ...) are
+# pantry staples rather than leftovers and are ignored for matching.
+STAPLE_DOCUMENT_FREQUENCY = 0.05
+_CACHE_MAX_USERS = 10_000
+
+# user_id -> (computed_at, computed_on, suggestions)
+_suggestion_cache: "OrderedDict[int, tuple]" = OrderedDict()
+
+
+async def get_recent_entries(db: AsyncSession, user_id: int, days: int, today: Optional[date] = None) -> List[MealPlanEntry]:
+    """Plan entries from the last `days` days up to and including today"""
+    today = today or date.today()
+    result = await db.execute(
+        select(MealPlanEntry)
+        .where(
+            MealPlanEntry.user_id == user_id,
+            MealPlanEntry.date >= today - timedelta(days=days),
+            MealPlanEntry.date <= today,
+        )
+        .order_by(MealPlanEntry.date, MealPlanEntry.id)
+    )
+    return list(result.scalars())
+
+
+def estimate_leftovers(
+    entries: Sequence[MealPlanEntry],
+    index: RecipeIndex,
+    household_size: int,
+    today: date,
+) -> Dict[str, float]:
+    """
+    Estimate leftover ingredients from recent meals.
+
+    Each cooked recipe yields `serving_size` portions; whatever the household
+    did not eat is left over. Leftovers are returned as ingredient -> weight,
+    where the weight is the share of the batch left over, boosted for older
+    leftovers that should be used up first.
+    """
+    # A logged meal supersedes whatever was planned for the same slot
+    logged_slots = {(e.date, e.meal_type) for e in entries if e.logged_at is not None}
+
+    leftovers: Dict[str, float] = {}
+    for entry in entries:
+        if entry.logged_at is None:
+            if (entry.date, entry.meal_type) in logged_slots or entry.date >= today:
+                # Replaced by another meal, or not eaten yet
+                continue
+        recipe = index.get(entry.recipe_id) or index.resolve(entry.recipe_name)
+        if recipe is None:
+            continue
+        spare_portions = recipe.serving_size - (entry.servings or household_size)
+        if spare_portions <= 0:
+            continue
+        urgency = 1.0 + 0.5 * (today - entry.date).days
+        weight = spare_portions / recipe.serving_size * urgency
+        for name in recipe.ingredient_names:
+            leftovers[name] = leftovers.get(name, 0.0) + weight
+    return leftovers
+
+
+def rank_leftover_recipes(
+    leftovers: Dict[str, float],
+    index: RecipeIndex,
+    exclude_recipe_ids: Sequence[int] = (),
+    allergies: Sequence[str] = (),
+    disliked_ingredients: Sequence[str] = (),
+    limit: int = LEFTOVER_SUGGESTION_LIMIT,
+) -> List[str]:
+    """
+    Rank catalog recipes by how much of the leftovers they use up.
+
+    Candidates come from the inverted ingredient index, so only recipes that
+    share at least one distinctive ingredient with the leftovers are scored.
+    A recipe scores the leftover weight it covers, scaled up when leftovers
+    make up a larger share of its ingredient list.
+    """
+    staple_cutoff = max(50, int(len(index) * STAPLE_DOCUMENT_FREQUENCY))
+    excluded = set(exclude_recipe_ids)
+    allergies = {normalize_name(a) for a in allergies}
+    disliked = {normalize_name(d) for d in disliked_ingredients}
+
+    candidates = set()
+    for name in leftovers:
+        recipe_ids = index.recipes_with_ingredient(name)
+        if len(recipe_ids) <= staple_cutoff:
+            candidates.update(recipe_ids)
+
+    scored = []
+    for recipe_id in candidates - excluded:
+        recipe = index.by_id[recipe_id]
+        names = recipe.ingredient_names
+        if recipe.allergens & allergies or disliked.intersection(names):
+            continue
+        matched = [leftovers[name] for name in names if name in leftovers]
+        coverage = len(matched) / len(names)
+        scored.append((sum(matched) * (0.5 + coverage), -recipe.id, recipe.title))
+
+    return [title for _, _, title in heapq.nlargest(limit, scored)]
+
+
+async def suggest_leftover_recipes(db: AsyncSession, user: User) -> List[str]:
+    """
+    Suggest "use-up" recipes for the user's leftovers from recent meals.
+
+    Purely local: reads the last LEFTOVER_LOOKBACK_DAYS of plan entries and
+    matches them against the recipe index, no model call. Results are cached
+    per user until a meal is logged, the plan changes or the day rolls over.
+    """
+    today = date.today()
+    cached = _suggestion_cache.get(user.id)
+    if cached is not None:
+        computed_at, computed_on, suggestions = cached
+        if computed_on == today and time.monotonic() - computed_at < settings.LEFTOVER_CACHE_TTL_SECONDS:
+            _suggestion_cache.move_to_end(user.id)
+            return suggestions
+
+    entries = await get_recent_entries(db, user.id, settings.LEFTOVER_LOOKBACK_DAYS, today=today)
+    index = await get_recipe_index(db)
+    household_size = user.household_size or 1
+    leftovers = estimate_leftovers(entries, index, household_size, today)
+    suggestions = rank_leftover_recipes(
+        leftovers,
+        index,
+        exclude_recipe_ids=[e.recipe_id for e in entries if e.recipe_id is not None],
+        allergies=user.allergies or [],
+        disliked_ingredients=user.disliked_ingredients or [],
+    ) if leftovers else []
+
+    _suggestion_cache[user.id] = (time.monotonic(), today, suggestions)
+    _suggestion_cache.move_to_end(user.id)
+    while len(_suggestion_cache) > _CACHE_MAX_USERS:
+        _suggestion_cache.popitem(last=False)
+    return suggestions
+
+
+def invalidate_leftover_suggestions(user_id: int) -> None:
+    """Drop cached suggestions, called whenever the user's meal history changes"""
+    _suggestion_cache.pop(user_id, None)
@@ -1,6 +1,5 @@
 from app.models.user import User, Gender, ActivityLevel, Goal
-from typing import Dict, Any, List
-import random
+from typing import Dict, Any
 from collections import deque
 from app.services.llama_service import generate_text_with_llama
 import json
@@ -96,17 +95,3 @@ async def shift_meal_plan(user: User, current_meal_plan: Dict[str, Any], days_to
             "is_structured": False
         }
     return shifted_plan
-
-async def suggest_leftover_recipes(user: User) -> List[str]:
-    """
-    Simulates suggesting recipes for leftovers.
-    In a real application, this would analyze recent meals and pantry items.
-    """
-    # Dummy suggestions based on common leftovers
-    suggestions = [
-        "Leftover Chicken Tacos",
-        "Stir-fry with leftover vegetables",
-        "Pasta with leftover meat sauce",
-        "Frittata with leftover cooked potatoes and veggies"
-    ]
-    return random.sample(suggestions, k=min(len(suggestions), 2)) # Suggest up to 2
@@ -0,0 +1,171 @@
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.meal_plan import MealPlan, MealPlanEntry
+from app.models.user import User
+from app.services.meal_planner.leftovers import invalidate_leftover_suggestions
+from app.services.meal_planner.plan_generator import generate_meal_plan
+from app.services.recipe_index import RecipeIndex, get_recipe_index
+
+WEEKDAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+
+def current_week_start(today: Optional[date] = None) -> date:
+    """Monday of the week containing `today`"""
+    today = today or date.today()
+    return today - timedelta(days=today.weekday())
+
+
+def iter_plan_meals(plan_data: Dict[str, Any]) -> Iterator[Tuple[int, str, str]]:
+    """Yield (day offset, meal_type, meal name) for every slot of a structured plan"""
+    if not plan_data.get("is_structured"):
+        return
+    for offset, day in enumerate(WEEKDAYS):
+        meals = plan_data.get(day)
+        if not isinstance(meals, dict):
+            continue
+        for meal_type, meal_name in meals.items():
+            if isinstance(meal_name, str) and meal_name:
+                yield offset, meal_type, meal_name
+
+
+def iter_plan_slots(plan_data: Dict[str, Any], start_date: date) -> Iterator[Tuple[date, str, str]]:
+    """Yield (date, meal_type, meal name) for every slot of a structured plan"""
+    for offset, meal_type, meal_name in iter_plan_meals(plan_data):
+        yield start_date + timedelta(days=offset), meal_type, meal_name
+
+
+async def get_current_meal_plan(db: AsyncSession, user_id: int) -> Optional[MealPlan]:
+    """Latest stored plan for the current week, if any"""
+    result = await db.execute(
+        select(MealPlan)
+        .where(MealPlan.user_id == user_id, MealPlan.start_date == current_week_start())
+        .order_by(MealPlan.id.desc())
+        .limit(1)
+    )
+    return result.scalar_one_or_none()
+
+
+async def get_or_create_meal_plan(db: AsyncSession, user: User) -> MealPlan:
+    """Current week's stored plan, generating and storing one on first access"""
+    plan = await get_current_meal_plan(db, user.id)
+    if plan is None:
+        meal_plan = await generate_meal_plan(user)
+        plan = await save_meal_plan(db, user, meal_plan, await get_recipe_index(db))
+    return plan
+
+
+async def save_meal_plan(
+    db: AsyncSession,
+    user: User,
+    plan_data: Dict[str, Any],
+    index: RecipeIndex,
+    plan: Optional[MealPlan] = None,
+    swapped_slot: Optional[Tuple[str, str]] = None,
+) -> MealPlan:
+    """
+    Store a generated plan and its entries.
+
+    When an existing plan is passed its data is replaced and its version bumped.
+    Entries the user already logged are kept as history; all other entries are
+    rebuilt from the new plan data.
+    """
+    if plan is None:
+        plan = MealPlan(user_id=user.id, start_date=current_week_start(), plan_data=plan_data, version=1)
+        db.add(plan)
+        await db.flush()
+        logged = set()
+    else:
+        plan.plan_data = plan_data
+        plan.version = (plan.version or 1) + 1
+        result = await db.execute(
+            select(MealPlanEntry.date, MealPlanEntry.meal_type).where(
+                MealPlanEntry.plan_id == plan.id, MealPlanEntry.logged_at.is_not(None)
+            )
+        )
+        logged = {(row.date, row.meal_type) for row in result}
+        await db.execute(
+            delete(MealPlanEntry).where(
+                MealPlanEntry.plan_id == plan.id, MealPlanEntry.logged_at.is_(None)
+            )
+        )
+
+    swapped_key = None
+    if swapped_slot and swapped_slot[0].lower() in WEEKDAYS:
+        day, meal_type = swapped_slot
+        swapped_key = (plan.start_date + timedelta(days=WEEKDAYS.index(day.lower())), meal_type)
+
+    for entry_date, meal_type, meal_name in iter_plan_slots(plan_data, plan.start_date):
+        if (entry_date, meal_type) in logged:
+            continue
+        recipe = index.resolve(meal_name)
+        db.add(MealPlanEntry(
+            plan_id=plan.id,
+            user_id=user.id,
+            date=entry_date,
+            meal_type=meal_type,
+            recipe_id=recipe.id if recipe else None,
+            recipe_name=meal_name,
+            servings=user.household_size or 1,
+            is_swapped=(entry_date, meal_type) == swapped_key,
+        ))
+
+    db.add(plan)
+    await db.commit()
+    await db.refresh(plan)
+    invalidate_leftover_suggestions(user.id)
+    return plan
+
+
+async def log_meal(
+    db: AsyncSession,
+    user: User,
+    meal_type: str,
+    meal_date: Optional[date] = None,
+    recipe_name: Optional[str] = None,
+    servings: Optional[int] = None,
+    index: Optional[RecipeIndex] = None,
+) -> MealPlanEntry:
+    """
+    Record that the user ate a meal.
+
+    Marks the matching planned entry as logged, or records an off-plan entry
+    when nothing was planned for that slot or a different recipe was eaten.
+    """
+    meal_date = meal_date or date.today()
+    result = await db.execute(
+        select(MealPlanEntry)
+        .where(
+            MealPlanEntry.user_id == user.id,
+            MealPlanEntry.date == meal_date,
+            MealPlanEntry.meal_type == meal_type,
+            MealPlanEntry.logged_at.is_(None),
+        )
+        .order_by(MealPlanEntry.id.desc())
+        .limit(1)
+    )
+    entry = result.scalar_one_or_none()
+
+    if entry is None or (recipe_name and recipe_name.lower() != entry.recipe_name.lower()):
+        if not recipe_name:
+            raise ValueError("recipe_name is required for meals that were not planned")
+        recipe = index.resolve(recipe_name) if index else None
+        entry = MealPlanEntry(
+            user_id=user.id,
+            date=meal_date,
+            meal_type=meal_type,
+            recipe_id=recipe.id if recipe else None,
+            recipe_name=recipe_name,
+        )
+
+    entry.servings = servings or entry.servings or user.household_size or 1
+    entry.logged_at = datetime.now(timezone.utc)
+    db.add(entry)
+    await db.commit()
+    await db.refresh(entry)
+    invalidate_leftover_suggestions(user.id)
+    return entry
+
@@ -0,0 +1,256 @@
+"""
+Local price catalog built from retailer price observations.
+
+Observations are stored column-wise as flat .npy arrays (day, price per
+canonical unit), sorted by series and day, where a series is one
+(ingredient, canonical unit, region). Readers memory-map the arrays, so
+opening the catalog is instant whatever its size, and a query slices one
+series' contiguous run: a current price or trend costs microseconds and is
+memoized until the catalog changes.
+
+Each ingest writes a complete new version directory and then flips the
+CURRENT pointer file, so readers never see a half-written catalog.
+"""
+import csv
+import json
+import os
+import shutil
+import time
+from datetime import date, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.recipe_index import normalize_name
+from app.services.units import to_canonical
+
+NATIONAL = "national"  # Series aggregating every region
+CURRENT_WINDOW_DAYS = 14  # Observations the current price is the median of
+_EPOCH = date(1970, 1, 1)
+_INGEST_CHUNK_ROWS = 100_000
+_RELOAD_CHECK_SECONDS = 30.0
+
+SeriesKey = Tuple[str, str, str]  # (ingredient, canonical unit, region)
+
+
+class PriceCatalog:
+    """Read-only view over one catalog version"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path / "series.json", encoding="utf-8") as f:
+            series = [tuple(key) for key in json.load(f)["series"]]
+        self.series: Dict[SeriesKey, int] = {key: i for i, key in enumerate(series)}
+        self.offsets = np.load(path / "offsets.npy")
+        self.days = np.load(path / "days.npy", mmap_mode="r")
+        self.prices = np.load(path / "prices.npy", mmap_mode="r")
+        # Bound per instance, so a reload starts with a cold cache
+        self.current_price = lru_cache(maxsize=65536)(self._current_price)
+        self.price_trend = lru_cache(maxsize=8192)(self._price_trend)
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def _slice(self, ingredient: str, unit: str, region: Optional[str]) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        number = self.series.get((normalize_name(ingredient), unit, region or NATIONAL))
+        if number is None and region not in (None, NATIONAL):
+            number = self.series.get((normalize_name(ingredient), unit, NATIONAL))
+        if number is None:
+            return None
+        start, end = int(self.offsets[number]), int(self.offsets[number + 1])
+        return self.days[start:end], self.prices[start:end]
+
+    def _current_price(self, ingredient: str, unit: str, region: Optional[str] = None) -> Optional[float]:
+        """Median price per canonical unit over the series' most recent observations"""
+        found = self._slice(ingredient, unit, region)
+        if found is None:
+            return None
+        days, prices = found
+        recent = np.searchsorted(days, days[-1] - CURRENT_WINDOW_DAYS + 1)
+        return float(np.median(prices[recent:]))
+
+    def _price_trend(self, ingredient: str, unit: str, region: Optional[str] = None, days: int = 90) -> Optional[Dict[str, Any]]:
+        """
+        Price movement over the last `days` days of the series.
+
+        Reports the least-squares slope as percent change per 30 days, and the
+        change between the first and last CURRENT_WINDOW_DAYS medians.
+        """
+        found = self._slice(ingredient, unit, region)
+        if found is None:
+            return None
+        series_days, series_prices = found
+        first = np.searchsorted(series_days, series_days[-1] - days + 1)
+        window_days = np.asarray(series_days[first:], dtype=np.float64)
+        window_prices = np.asarray(series_prices[first:], dtype=np.float64)
+
+        current = float(np.median(window_prices[window_days > window_days[-1] - CURRENT_WINDOW_DAYS]))
+        opening = float(np.median(window_prices[window_days < window_days[0] + CURRENT_WINDOW_DAYS]))
+        slope = float(np.polyfit(window_days, window_prices, 1)[0]) if np.ptp(window_days) > 0 else 0.0
+        return {
+            "ingredient": normalize_name(ingredient),
+            "unit": unit,
+            "region": region or NATIONAL,
+            "from": (_EPOCH + timedelta(days=int(window_days[0]))).isoformat(),
+            "to": (_EPOCH + timedelta(days=int(window_days[-1]))).isoformat(),
+            "observations": len(window_prices),
+            "current_unit_price": round(current, 6),
+            "change_pct": round((current / opening - 1) * 100, 2) if opening else None,
+            "slope_pct_per_30_days": round(slope * 30 / current * 100, 2) if current else None,
+        }
+
+
+def _version_dir(root: Path) -> Optional[Path]:
+    pointer = root / "CURRENT"
+    if not pointer.exists():
+        return None
+    return root / pointer.read_text(encoding="utf-8").strip()
+
+
+_catalog: Optional[PriceCatalog] = None
+_checked_at = 0.0
+
+
+def get_price_catalog() -> Optional[PriceCatalog]:
+    """The process-wide catalog, or None if nothing was ingested yet; picks up new versions"""
+    global _catalog, _checked_at
+    now = time.monotonic()
+    if now - _checked_at < _RELOAD_CHECK_SECONDS:
+        return _catalog
+    _checked_at = now
+    path = _version_dir(Path(settings.PRICE_CATALOG_DIR))
+    if path is None:
+        _catalog = None
+    elif _catalog is None or _catalog.path != path:
+        _catalog = PriceCatalog(path)
+    return _catalog
+
+
+def reset_price_catalog() -> None:
+    """Forget the loaded catalog; the next access reopens the current version"""
+    global _catalog, _checked_at
+    _catalog, _checked_at = None, 0.0
+
+
+def read_observations(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Stream rows from a retailer dump, CSV (with a header) or JSON Lines.
+
+    Expected fields: ingredient, date (ISO), price (dollars), and optionally
+    quantity (what the price buys, e.g. "500 g"; default one unit) and region.
+    """
+    with open(path, encoding="utf-8", newline="") as f:
+        if path.suffix.lower() in (".jsonl", ".ndjson"):
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(f)
+
+
+def _to_columns(rows: Iterable[Dict[str, Any]], series: Dict[SeriesKey, int]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, int]:
+    """Convert rows to (series, day, unit price) columns; returns the number of skipped rows"""
+    codes: List[int] = []
+    days: List[int] = []
+    prices: List[float] = []
+    skipped = 0
+    for row in rows:
+        try:
+            ingredient = normalize_name(row["ingredient"])
+            amount, unit = to_canonical(ingredient, str(row.get("quantity") or "1"))
+            unit_price = float(row["price"]) / amount
+            day = (date.fromisoformat(str(row["date"])[:10]) - _EPOCH).days
+        except (KeyError, TypeError, ValueError, ZeroDivisionError):
+            skipped += 1
+            continue
+        if not ingredient or not np.isfinite(unit_price) or unit_price <= 0:
+            skipped += 1
+            continue
+        region = normalize_name(row.get("region") or NATIONAL)
+        for key in {(ingredient, unit, region), (ingredient, unit, NATIONAL)}:
+            codes.append(series.setdefault(key, len(series)))
+            days.append(day)
+            prices.append(unit_price)
+    return (
+        np.asarray(codes, dtype=np.int32),
+        np.asarray(days, dtype=np.int32),
+        np.asarray(prices, dtype=np.float32),
+        skipped,
+    )
+
+
+def ingest_observations(rows: Iterable[Dict[str, Any]], root: Optional[Path] = None) -> Dict[str, int]:
+    """
+    Merge price observations into the catalog and publish a new version.
+
+    Rows are converted in chunks, merged with the current version, sorted by
+    (series, day), de-duplicated and written as a new version directory.
+    """
+    root = Path(root or settings.PRICE_CATALOG_DIR)
+    root.mkdir(parents=True, exist_ok=True)
+
+    series: Dict[SeriesKey, int] = {}
+    code_parts, day_parts, price_parts = [], [], []
+    current = _version_dir(root)
+    if current is not None:
+        existing = PriceCatalog(current)
+        series = dict(existing.series)
+        lengths = np.diff(existing.offsets)
+        code_parts.append(np.repeat(np.arange(len(lengths), dtype=np.int32), lengths))
+        day_parts.append(np.asarray(existing.days))
+        price_parts.append(np.asarray(existing.prices))
+
+    counts = {"ingested": 0, "skipped": 0}
+
+    def add(chunk: List[Dict[str, Any]]) -> None:
+        codes, days, prices, bad = _to_columns(chunk, series)
+        code_parts.append(codes)
+        day_parts.append(days)
+        price_parts.append(prices)
+        counts["ingested"] += len(chunk) - bad
+        counts["skipped"] += bad
+
+    chunk: List[Dict[str, Any]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == _INGEST_CHUNK_ROWS:
+            add(chunk)
+            chunk = []
+    if chunk:
+        add(chunk)
+
+    codes = np.concatenate(code_parts) if code_parts else np.empty(0, dtype=np.int32)
+    days = np.concatenate(day_parts) if day_parts else np.empty(0, dtype=np.int32)
+    prices = np.concatenate(price_parts) if price_parts else np.empty(0, dtype=np.float32)
+    order = np.lexsort((prices, days, codes))
+    codes, days, prices = codes[order], days[order], prices[order]
+    # Re-ingesting the same dump must not double-count it
+    keep = np.ones(len(codes), dtype=bool)
+    keep[1:] = (codes[1:] != codes[:-1]) | (days[1:] != days[:-1]) | (prices[1:] != prices[:-1])
+    codes, days, prices = codes[keep], days[keep], prices[keep]
+    offsets = np.searchsorted(codes, np.arange(len(series) + 1)).astype(np.int64)
+
+    version = f"v{time.time_ns()}"
+    path = root / version
+    path.mkdir()
+    np.save(path / "days.npy", days)
+    np.save(path / "prices.npy", prices)
+    np.save(path / "offsets.npy", offsets)
+    with open(path / "series.json", "w", encoding="utf-8") as f:
+        json.dump({"series": [list(key) for key in sorted(series, key=series.get)]}, f)
+
+    pointer = root / "CURRENT.tmp"
+    pointer.write_text(version, encoding="utf-8")
+    os.replace(pointer, root / "CURRENT")
+    reset_price_catalog()
+
+    # Keep the previous version for readers that still have it open
+    keep_versions = {version, current.name if current is not None else None}
+    for old in root.glob("v*"):
+        if old.is_dir() and old.name not in keep_versions:
+            shutil.rmtree(old, ignore_errors=True)
+
+    return {**counts, "observations": int(len(prices)), "series": len(series)}
@@ -0,0 +1,126 @@
+"""
+Cache of authenticated users, keyed by token subject (the user's email).
+
+Authenticated requests resolve their user from here instead of querying the
+users table every time. Entries are plain column snapshots: each request
+gets its own instance attached to its own session, so endpoints can modify
+and commit the user as before. Any committed ORM write to a user (profile,
+preferences, inventory, deactivation, password rehash) evicts the entry, and
+the short TTL bounds staleness across worker processes.
+"""
+import copy
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, make_transient_to_detached
+
+from app.core.config import settings
+from app.db.routing import is_replica_session
+from app.models.user import User
+
+_COLUMNS = tuple(attr.key for attr in inspect(User).column_attrs)
+_PENDING_KEY = "principal_cache_invalidate"
+
+
+class PrincipalCache:
+    """Size-bounded LRU with per-entry TTL and hit/miss counters"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def get(self, subject: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(subject)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[subject]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(subject)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, subject: str, user: User) -> None:
+        snapshot = {key: copy.deepcopy(getattr(user, key)) for key in _COLUMNS}
+        self._entries[subject] = (time.monotonic() + self.ttl_seconds, snapshot)
+        self._entries.move_to_end(subject)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, subject: str) -> None:
+        if self._entries.pop(subject, None) is not None:
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+principal_cache = PrincipalCache(settings.AUTH_CACHE_TTL_SECONDS, settings.AUTH_CACHE_MAX_ENTRIES)
+
+
+async def get_user_by_subject(db: AsyncSession, subject: str) -> Optional[User]:
+    """
+    The user a token subject refers to, from the cache when possible.
+
+    Rows loaded from a replica are not cached: a lagging replica could
+    re-cache a row that a write on the primary has just evicted.
+    """
+    snapshot = principal_cache.get(subject)
+    if snapshot is None:
+        result = await db.execute(select(User).where(User.email == subject))
+        user = result.scalar_one_or_none()
+        if user is not None and not is_replica_session(db):
+            principal_cache.put(subject, user)
+        return user
+
+    # A private copy, marked as freshly loaded, then attached without a query
+    user = User(**copy.deepcopy(snapshot))
+    make_transient_to_detached(user)
+    return await db.merge(user, load=False)
+
+
+def invalidate_principal(subject: str) -> None:
+    """Evict a user explicitly, e.g. after a write that bypasses the ORM"""
+    principal_cache.invalidate(subject)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _queue_invalidation(mapper, connection, target: User) -> None:
+    # Evict now and again once the write is committed, so a concurrent request
+    # cannot re-cache the old row in between
+    principal_cache.invalidate(target.email)
+    session = Session.object_session(target)
+    if session is None:
+        return
+    pending = session.info.setdefault(_PENDING_KEY, set())
+    pending.add(target.email)
+    pending.update(inspect(target).attrs.email.history.deleted or ())
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(session: Session) -> None:
+    for subject in session.info.pop(_PENDING_KEY, ()):
+        principal_cache.invalidate(subject)
+
+
+@event.listens_for(Session, "after_rollback")
+def _drop_invalidations(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
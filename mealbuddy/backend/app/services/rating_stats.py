@@ -0,0 +1,67 @@
+"""
+Periodic reconciliation of recipe_rating_stats.
+
+The aggregates are maintained incrementally by every feedback write (see
+app/repositories/rating_stats.py), so ranking never scans recipe_feedback.
+This job recounts them from recipe_feedback now and then, repairing drift
+from writes that bypassed the repository and applying a changed prior.
+"""
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy.ext.asyncio import async_sessionmaker
+
+from app.core.config import settings
+from app.repositories.rating_stats import reconcile_rating_stats
+
+logger = logging.getLogger(__name__)
+
+
+class RatingStatsReconciler:
+    """Background task running reconcile_rating_stats periodically"""
+
+    def __init__(self, session_factory: async_sessionmaker):
+        self._session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="rating-stats-reconciler")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(settings.RATING_STATS_RECONCILE_INTERVAL_SECONDS)
+            try:
+                async with self._session_factory() as db:
+                    corrected = await reconcile_rating_stats(db)
+                if corrected:
+                    logger.warning("Corrected rating stats of %d recipes", corrected)
+            except Exception:
+                logger.exception("Rating stats reconciliation failed")
+
+
+_reconciler: Optional[RatingStatsReconciler] = None
+
+
+def start_rating_stats_reconciler(session_factory: async_sessionmaker) -> None:
+    global _reconciler
+    if _reconciler is None:
+        _reconciler = RatingStatsReconciler(session_factory)
+        _reconciler.start()
+
+
+async def stop_rating_stats_reconciler() -> None:
+    global _reconciler
+    if _reconciler is not None:
+        await _reconciler.stop()
+        _reconciler = None
@@ -0,0 +1,125 @@
+import asyncio
+import hashlib
+import time
+from dataclasses import dataclass
+from functools import cached_property
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import settings
+from app.models.recipe import Recipe
+
+
+@dataclass(frozen=True)
+class IndexedRecipe:
+    """Read-only, in-memory view of a catalog recipe"""
+    id: int
+    title: str
+    serving_size: int
+    ingredients: Tuple[Tuple[str, str], ...]  # (normalized item name, quantity string)
+    allergens: FrozenSet[str]
+    cost_estimate_cents: Optional[int] = None
+
+    @property
+    def ingredient_names(self) -> Tuple[str, ...]:
+        return tuple(name for name, _ in self.ingredients)
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a recipe title or ingredient name for lookups"""
+    return " ".join(str(name).lower().split())
+
+
+class RecipeIndex:
+    """
+    In-memory lookup tables over the recipe catalog.
+
+    Holds title -> recipe and ingredient -> recipes maps so that plan entries
+    can be resolved and leftovers matched without a database round trip.
+    """
+
+    def __init__(self, recipes: Iterable[IndexedRecipe]):
+        self.by_id: Dict[int, IndexedRecipe] = {}
+        self.by_title: Dict[str, IndexedRecipe] = {}
+        self.by_ingredient: Dict[str, List[int]] = {}
+        for recipe in recipes:
+            self.by_id[recipe.id] = recipe
+            self.by_title.setdefault(normalize_name(recipe.title), recipe)
+            for name in set(recipe.ingredient_names):
+                self.by_ingredient.setdefault(name, []).append(recipe.id)
+
+    def __len__(self) -> int:
+        return len(self.by_id)
+
+    @cached_property
+    def fingerprint(self) -> str:
+        """Content hash of the catalog, stable across processes"""
+        digest = hashlib.blake2b(digest_size=12)
+        for recipe_id in sorted(self.by_id):
+            digest.update(repr(self.by_id[recipe_id]).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, recipe_id: Optional[int]) -> Optional[IndexedRecipe]:
+        return self.by_id.get(recipe_id) if recipe_id is not None else None
+
+    def resolve(self, title: Optional[str]) -> Optional[IndexedRecipe]:
+        """Resolve a meal name from a plan to a catalog recipe by title"""
+        return self.by_title.get(normalize_name(title)) if title else None
+
+    def recipes_with_ingredient(self, name: str) -> List[int]:
+        return self.by_ingredient.get(normalize_name(name), [])
+
+
+_index: Optional[RecipeIndex] = None
+_loaded_at = 0.0
+_lock = asyncio.Lock()
+
+
+async def load_recipe_index(db: AsyncSession) -> RecipeIndex:
+    """Build a fresh index from the recipes table"""
+    result = await db.execute(
+        select(
+            Recipe.id,
+            Recipe.title,
+            Recipe.serving_size,
+            Recipe.ingredients,
+            Recipe.allergens,
+            Recipe.cost_estimate_cents,
+        )
+    )
+    return RecipeIndex(
+        IndexedRecipe(
+            id=row.id,
+            title=row.title,
+            serving_size=max(row.serving_size or 1, 1),
+            ingredients=tuple(
+                (normalize_name(item.get("item", "")), str(item.get("quantity", "")))
+                for item in (row.ingredients or [])
+                if item.get("item")
+            ),
+            allergens=frozenset(row.allergens or []),
+            cost_estimate_cents=row.cost_estimate_cents,
+        )
+        for row in result
+    )
+
+
+async def get_recipe_index(db: AsyncSession) -> RecipeIndex:
+    """Return the process-wide recipe index, reloading it once it is older than the TTL"""
+    global _index, _loaded_at
+    if _index is not None and time.monotonic() - _loaded_at < settings.RECIPE_INDEX_TTL_SECONDS:
+        return _index
+    async with _lock:
+        # Another request may have reloaded it while we waited
+        if _index is None or time.monotonic() - _loaded_at >= settings.RECIPE_INDEX_TTL_SECONDS:
+            _index = await load_recipe_index(db)
+            _loaded_at = time.monotonic()
+    return _index
+
+
+def invalidate_recipe_index() -> None:
+    """Force a reload on next access, e.g. after the catalog was changed"""
+    global _loaded_at
+    _loaded_at = 0.0
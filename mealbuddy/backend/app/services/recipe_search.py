@@ -0,0 +1,119 @@
+from typing import Dict, Any, List, Optional, Tuple
+
+from sqlalchemy import and_, func, literal, null, or_, select
+from sqlalchemy.dialects.postgresql import array
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.models.recipe import Recipe
+
+MAX_PAGE_SIZE = 50
+
+# Only the columns needed for a result card; skips instructions, ingredients and nutrition JSONB
+_SUMMARY_COLUMNS = (
+    Recipe.id,
+    Recipe.title,
+    Recipe.description,
+    Recipe.cuisine_type,
+    Recipe.prep_time_minutes,
+    Recipe.cook_time_minutes,
+    Recipe.total_time_minutes,
+    Recipe.serving_size,
+    Recipe.allergens,
+    Recipe.cost_estimate_cents,
+    Recipe.image_url,
+)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def decode_search_cursor(cursor: str, ranked: bool) -> Tuple[Any, ...]:
+    """
+    (score, id) for a ranked search, (id,) otherwise; raises ValueError if
+    the cursor is malformed or its values have the wrong types.
+    """
+    if ranked:
+        last_score, last_id = decode_cursor(cursor, 2)
+        if not _is_number(last_score) or not isinstance(last_id, int) or isinstance(last_id, bool):
+            raise ValueError("Invalid cursor")
+        return float(last_score), last_id
+    (last_id,) = decode_cursor(cursor, 1)
+    if not isinstance(last_id, int) or isinstance(last_id, bool):
+        raise ValueError("Invalid cursor")
+    return (last_id,)
+
+
+async def search_recipes(
+    db: AsyncSession,
+    query: Optional[str] = None,
+    cuisines: Optional[List[str]] = None,
+    exclude_allergens: Optional[List[str]] = None,
+    max_total_minutes: Optional[int] = None,
+    max_prep_minutes: Optional[int] = None,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Search the recipe catalog by name, cuisine or ingredient.
+
+    Text queries are answered from the GIN indexes: full-text matches on the
+    weighted `search_vector` plus trigram matches on the title and ingredient
+    names, so typos like "chiken" still hit. Results are ordered by relevance
+    (or by id without a query) and paginated with a keyset cursor, so deep
+    pages cost the same as the first one.
+    """
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    query = (query or "").strip()
+
+    filters = []
+    if cuisines:
+        filters.append(Recipe.cuisine_type.in_([c.strip().lower() for c in cuisines]))
+    if exclude_allergens:
+        allergens = [a.strip().lower() for a in exclude_allergens]
+        filters.append(~Recipe.allergens.has_any(array(allergens)))
+    if max_total_minutes is not None:
+        filters.append(Recipe.total_time_minutes <= max_total_minutes)
+    if max_prep_minutes is not None:
+        filters.append(func.coalesce(Recipe.prep_time_minutes, 0) <= max_prep_minutes)
+
+    if query:
+        ts_query = func.websearch_to_tsquery("english", query)
+        score = func.greatest(
+            func.ts_rank_cd(Recipe.search_vector, ts_query),
+            func.similarity(Recipe.title, query),
+            func.word_similarity(query, Recipe.ingredient_names),
+        ).label("score")
+        filters.append(
+            or_(
+                Recipe.search_vector.op("@@")(ts_query),
+                Recipe.title.op("%")(query),
+                literal(query).op("<%")(Recipe.ingredient_names),
+            )
+        )
+        if cursor:
+            last_score, last_id = decode_search_cursor(cursor, ranked=True)
+            filters.append(
+                or_(score < last_score, and_(score == last_score, Recipe.id > last_id))
+            )
+        stmt = select(*_SUMMARY_COLUMNS, score).order_by(score.desc(), Recipe.id)
+    else:
+        if cursor:
+            (last_id,) = decode_search_cursor(cursor, ranked=False)
+            filters.append(Recipe.id > last_id)
+        stmt = select(*_SUMMARY_COLUMNS, null().label("score")).order_by(Recipe.id)
+
+    # Fetch one extra row to know whether another page exists
+    result = await db.execute(stmt.where(*filters).limit(limit + 1))
+    rows = result.all()
+
+    items = [dict(row._mapping) for row in rows[:limit]]
+
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor(last["score"], last["id"]) if query else encode_cursor(last["id"])
+
+    return {"items": items, "next_cursor": next_cursor}
+
@@ -0,0 +1,243 @@
+"""
+Collaborative-filtering recipe recommendations learned from recipe feedback.
+
+Training (offline, see scripts/train_recommender.py) fits a biased matrix
+factorization of the sparse user x recipe rating matrix by alternating least
+squares:
+
+    rating(u, r) ~ mean + user_bias[u] + recipe_bias[r] + user[u] . recipe[r]
+
+and writes the factors as flat float32 .npy files. The recipe bias is stored
+as an extra factor column (with a matching constant 1 in every user vector),
+so scoring every recipe for a user is a single matrix-vector product over a
+memory-mapped matrix: no model call, no database query, microseconds for a
+few thousand recipes.
+
+Like the price catalog, each training run writes a complete new version
+directory and then flips the CURRENT pointer file.
+"""
+import json
+import os
+import shutil
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.core.config import settings
+
+_RELOAD_CHECK_SECONDS = 30.0
+
+
+class Recommender:
+    """Read-only view over one trained model version"""
+
+    def __init__(self, path: Path):
+        self.path = path
+        with open(path / "meta.json", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.global_mean: float = meta["global_mean"]
+        self.recipes: List[str] = meta["recipes"]
+        self.recipe_index: Dict[str, int] = {name: i for i, name in enumerate(self.recipes)}
+        self.user_ids = np.load(path / "user_ids.npy")
+        self.user_bias = np.load(path / "user_bias.npy")
+        self.user_vectors = np.load(path / "user_vectors.npy", mmap_mode="r")
+        self.recipe_vectors = np.load(path / "recipe_vectors.npy", mmap_mode="r")
+        # Recipes each user had rated at training time, as CSR
+        self.rated_offsets = np.load(path / "rated_offsets.npy")
+        self.rated_recipes = np.load(path / "rated_recipes.npy", mmap_mode="r")
+        # Users unknown to the model get the bias-only vector: recipes ranked by recipe_bias
+        self._cold_vector = np.zeros(self.recipe_vectors.shape[1], dtype=np.float32)
+        self._cold_vector[-1] = 1.0
+
+    def _user_row(self, user_id: int) -> Optional[int]:
+        row = int(np.searchsorted(self.user_ids, user_id))
+        return row if row < len(self.user_ids) and self.user_ids[row] == user_id else None
+
+    def recommend(
+        self,
+        user_id: int,
+        limit: int = 20,
+        candidates: Optional[Sequence[str]] = None,
+        include_rated: bool = False,
+    ) -> List[Tuple[str, float]]:
+        """
+        The user's best recipes by predicted rating, best first.
+
+        Scores every recipe in the model, or only `candidates` (names the
+        model has never seen are skipped). Recipes the user had rated are
+        left out unless include_rated is set.
+        """
+        row = self._user_row(user_id)
+        vector = self.user_vectors[row] if row is not None else self._cold_vector
+        offset = self.global_mean + (float(self.user_bias[row]) if row is not None else 0.0)
+
+        if candidates is None:
+            indices = None
+            scores = self.recipe_vectors @ vector
+        else:
+            indices = np.fromiter(
+                (self.recipe_index[name] for name in candidates if name in self.recipe_index), dtype=np.int64
+            )
+            scores = self.recipe_vectors[indices] @ vector
+        if row is not None and not include_rated:
+            rated = self.rated_recipes[self.rated_offsets[row]:self.rated_offsets[row + 1]]
+            if indices is None:
+                scores[rated] = -np.inf
+            else:
+                scores[np.isin(indices, rated)] = -np.inf
+
+        limit = min(limit, len(scores))
+        if limit <= 0:
+            return []
+        top = np.argpartition(-scores, limit - 1)[:limit]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        top = top[np.isfinite(scores[top])]
+        names = top if indices is None else indices[top]
+        return [
+            (self.recipes[int(name)], round(min(max(offset + float(score), 1.0), 5.0), 3))
+            for name, score in zip(names, scores[top])
+        ]
+
+
+def _version_dir(root: Path) -> Optional[Path]:
+    pointer = root / "CURRENT"
+    if not pointer.exists():
+        return None
+    return root / pointer.read_text(encoding="utf-8").strip()
+
+
+_recommender: Optional[Recommender] = None
+_checked_at = 0.0
+
+
+def get_recommender() -> Optional[Recommender]:
+    """The process-wide model, or None if none was trained yet; picks up new versions"""
+    global _recommender, _checked_at
+    now = time.monotonic()
+    if now - _checked_at < _RELOAD_CHECK_SECONDS:
+        return _recommender
+    _checked_at = now
+    path = _version_dir(Path(settings.RECOMMENDER_MODEL_DIR))
+    if path is None:
+        _recommender = None
+    elif _recommender is None or _recommender.path != path:
+        _recommender = Recommender(path)
+    return _recommender
+
+
+def reset_recommender() -> None:
+    """Forget the loaded model; the next access reopens the current version"""
+    global _recommender, _checked_at
+    _recommender, _checked_at = None, 0.0
+
+
+def _solve_side(
+    offsets: np.ndarray,
+    others: np.ndarray,
+    residuals: np.ndarray,
+    other_factors: np.ndarray,
+    regularization: float,
+) -> np.ndarray:
+    """Least-squares factors for every row of one side, the other side fixed"""
+    k = other_factors.shape[1]
+    factors = np.zeros((len(offsets) - 1, k), dtype=np.float64)
+    identity = np.eye(k)
+    for row in range(len(offsets) - 1):
+        start, end = offsets[row], offsets[row + 1]
+        if start == end:
+            continue
+        v = other_factors[others[start:end]]
+        # Regularization scaled by the number of ratings (weighted-lambda ALS)
+        a = v.T @ v + regularization * (end - start) * identity
+        factors[row] = np.linalg.solve(a, v.T @ residuals[start:end])
+    return factors
+
+
+def _csr(rows: np.ndarray, n_rows: int, *columns: np.ndarray) -> Tuple[np.ndarray, ...]:
+    order = np.argsort(rows, kind="stable")
+    offsets = np.searchsorted(rows[order], np.arange(n_rows + 1)).astype(np.int64)
+    return (offsets, order, *(column[order] for column in columns))
+
+
+def train_recommender(
+    ratings: Iterable[Tuple[int, str, int]],
+    root: Optional[Path] = None,
+    factors: Optional[int] = None,
+    regularization: Optional[float] = None,
+    iterations: Optional[int] = None,
+    seed: int = 0,
+) -> Dict[str, float]:
+    """
+    Fit the model to (user id, recipe name, rating) triples and publish it.
+
+    When a user rated a recipe more than once, the last rating counts.
+    """
+    root = Path(root or settings.RECOMMENDER_MODEL_DIR)
+    factors = factors or settings.RECOMMENDER_FACTORS
+    regularization = regularization if regularization is not None else settings.RECOMMENDER_REGULARIZATION
+    iterations = iterations or settings.RECOMMENDER_ITERATIONS
+
+    latest: Dict[Tuple[int, str], float] = {}
+    for user_id, recipe_name, rating in ratings:
+        latest[(int(user_id), recipe_name)] = float(rating)
+    if not latest:
+        raise ValueError("No ratings to train on")
+
+    user_ids, users = np.unique(np.fromiter((key[0] for key in latest), dtype=np.int64), return_inverse=True)
+    recipes, items = np.unique(np.array([key[1] for key in latest], dtype=object), return_inverse=True)
+    values = np.fromiter(latest.values(), dtype=np.float64)
+    n_users, n_recipes = len(user_ids), len(recipes)
+
+    # Biases first, each shrunk towards zero for users and recipes with few ratings
+    global_mean = float(values.mean())
+    bias_damping = 5.0
+    recipe_bias = np.bincount(items, values - global_mean, n_recipes) / (np.bincount(items, minlength=n_recipes) + bias_damping)
+    user_bias = (
+        np.bincount(users, values - global_mean - recipe_bias[items], n_users)
+        / (np.bincount(users, minlength=n_users) + bias_damping)
+    )
+    residuals = values - global_mean - user_bias[users] - recipe_bias[items]
+
+    user_offsets, _, user_items, user_residuals = _csr(users, n_users, items, residuals)
+    recipe_offsets, _, recipe_users, recipe_residuals = _csr(items, n_recipes, users, residuals)
+
+    rng = np.random.default_rng(seed)
+    recipe_factors = rng.normal(0.0, 0.1, (n_recipes, factors))
+    user_factors = np.zeros((n_users, factors))
+    for _ in range(iterations):
+        user_factors = _solve_side(user_offsets, user_items, user_residuals, recipe_factors, regularization)
+        recipe_factors = _solve_side(recipe_offsets, recipe_users, recipe_residuals, user_factors, regularization)
+
+    predictions = global_mean + user_bias[users] + recipe_bias[items] + np.einsum(
+        "ij,ij->i", user_factors[users], recipe_factors[items]
+    )
+    rmse = float(np.sqrt(np.mean((predictions - values) ** 2)))
+
+    version = f"v{time.time_ns()}"
+    path = root / version
+    path.mkdir(parents=True)
+    ones = np.ones((n_users, 1))
+    np.save(path / "user_ids.npy", user_ids)
+    np.save(path / "user_bias.npy", user_bias.astype(np.float32))
+    np.save(path / "user_vectors.npy", np.hstack([user_factors, ones]).astype(np.float32))
+    np.save(path / "recipe_vectors.npy", np.hstack([recipe_factors, recipe_bias[:, None]]).astype(np.float32))
+    np.save(path / "rated_offsets.npy", user_offsets)
+    np.save(path / "rated_recipes.npy", user_items.astype(np.int32))
+    with open(path / "meta.json", "w", encoding="utf-8") as f:
+        json.dump({"global_mean": global_mean, "factors": factors, "recipes": recipes.tolist()}, f)
+
+    pointer = root / "CURRENT.tmp"
+    pointer.write_text(version, encoding="utf-8")
+    previous = _version_dir(root)
+    os.replace(pointer, root / "CURRENT")
+    reset_recommender()
+
+    # Keep the previous version for readers that still have it open
+    keep_versions = {version, previous.name if previous is not None else None}
+    for old in root.glob("v*"):
+        if old.is_dir() and old.name not in keep_versions:
+            shutil.rmtree(old, ignore_errors=True)
+
+    return {"ratings": len(values), "users": n_users, "recipes": n_recipes, "train_rmse": round(rmse, 4)}
@@ -0,0 +1,180 @@
+"""
+Refresh token issue, rotation and pruning.
+
+Clients get an opaque random token; only its SHA-256 is stored, so a lookup
+is one probe of the unique index and a database leak yields no usable
+tokens. Each refresh marks the presented token used and issues a successor
+in the same family. A used or revoked token presented again is treated as
+stolen: the whole family is revoked, logging out both the thief and the
+legitimate client.
+"""
+import asyncio
+import hashlib
+import logging
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, select, update
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.config import settings
+from app.models.user import RefreshToken, User
+
+logger = logging.getLogger(__name__)
+
+
+def hash_refresh_token(token: str) -> str:
+    # Tokens are 256 random bits, so a plain digest needs no salt or stretching
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def _invalid_refresh_token() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid refresh token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def issue_refresh_token(db: AsyncSession, user: User, family_id: Optional[str] = None) -> str:
+    """Create a refresh token for the user; a new family unless rotating. Does not commit."""
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        token_hash=hash_refresh_token(token),
+        family_id=family_id or secrets.token_hex(16),
+        user_id=user.id,
+        expires_at=datetime.now(timezone.utc) + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS),
+    ))
+    return token
+
+
+async def _revoke_family(db: AsyncSession, family_id: str) -> None:
+    await db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def rotate_refresh_token(db: AsyncSession, token: str) -> Tuple[User, str]:
+    """
+    Exchange a refresh token for its successor.
+
+    Returns the user and the new token; raises 401 for unknown, expired,
+    revoked or reused tokens.
+    """
+    now = datetime.now(timezone.utc)
+    # Row lock: two concurrent refreshes with one token cannot both succeed
+    result = await db.execute(
+        select(RefreshToken)
+        .where(RefreshToken.token_hash == hash_refresh_token(token))
+        .with_for_update()
+    )
+    stored = result.scalar_one_or_none()
+    if stored is None or stored.expires_at <= now:
+        raise _invalid_refresh_token()
+
+    if stored.used_at is not None or stored.revoked_at is not None:
+        if stored.revoked_at is None:
+            logger.warning("Refresh token reuse for user %s; revoking family %s", stored.user_id, stored.family_id)
+        await _revoke_family(db, stored.family_id)
+        await db.commit()
+        raise _invalid_refresh_token()
+
+    user = await db.get(User, stored.user_id)
+    if user is None or not user.is_active:
+        raise _invalid_refresh_token()
+
+    stored.used_at = now
+    new_token = issue_refresh_token(db, user, family_id=stored.family_id)
+    await db.commit()
+    return user, new_token
+
+
+async def revoke_refresh_token(db: AsyncSession, token: str) -> None:
+    """Log out: revoke the family the token belongs to, if it exists"""
+    result = await db.execute(
+        select(RefreshToken.family_id).where(RefreshToken.token_hash == hash_refresh_token(token))
+    )
+    family_id = result.scalar_one_or_none()
+    if family_id is not None:
+        await _revoke_family(db, family_id)
+        await db.commit()
+
+
+async def prune_expired_refresh_tokens(session_factory: async_sessionmaker, batch_size: Optional[int] = None) -> int:
+    """
+    Delete expired tokens in batches, each in its own short transaction.
+
+    Used and revoked tokens are kept until they expire, so reuse is still
+    detected; after expiry they are rejected either way.
+    """
+    batch_size = batch_size or settings.REFRESH_TOKEN_PRUNE_BATCH_SIZE
+    deleted = 0
+    while True:
+        async with session_factory() as db:
+            expired = (
+                select(RefreshToken.id)
+                .where(RefreshToken.expires_at < datetime.now(timezone.utc))
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+                .scalar_subquery()
+            )
+            result = await db.execute(
+                delete(RefreshToken).where(RefreshToken.id.in_(expired)).execution_options(synchronize_session=False)
+            )
+            await db.commit()
+        deleted += result.rowcount
+        if result.rowcount < batch_size:
+            return deleted
+
+
+class RefreshTokenPruner:
+    """Background task running prune_expired_refresh_tokens periodically"""
+
+    def __init__(self, session_factory: async_sessionmaker):
+        self._session_factory = session_factory
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="refresh-token-pruner")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                deleted = await prune_expired_refresh_tokens(self._session_factory)
+                if deleted:
+                    logger.info("Pruned %d expired refresh tokens", deleted)
+            except Exception:
+                logger.exception("Refresh token pruning failed")
+            await asyncio.sleep(settings.REFRESH_TOKEN_PRUNE_INTERVAL_SECONDS)
+
+
+_pruner: Optional[RefreshTokenPruner] = None
+
+
+def start_refresh_token_pruner(session_factory: async_sessionmaker) -> None:
+    global _pruner
+    if _pruner is None:
+        _pruner = RefreshTokenPruner(session_factory)
+        _pruner.start()
+
+
+async def stop_refresh_token_pruner() -> None:
+    global _pruner
+    if _pruner is not None:
+        await _pruner.stop()
+        _pruner = None
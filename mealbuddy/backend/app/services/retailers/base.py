@@ -0,0 +1,43 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence
+
+
+class PriceRequest(NamedTuple):
+    """One grocery list line to price"""
+    item: str
+    amount: float
+    unit: str
+
+
+class RetailerQuote(NamedTuple):
+    retailer: str
+    item: str
+    price: Optional[float]  # Dollars for the requested amount; None when unavailable
+    product_name: Optional[str] = None
+
+    @property
+    def available(self) -> bool:
+        return self.price is not None
+
+
+class RetailerError(Exception):
+    """A retailer could not be reached or returned an unusable response"""
+
+
+class RetailerAdapter(ABC):
+    """
+    Interface every retailer integration implements.
+
+    `quote` prices a whole list in a single call (one request for HTTP
+    retailers), so comparing N retailers costs N concurrent round trips
+    regardless of the list length.
+    """
+
+    name: str = "retailer"
+
+    @abstractmethod
+    async def quote(self, requests: Sequence[PriceRequest]) -> List[RetailerQuote]:
+        """One quote per request, in the same order"""
+
+    def describe(self) -> Dict[str, Any]:
+        return {"name": self.name}
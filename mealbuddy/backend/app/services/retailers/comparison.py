@@ -0,0 +1,156 @@
+"""
+Compare a grocery list's cost across retailers.
+
+Every retailer prices the whole list in one call and all retailers are asked
+concurrently, so a comparison costs about one round trip however long the
+list is. Quotes are kept in a TTL cache, and only items missing from it are
+requested.
+"""
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.config import settings
+from app.services.retailers.base import PriceRequest, RetailerAdapter, RetailerError, RetailerQuote
+from app.services.retailers.fake import FakeRetailerAdapter
+from app.services.retailers.http import HttpRetailerAdapter
+
+logger = logging.getLogger(__name__)
+
+_CACHE_MAX_ENTRIES = 100_000
+
+
+class PriceCache:
+    """TTL cache of quotes keyed by (retailer, item, amount, unit)"""
+
+    def __init__(self, ttl_seconds: float, max_entries: int = _CACHE_MAX_ENTRIES):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str, float, str], Tuple[float, RetailerQuote]]" = OrderedDict()
+
+    def get(self, retailer: str, request: PriceRequest) -> Optional[RetailerQuote]:
+        key = (retailer, *request)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, quote = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            return None
+        return quote
+
+    def put(self, retailer: str, request: PriceRequest, quote: RetailerQuote) -> None:
+        key = (retailer, *request)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, quote)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+price_cache = PriceCache(settings.RETAILER_PRICE_CACHE_TTL_SECONDS)
+
+_adapters: Optional[List[RetailerAdapter]] = None
+
+
+def get_retailer_adapters() -> List[RetailerAdapter]:
+    """Configured HTTP retailers, or local fakes when none are configured"""
+    global _adapters
+    if _adapters is None:
+        if settings.RETAILER_ENDPOINTS:
+            _adapters = [HttpRetailerAdapter(name, url) for name, url in settings.RETAILER_ENDPOINTS.items()]
+        else:
+            _adapters = [
+                FakeRetailerAdapter("freshmart", price_level=1.0),
+                FakeRetailerAdapter("valuegrocer", price_level=0.9, out_of_stock_rate=0.15),
+                FakeRetailerAdapter("organicco", price_level=1.25, out_of_stock_rate=0.02),
+            ]
+    return _adapters
+
+
+async def _quote_retailer(adapter: RetailerAdapter, requests: Sequence[PriceRequest]) -> Optional[List[RetailerQuote]]:
+    """One retailer's quote for each request, from the cache where possible; None if it failed"""
+    quotes: List[Optional[RetailerQuote]] = [price_cache.get(adapter.name, request) for request in requests]
+    missing = [i for i, quote in enumerate(quotes) if quote is None]
+    if missing:
+        try:
+            fetched = await asyncio.wait_for(
+                adapter.quote([requests[i] for i in missing]), settings.RETAILER_LOOKUP_TIMEOUT_SECONDS
+            )
+        except (RetailerError, asyncio.TimeoutError) as e:
+            logger.warning("Price lookup at %s failed: %r", adapter.name, e)
+            return None
+        for i, quote in zip(missing, fetched):
+            price_cache.put(adapter.name, requests[i], quote)
+            quotes[i] = quote
+    return quotes
+
+
+async def compare_retailer_prices(
+    items: Sequence[Dict[str, Any]],
+    adapters: Optional[Sequence[RetailerAdapter]] = None,
+) -> Dict[str, Any]:
+    """
+    Price grocery list items at every retailer.
+
+    Returns per-retailer cart totals (with the items each cannot supply) and
+    the cheapest split: every item bought where it is cheapest, grouped by
+    retailer. The same item in different units is priced as separate lines.
+    """
+    adapters = list(adapters if adapters is not None else get_retailer_adapters())
+    requests = [PriceRequest(item["item"], float(item["amount"]), item["unit"]) for item in items]
+    results = await asyncio.gather(*(_quote_retailer(adapter, requests) for adapter in adapters))
+
+    retailers = []
+    # Request index -> cheapest quote; retailer name -> indices it cannot supply
+    best: Dict[int, RetailerQuote] = {}
+    lacking: Dict[str, List[int]] = {}
+    for adapter, quotes in zip(adapters, results):
+        if quotes is None:
+            retailers.append({"retailer": adapter.name, "available": False, "total": None, "missing_items": []})
+            continue
+        total, missing = 0.0, lacking.setdefault(adapter.name, [])
+        for i, quote in enumerate(quotes):
+            if not quote.available:
+                missing.append(i)
+                continue
+            total += quote.price
+            if i not in best or quote.price < best[i].price:
+                best[i] = quote
+        retailers.append({
+            "retailer": adapter.name,
+            "available": True,
+            "total": round(total, 2),
+            "missing_items": [requests[i].item for i in missing],
+        })
+
+    split: Dict[str, Dict[str, Any]] = {}
+    for i, request in enumerate(requests):
+        quote = best.get(i)
+        if quote is None:
+            continue
+        basket = split.setdefault(quote.retailer, {"retailer": quote.retailer, "items": [], "total": 0.0})
+        basket["items"].append({"item": request.item, "amount": request.amount, "unit": request.unit, "price": quote.price})
+        basket["total"] += quote.price
+    for basket in split.values():
+        basket["total"] = round(basket["total"], 2)
+
+    unavailable = [request.item for i, request in enumerate(requests) if i not in best]
+    # A single retailer is a full alternative if it lacks only what nobody stocks
+    complete = [
+        r for r in retailers if r["available"] and all(i not in best for i in lacking[r["retailer"]])
+    ]
+    cheapest = min(complete, key=lambda r: r["total"]) if complete else None
+    return {
+        "retailers": retailers,
+        "cheapest_single_retailer": cheapest["retailer"] if cheapest else None,
+        "cheapest_split": {
+            "total": round(sum(basket["total"] for basket in split.values()), 2),
+            "baskets": list(split.values()),
+            "unavailable_items": unavailable,
+        },
+    }
@@ -0,0 +1,40 @@
+import asyncio
+import hashlib
+from typing import List, Sequence
+
+from app.services.grocery_list_generator import reference_price
+from app.services.retailers.base import PriceRequest, RetailerAdapter, RetailerQuote
+
+
+class FakeRetailerAdapter(RetailerAdapter):
+    """
+    Local retailer used in development and tests.
+
+    Prices are the reference prices scaled by the retailer's price level and a
+    deterministic per-item variation; a deterministic share of items is out of
+    stock. `latency` simulates one network round trip per call.
+    """
+
+    def __init__(self, name: str, price_level: float = 1.0, latency: float = 0.05, out_of_stock_rate: float = 0.05):
+        self.name = name
+        self.price_level = price_level
+        self.latency = latency
+        self.out_of_stock_rate = out_of_stock_rate
+
+    def _variation(self, item: str) -> float:
+        digest = hashlib.blake2b(f"{self.name}\x1f{item}".encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big") / 2 ** 64  # Uniform in [0, 1)
+
+    async def quote(self, requests: Sequence[PriceRequest]) -> List[RetailerQuote]:
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        quotes = []
+        for request in requests:
+            variation = self._variation(request.item)
+            base = reference_price(request.item, request.amount, request.unit)
+            if base is None or variation < self.out_of_stock_rate:
+                quotes.append(RetailerQuote(self.name, request.item, None))
+                continue
+            price = base * self.price_level * (0.85 + 0.3 * variation)
+            quotes.append(RetailerQuote(self.name, request.item, round(price, 2), f"{self.name} {request.item}"))
+        return quotes
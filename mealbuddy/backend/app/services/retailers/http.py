@@ -0,0 +1,65 @@
+from typing import List, Optional, Sequence
+
+import httpx
+
+from app.core.config import settings
+from app.services.retailers.base import PriceRequest, RetailerAdapter, RetailerError, RetailerQuote
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Connection-pooled client shared by all HTTP retailer adapters"""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            timeout=settings.RETAILER_LOOKUP_TIMEOUT_SECONDS,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+    return _client
+
+
+async def close_http_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+class HttpRetailerAdapter(RetailerAdapter):
+    """
+    Retailer reached over HTTP.
+
+    Sends the whole list in one request:
+        POST {base_url}/v1/prices {"items": [{"item", "amount", "unit"}, ...]}
+    and expects {"prices": [{"item", "price", "product_name"}, ...]}, one
+    entry per requested item in the same order, with a null price for
+    unavailable items. Matching by position keeps lines for the same item in
+    different units apart.
+    """
+
+    def __init__(self, name: str, base_url: str, client: Optional[httpx.AsyncClient] = None):
+        self.name = name
+        self.base_url = base_url.rstrip("/")
+        self._client = client
+
+    async def quote(self, requests: Sequence[PriceRequest]) -> List[RetailerQuote]:
+        client = self._client or get_http_client()
+        payload = {"items": [request._asdict() for request in requests]}
+        try:
+            response = await client.post(f"{self.base_url}/v1/prices", json=payload)
+            response.raise_for_status()
+            prices = response.json()["prices"]
+            if len(prices) != len(requests):
+                raise ValueError(f"{len(prices)} prices for {len(requests)} items")
+            quotes = []
+            for request, entry in zip(requests, prices):
+                if entry["item"] != request.item:
+                    raise ValueError(f"price for {entry['item']!r} where {request.item!r} was expected")
+                price = entry.get("price")
+                quotes.append(RetailerQuote(
+                    self.name, request.item, float(price) if price is not None else None, entry.get("product_name")
+                ))
+        except (httpx.HTTPError, KeyError, TypeError, ValueError) as e:
+            raise RetailerError(f"{self.name}: {e}") from e
+        return quotes
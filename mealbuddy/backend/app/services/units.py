@@ -0,0 +1,249 @@
+"""
+Quantity parsing and unit conversion for ingredients.
+
+Free-text quantities such as "1 kg", "500g", "1 1/2 cups", "1 can", "1 dozen"
+or "2" are parsed into (amount, unit) and converted between units using
+precomputed mass, volume and count tables. Conversions across dimensions
+(cups of flour to grams, eggs to grams, cans of beans to grams) use
+per-ingredient densities, piece weights and container sizes.
+
+Parsing and canonicalization are memoized, so running them over every item of
+every list and plan costs a dictionary lookup for repeated strings.
+"""
+import re
+from functools import lru_cache
+from typing import Dict, NamedTuple, Optional, Tuple
+
+MASS = "mass"
+VOLUME = "volume"
+COUNT = "count"
+
+# Base unit of each measurable dimension
+BASE_UNITS = {MASS: "g", VOLUME: "ml", COUNT: "each"}
+
+# Precomputed conversion tables: unit -> amount of the dimension's base unit
+MASS_TABLE = {"mg": 0.001, "g": 1.0, "kg": 1000.0, "oz": 28.349523125, "lb": 453.59237}
+VOLUME_TABLE = {
+    "ml": 1.0, "cl": 10.0, "dl": 100.0, "l": 1000.0,
+    "tsp": 4.92892159375, "tbsp": 14.78676478125, "fl oz": 29.5735295625,
+    "cup": 236.5882365, "pint": 473.176473, "quart": 946.352946, "gallon": 3785.411784,
+}
+COUNT_TABLE = {"each": 1.0, "pair": 2.0, "dozen": 12.0}
+
+# Package-style units: their size depends on the ingredient (see CONTAINER_SIZES)
+CONTAINER_UNITS = frozenset({
+    "can", "jar", "bottle", "box", "bag", "pack", "block", "loaf", "carton",
+    "bunch", "head", "clove", "slice", "stick", "tub", "packet",
+})
+
+_UNIT_ALIASES = {
+    "milligram": "mg", "milligrams": "mg",
+    "gram": "g", "grams": "g", "gr": "g",
+    "kilogram": "kg", "kilograms": "kg", "kgs": "kg", "kilo": "kg", "kilos": "kg",
+    "ounce": "oz", "ounces": "oz",
+    "pound": "lb", "pounds": "lb", "lbs": "lb",
+    "milliliter": "ml", "milliliters": "ml", "millilitre": "ml", "millilitres": "ml",
+    "liter": "l", "liters": "l", "litre": "l", "litres": "l",
+    "teaspoon": "tsp", "teaspoons": "tsp", "tsps": "tsp",
+    "tablespoon": "tbsp", "tablespoons": "tbsp", "tbsps": "tbsp", "tbs": "tbsp",
+    "fluid ounce": "fl oz", "fluid ounces": "fl oz", "floz": "fl oz",
+    "cups": "cup", "c": "cup", "pints": "pint", "quarts": "quart", "gallons": "gallon",
+    "": "each", "x": "each", "piece": "each", "pieces": "each", "pc": "each", "pcs": "each",
+    "whole": "each", "item": "each", "items": "each", "pairs": "pair", "dozens": "dozen",
+    "cans": "can", "tin": "can", "tins": "can", "jars": "jar", "bottles": "bottle",
+    "boxes": "box", "bags": "bag", "packs": "pack", "package": "pack", "packages": "pack",
+    "blocks": "block", "loaves": "loaf", "cartons": "carton", "bunches": "bunch",
+    "heads": "head", "cloves": "clove", "slices": "slice", "sticks": "stick",
+    "tubs": "tub", "packets": "packet",
+}
+
+# Flattened lookup built once: unit -> (dimension, factor to the dimension's base unit).
+# Container units are their own dimension with factor 1.
+_UNIT_TABLE: Dict[str, Tuple[str, float]] = {
+    **{unit: (MASS, factor) for unit, factor in MASS_TABLE.items()},
+    **{unit: (VOLUME, factor) for unit, factor in VOLUME_TABLE.items()},
+    **{unit: (COUNT, factor) for unit, factor in COUNT_TABLE.items()},
+    **{unit: (unit, 1.0) for unit in CONTAINER_UNITS},
+}
+
+# Grams per millilitre
+INGREDIENT_DENSITIES = {
+    "water": 1.0, "milk": 1.03, "olive oil": 0.91, "oil": 0.92, "butter": 0.911,
+    "flour": 0.53, "sugar": 0.85, "rice": 0.85, "oats": 0.41, "quinoa": 0.72,
+    "honey": 1.42, "yogurt": 1.03, "cheese": 0.45, "berries": 0.6, "spinach": 0.13,
+    "soy sauce": 1.2, "salt": 1.2,
+}
+
+# Grams per piece
+PIECE_WEIGHTS = {
+    "eggs": 50.0, "egg": 50.0, "avocado": 200.0, "apple": 180.0, "banana": 120.0,
+    "onion": 150.0, "potatoes": 200.0, "potato": 200.0, "carrots": 60.0, "carrot": 60.0,
+    "tomato": 120.0, "lemon": 100.0, "lime": 70.0, "garlic": 5.0, "chicken breast": 200.0,
+    "salmon fillets": 150.0, "tortilla": 45.0, "bell pepper": 150.0,
+}
+
+# Contents of one package: ingredient -> unit -> (amount, unit)
+CONTAINER_SIZES = {
+    "black beans": {"can": (425.0, "g")},
+    "corn": {"can": (425.0, "g")},
+    "tuna": {"can": (142.0, "g")},
+    "tomatoes": {"can": (400.0, "g")},
+    "coconut milk": {"can": (400.0, "ml")},
+    "tofu": {"block": (400.0, "g")},
+    "spinach": {"bag": (285.0, "g")},
+    "oats": {"box": (500.0, "g")},
+    "spaghetti": {"pack": (500.0, "g")},
+    "pizza dough": {"pack": (450.0, "g")},
+    "bread": {"loaf": (680.0, "g"), "slice": (28.0, "g")},
+    "milk": {"carton": (1000.0, "ml")},
+    "butter": {"stick": (113.0, "g")},
+    "garlic": {"clove": (5.0, "g"), "head": (50.0, "g")},
+}
+
+# Preferred unit per ingredient, so "2 eggs" and "100g eggs" land on the same line
+INGREDIENT_UNITS = {
+    "eggs": "each", "avocado": "each", "lemon": "each", "lime": "each",
+    "milk": "ml", "olive oil": "ml", "soy sauce": "ml",
+}
+
+_FRACTIONS = {"½": "1/2", "⅓": "1/3", "⅔": "2/3", "¼": "1/4", "¾": "3/4", "⅛": "1/8"}
+_QUANTITY_RE = re.compile(
+    r"""^\s*
+    (?P<amount>
+        \d+\s+\d+/\d+        # mixed number: 1 1/2
+      | \d+/\d+              # fraction: 1/2
+      | \d*\.?\d+            # integer or decimal
+    )?
+    \s*(?:-\s*\d*\.?\d+\s*)? # ranges like "2-3": keep the lower bound
+    (?P<unit>[^\d\s].*?)?\s*$
+    """,
+    re.VERBOSE,
+)
+
+
+class Quantity(NamedTuple):
+    amount: float
+    unit: str
+
+
+class UnitConversionError(ValueError):
+    """Raised when a quantity cannot be converted to the requested unit"""
+
+
+def normalize_unit(unit: str) -> str:
+    """Map a unit spelling ("Tablespoons", "kgs", "tin") to its table key"""
+    unit = " ".join(unit.lower().replace(".", "").split())
+    unit = _UNIT_ALIASES.get(unit, unit)
+    if unit not in _UNIT_TABLE and unit.endswith("s") and unit[:-1] in _UNIT_TABLE:
+        unit = unit[:-1]
+    return unit
+
+
+def _parse_amount(text: str) -> float:
+    if " " in text:
+        whole, fraction = text.split()
+        return float(whole) + _parse_amount(fraction)
+    if "/" in text:
+        numerator, denominator = text.split("/")
+        if float(denominator) == 0:
+            raise ValueError(f"Zero denominator in {text!r}")
+        return float(numerator) / float(denominator)
+    return float(text)
+
+
+@lru_cache(maxsize=8192)
+def parse_quantity(text: str) -> Quantity:
+    """
+    Parse a free-text quantity into (amount, unit).
+
+    A missing amount means one ("can" is one can), a missing unit means a
+    count ("2" is two each). Units outside the tables ("pinch", "sprig") are
+    kept as written and only combine with themselves.
+    """
+    text = str(text or "").strip()
+    for symbol, fraction in _FRACTIONS.items():
+        if symbol in text:
+            # "1½" -> "1 1/2", "½ cup" -> "1/2 cup"
+            text = re.sub(rf"(\d?)\s*{symbol}", lambda m: f"{m.group(1)} {fraction}".strip(), text, count=1)
+    match = _QUANTITY_RE.match(text)
+    try:
+        amount = _parse_amount(match.group("amount")) if match and match.group("amount") else 1.0
+    except ValueError:
+        match = None
+    if match is None:
+        return Quantity(1.0, normalize_unit(text))
+    # Drop descriptive tails such as "1 can (15 oz)" or "2 cups, chopped"
+    unit = re.split(r"[(,]", match.group("unit") or "", maxsplit=1)[0]
+    return Quantity(amount, normalize_unit(unit))
+
+
+def dimension_of(unit: str) -> str:
+    """Dimension of a normalized unit; unknown units are their own dimension"""
+    return _UNIT_TABLE.get(unit, (unit, 1.0))[0]
+
+
+def _to_grams(amount: float, unit: str, ingredient: str) -> Optional[float]:
+    """Mass in grams of `amount` `unit` of `ingredient`, when it can be known"""
+    dimension, factor = _UNIT_TABLE.get(unit, (unit, 1.0))
+    base = amount * factor
+    if dimension == MASS:
+        return base
+    if dimension == VOLUME and ingredient in INGREDIENT_DENSITIES:
+        return base * INGREDIENT_DENSITIES[ingredient]
+    if dimension == COUNT and ingredient in PIECE_WEIGHTS:
+        return base * PIECE_WEIGHTS[ingredient]
+    size = CONTAINER_SIZES.get(ingredient, {}).get(unit)
+    if size is not None:
+        return _to_grams(amount * size[0], size[1], ingredient)
+    return None
+
+
+def convert(amount: float, from_unit: str, to_unit: str, ingredient: Optional[str] = None) -> float:
+    """
+    Convert `amount` between units.
+
+    Units of the same dimension convert through the precomputed tables; across
+    dimensions the ingredient's density, piece weight or container size is
+    used. Raises UnitConversionError when no conversion path exists.
+    """
+    from_unit, to_unit = normalize_unit(from_unit), normalize_unit(to_unit)
+    if from_unit == to_unit:
+        return amount
+    from_dimension, from_factor = _UNIT_TABLE.get(from_unit, (from_unit, 1.0))
+    to_dimension, to_factor = _UNIT_TABLE.get(to_unit, (to_unit, 1.0))
+    if from_dimension == to_dimension and from_dimension in BASE_UNITS:
+        return amount * from_factor / to_factor
+
+    if ingredient is not None:
+        ingredient = " ".join(ingredient.lower().split())
+        grams = _to_grams(amount, from_unit, ingredient)
+        grams_per_target = _to_grams(1.0, to_unit, ingredient)
+        if grams is not None and grams_per_target:
+            return grams / grams_per_target
+    raise UnitConversionError(f"Cannot convert {from_unit!r} to {to_unit!r} for {ingredient or 'unknown ingredient'}")
+
+
+@lru_cache(maxsize=16384)
+def to_canonical(ingredient: str, quantity: str) -> Quantity:
+    """
+    Convert a quantity of an ingredient to the ingredient's canonical unit.
+
+    The canonical unit is the ingredient's preferred unit if one is set,
+    otherwise grams whenever the mass can be known, otherwise the base unit of
+    the quantity's own dimension (ml, each) or the container unit itself.
+    """
+    ingredient = " ".join(str(ingredient).lower().split())
+    amount, unit = parse_quantity(quantity)
+
+    preferred = INGREDIENT_UNITS.get(ingredient)
+    if preferred is not None:
+        try:
+            return Quantity(convert(amount, unit, preferred, ingredient), preferred)
+        except UnitConversionError:
+            pass
+
+    grams = _to_grams(amount, unit, ingredient)
+    if grams is not None:
+        return Quantity(grams, "g")
+    dimension, factor = _UNIT_TABLE.get(unit, (unit, 1.0))
+    return Quantity(amount * factor, BASE_UNITS.get(dimension, unit))
@@ -0,0 +1,130 @@
+"""
+Parsing of weight readings exported by smart scales and wearables.
+
+Input is CSV (with a header row) or JSON Lines, read as a stream of byte
+chunks, so an upload is parsed as it arrives and never held in memory.
+Every record needs a timestamp and a weight:
+
+    timestamp | logged_at | date | time     ISO 8601, or Unix seconds/milliseconds
+    weight_kg | weight (+ optional unit)   unit kg (default), g, lb, lbs, pounds
+
+Timestamps without a zone are taken as UTC; ones more than a day in the
+future are rejected. Quoted CSV fields may not span lines.
+"""
+import codecs
+import csv
+import json
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Dict, List, NamedTuple, Optional
+
+from app.services.units import UnitConversionError, convert
+
+TIMESTAMP_FIELDS = ("timestamp", "logged_at", "date", "time", "datetime")
+MAX_ERRORS_REPORTED = 20
+MAX_CLOCK_SKEW = timedelta(days=1)  # Tolerated for devices with a wrong clock
+
+
+class WeightReading(NamedTuple):
+    logged_at: datetime
+    weight_kg: float
+
+
+class WeightImportError(ValueError):
+    pass
+
+
+def _parse_timestamp(value: Any) -> datetime:
+    if isinstance(value, (int, float)) or (isinstance(value, str) and value.strip().replace(".", "", 1).isdigit()):
+        seconds = float(value)
+        if seconds > 1e11:  # Milliseconds
+            seconds /= 1000
+        return datetime.fromtimestamp(seconds, tz=timezone.utc)
+    parsed = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def parse_reading(record: Dict[str, Any]) -> WeightReading:
+    """One record as a reading; raises WeightImportError if it is unusable"""
+    record = {str(key).strip().lower(): value for key, value in record.items() if key is not None}
+    raw_time = next((record[field] for field in TIMESTAMP_FIELDS if record.get(field) not in (None, "")), None)
+    if raw_time is None:
+        raise WeightImportError("missing timestamp")
+    try:
+        logged_at = _parse_timestamp(raw_time)
+    except (OverflowError, OSError, ValueError):
+        raise WeightImportError(f"invalid timestamp {raw_time!r}")
+    if logged_at > datetime.now(timezone.utc) + MAX_CLOCK_SKEW:
+        raise WeightImportError(f"timestamp in the future: {raw_time!r}")
+
+    if record.get("weight_kg") not in (None, ""):
+        raw_weight, unit = record["weight_kg"], "kg"
+    else:
+        raw_weight, unit = record.get("weight"), str(record.get("unit") or "kg")
+    try:
+        weight_kg = convert(float(raw_weight), unit, "kg")
+    except (TypeError, ValueError, UnitConversionError):
+        raise WeightImportError(f"invalid weight {raw_weight!r} {unit}")
+    if not 0 < weight_kg < 700:
+        raise WeightImportError(f"weight out of range: {weight_kg:.1f} kg")
+    return WeightReading(logged_at, round(weight_kg, 3))
+
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    pending = ""
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *complete, pending = pending.split("\n")
+        for line in complete:
+            yield line.rstrip("\r")
+    pending += decoder.decode(b"", final=True)
+    if pending.strip():
+        yield pending.rstrip("\r")
+
+
+def _record(line: str, fmt: str, header: Optional[List[str]]) -> Any:
+    if fmt == "csv":
+        return dict(zip(header, next(csv.reader((line,)))))
+    return json.loads(line)
+
+
+async def parse_readings(
+    chunks: AsyncIterator[bytes],
+    fmt: str,
+    report: Dict[str, Any],
+    batch_size: int = 5000,
+) -> AsyncIterator[List[WeightReading]]:
+    """
+    Yield batches of readings parsed from a CSV or JSONL byte stream.
+
+    Unusable lines are skipped and counted in report["invalid"]; the first
+    MAX_ERRORS_REPORTED are described, with line numbers, in report["errors"].
+    """
+    report.setdefault("invalid", 0)
+    errors = report.setdefault("errors", [])
+    header: Optional[List[str]] = None
+    batch: List[WeightReading] = []
+    number = 0
+    async for line in _lines(chunks):
+        number += 1
+        if not line.strip():
+            continue
+        if fmt == "csv" and header is None:
+            header = next(csv.reader((line,)))
+            continue
+        try:
+            record = _record(line, fmt, header)
+            if not isinstance(record, dict):
+                raise WeightImportError("not an object")
+            batch.append(parse_reading(record))
+        except (csv.Error, json.JSONDecodeError, WeightImportError) as e:
+            report["invalid"] += 1
+            if len(errors) < MAX_ERRORS_REPORTED:
+                message = str(e) if isinstance(e, WeightImportError) else "malformed line"
+                errors.append(f"line {number}: {message}")
+            continue
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Compare response serialization time before and after FastJSONRoute.
+
+For representative payloads of the heaviest endpoints, times what FastAPI
+does between the endpoint returning and the body bytes being ready: the
+stock path (validate, dump to a dict or run jsonable_encoder, stdlib json)
+against the FastJSONRoute path (validate, dump_json or orjson). Payloads are
+synthetic but shaped like production responses.
+
+Usage:
+    python -m scripts.benchmark_serialization [--repeat N]
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, List, Optional
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.core.responses import FastJSONResponse, _ModelJSONField, _UnmodelledJSONField
+from app.schemas.user import UserResponse
+from app.schemas.user_weight_log import UserWeightLogInDB
+
+NOW = datetime(2026, 10, 19, 12, tzinfo=timezone.utc)
+
+
+def meal_plan() -> Dict[str, Any]:
+    """GET /users/meal-plan: a week of three meals, returned without a response model"""
+    def meal(day: int, slot: str) -> Dict[str, Any]:
+        return {
+            "recipe_id": day * 10 + len(slot),
+            "name": f"{slot.title()} bowl {day}",
+            "servings": 2,
+            "prep_time_minutes": 15,
+            "cook_time_minutes": 25,
+            "ingredients": [{"item": f"ingredient {i}", "quantity": f"{i * 50}g"} for i in range(12)],
+            "nutrition": {"calories": 640.5, "protein_g": 38.2, "fat_g": 21.0, "carbs_g": 72.4},
+            "instructions": "Chop, season and roast until golden. " * 6,
+            "cost_estimate_cents": 845,
+        }
+    return {
+        "week_start": "2026-10-19",
+        "days": [
+            {"date": (NOW + timedelta(days=day)).date().isoformat(),
+             "meals": {slot: meal(day, slot) for slot in ("breakfast", "lunch", "dinner")}}
+            for day in range(7)
+        ],
+        "generated_at": NOW,
+    }
+
+
+def grocery_list() -> Dict[str, Any]:
+    """GET /users/grocery-list: Dict[str, Any] response model"""
+    return {
+        "items": [
+            {"item": f"ingredient {i}", "amount": 250.0 + i, "unit": "g", "category": "produce",
+             "estimated_cost": 2.49, "recipes": [f"Dinner bowl {d}" for d in range(3)], "in_pantry": False}
+            for i in range(120)
+        ],
+        "total_estimated_cost": 298.8,
+        "budget_optimization": {"message": "Within budget", "swaps": [], "savings": 0.0},
+        "budget_optimization_message": "Within budget",
+        "unmatched_meals": [],
+    }
+
+
+def weight_history() -> List[Any]:
+    """GET /users/weight-log: a page of 500 ORM rows"""
+    return [
+        SimpleNamespace(id=i, user_id=7, weight_kg=82.5 - i * 0.01, logged_at=NOW - timedelta(hours=12 * i))
+        for i in range(500)
+    ]
+
+
+def profile() -> Dict[str, Any]:
+    """GET /users/profile: the user row with its JSON fields"""
+    user = SimpleNamespace(
+        id=7, email="cook@example.com", full_name="Home Cook", is_active=True, is_superuser=False,
+        is_verified=True, date_of_birth=None, gender=None, height_cm=178.0, weight_kg=82.5,
+        activity_level=None, goal=None,
+        dietary_restrictions={"vegetarian": False, "gluten_free": True, "dairy_free": False},
+        allergies=["peanuts", "shellfish"], disliked_ingredients=["cilantro", "olives"],
+        preferred_cuisines=["italian", "thai", "mexican"], weekly_budget_cents=15000, household_size=2,
+        target_daily_calories=2400, target_protein_g=160, target_carbs_g=250, target_fats_g=80,
+        pantry_inventory=[{"item": f"pantry item {i}", "quantity": f"{i} units"} for i in range(60)],
+        created_at=NOW, updated_at=NOW, last_login=NOW, login_count=42, google_id=None,
+    )
+    return {"success": True, "user": user}
+
+
+CASES = {
+    "GET /users/meal-plan": (meal_plan, None),
+    "GET /users/grocery-list": (grocery_list, Dict[str, Any]),
+    "GET /users/weight-log": (weight_history, List[UserWeightLogInDB]),
+    "GET /users/profile": (profile, UserResponse),
+}
+
+
+def _complete(coroutine: Any) -> Any:
+    """Run a coroutine that never suspends, without an event loop's overhead"""
+    try:
+        coroutine.send(None)
+    except StopIteration as done:
+        return done.value
+    raise RuntimeError("serialize_response suspended")
+
+
+def _time(render: Callable[[], bytes], repeat: int) -> float:
+    render()  # Warm up
+    started = time.perf_counter()
+    for _ in range(repeat):
+        render()
+    return (time.perf_counter() - started) / repeat
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare response serialization time before and after FastJSONRoute.")
+    parser.add_argument("--repeat", type=int, default=300)
+    args = parser.parse_args()
+
+    print(f"{'endpoint':<26}{'bytes':>9}{'before µs':>12}{'after µs':>11}{'speedup':>9}")
+    for name, (payload, model) in CASES.items():
+        content = payload()
+        field: Optional[Any] = create_response_field(name="response", type_=model) if model is not None else None
+        fast_field = _ModelJSONField(field) if field is not None else _UnmodelledJSONField()
+
+        def before() -> bytes:
+            return JSONResponse(_complete(serialize_response(field=field, response_content=content))).body
+
+        def after() -> bytes:
+            return FastJSONResponse(_complete(serialize_response(field=fast_field, response_content=content))).body
+
+        assert json.loads(before()) == json.loads(after()), name
+        slow, fast = _time(before, args.repeat), _time(after, args.repeat)
+        print(f"{name:<26}{len(after()):>9}{slow * 1e6:>12.0f}{fast * 1e6:>11.0f}{slow / fast:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,11 +9,10 @@ import logging
 from typing import AsyncGenerator, Optional
 
 import sqlalchemy as sa
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import settings
-from app.db.base import Base
+from app.db.base import Base, async_session as AsyncSessionLocal, engine as async_engine
 from app.models.user import User
 from app.core.security import get_password_hash
 
@@ -21,20 +20,7 @@ from app.core.security import get_password_hash
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Create async engine and session
-async_engine = create_async_engine(
-    settings.DATABASE_URL,
-    echo=settings.DEBUG,
-    pool_pre_ping=True,
-)
-
-AsyncSessionLocal = async_sessionmaker(
-    bind=async_engine,
-    class_=AsyncSession,
-    expire_on_commit=False,
-    autocommit=False,
-    autoflush=False,
-)
+# The application's engine and session factory, so scripts share its pool settings
 
 
 async def init_db() -> None:
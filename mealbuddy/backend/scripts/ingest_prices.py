@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Load retailer price dumps into the local price catalog.
+
+Each dump is a CSV file with a header or a JSON Lines file with the fields
+ingredient, date, price and optionally quantity and region. All files given
+are merged with the current catalog and published as one new version.
+
+Usage:
+    python -m scripts.ingest_prices DUMP [DUMP ...] [--catalog-dir DIR]
+"""
+import argparse
+import itertools
+import logging
+import sys
+from pathlib import Path
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from app.core.config import settings
+from app.services.price_catalog import ingest_observations, read_observations
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load retailer price dumps into the local price catalog.")
+    parser.add_argument("dumps", nargs="+", type=Path, help="CSV or JSON Lines price dumps")
+    parser.add_argument("--catalog-dir", type=Path, default=Path(settings.PRICE_CATALOG_DIR))
+    args = parser.parse_args()
+
+    rows = itertools.chain.from_iterable(read_observations(path) for path in args.dumps)
+    stats = ingest_observations(rows, args.catalog_dir)
+    logger.info(
+        "Ingested %(ingested)d observations (%(skipped)d skipped); catalog now holds "
+        "%(observations)d observations in %(series)d series", stats
+    )
+
+
+if __name__ == "__main__":
+    main()
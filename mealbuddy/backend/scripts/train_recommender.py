@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""Train the recipe recommender on all recipe feedback.
+
+Reads every rating from recipe_feedback, fits the collaborative-filtering
+model and publishes it as a new version in the model directory; running API
+processes pick it up within a minute.
+
+Usage:
+    python -m scripts.train_recommender [--model-dir DIR] [--factors N] [--iterations N]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+# Add the backend directory to the Python path
+sys.path.append(str(Path(__file__).resolve().parents[1]))
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.db.base import async_session, engine
+from app.models.recipe_feedback import RecipeFeedback
+from app.services.recommender import train_recommender
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def load_ratings() -> List[Tuple[int, str, int]]:
+    """All (user id, recipe name, rating) triples, oldest first"""
+    async with async_session() as db:
+        result = await db.stream(
+            select(RecipeFeedback.user_id, RecipeFeedback.recipe_name, RecipeFeedback.rating)
+            .order_by(RecipeFeedback.id)
+            .execution_options(yield_per=10_000)
+        )
+        ratings = [tuple(row) async for row in result]
+    await engine.dispose()
+    return ratings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Train the recipe recommender on all recipe feedback.")
+    parser.add_argument("--model-dir", type=Path, default=Path(settings.RECOMMENDER_MODEL_DIR))
+    parser.add_argument("--factors", type=int, default=settings.RECOMMENDER_FACTORS)
+    parser.add_argument("--iterations", type=int, default=settings.RECOMMENDER_ITERATIONS)
+    args = parser.parse_args()
+
+    ratings = asyncio.run(load_ratings())
+    if not ratings:
+        logger.info("No recipe feedback yet, nothing to train on")
+        return
+    stats = train_recommender(ratings, args.model_dir, factors=args.factors, iterations=args.iterations)
+    logger.info(
+        "Trained on %(ratings)d ratings from %(users)d users over %(recipes)d recipes "
+        "(training RMSE %(train_rmse).3f)", stats
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,7 @@ setup(
         "pydantic[email]>=2.5.2",
         "pydantic-settings>=2.1.0",
         "email-validator>=2.0.0",
+        "numpy>=1.26.0",
         "python-multipart>=0.0.6",
     ],
     extras_require={
@@ -0,0 +1,62 @@
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import Column, Integer, MetaData, Table, create_engine, insert, select
+from sqlalchemy.orm import Session
+
+from app.db import routing
+from app.db.routing import STICKY_COOKIE, ReadYourWritesMiddleware
+
+
+def make_app():
+    api = FastAPI()
+
+    @api.post("/write")
+    async def write():
+        session = Session()
+        session.info["wrote"] = True  # As after_flush records it
+        session.commit()
+        return {}
+
+    @api.get("/read")
+    async def read():
+        return {"primary": routing._routing_state.get().sticky}
+
+    return ReadYourWritesMiddleware(api, window_seconds=5)
+
+
+@pytest.mark.asyncio
+async def test_committed_write_pins_the_client_to_the_primary():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=make_app()), base_url="http://test") as client:
+        before = await client.get("/read")
+        written = await client.post("/write")
+        after = await client.get("/read")
+
+    assert before.json() == {"primary": False}
+    assert STICKY_COOKIE in written.headers["set-cookie"]
+    assert float(written.cookies[STICKY_COOKIE]) > time.time()
+    assert after.json() == {"primary": True}
+    assert "set-cookie" not in after.headers
+
+
+@pytest.mark.asyncio
+async def test_expired_or_garbled_cookie_reads_from_the_replica():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=make_app()), base_url="http://test") as client:
+        expired = await client.get("/read", cookies={STICKY_COOKIE: str(time.time() - 1)})
+        garbled = await client.get("/read", cookies={STICKY_COOKIE: "soon"})
+
+    assert expired.json() == garbled.json() == {"primary": False}
+
+
+def test_statement_writes_are_noted_without_a_flush():
+    engine = create_engine("sqlite://")
+    metadata = MetaData()
+    table = Table("readings", metadata, Column("id", Integer, primary_key=True))
+    metadata.create_all(engine)
+    with Session(engine) as session:
+        session.execute(select(table))
+        assert "wrote" not in session.info
+        session.execute(insert(table).values([{"id": 1}, {"id": 2}]))
+        assert session.info["wrote"] is True
@@ -0,0 +1,118 @@
+import time
+
+import httpx
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi import HTTPException
+from jose import jwk, jwt
+
+from app.core.config import settings
+from app.services.google_auth import JwksCache, verify_google_id_token
+
+CLIENT_ID = "client-123.apps.googleusercontent.com"
+
+
+def make_key(kid):
+    private = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = private.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+    public = jwk.construct(pem, "RS256").public_key().to_dict()
+    return pem, {**public, "kid": kid, "use": "sig", "alg": "RS256"}
+
+
+def make_jwks(keys):
+    fetches = []
+
+    def handler(request):
+        fetches.append(request.url)
+        return httpx.Response(200, json={"keys": keys}, headers={"Cache-Control": "public, max-age=3600"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return JwksCache("https://google.test/certs", client), fetches
+
+
+def id_token(pem, kid, **claims):
+    now = int(time.time())
+    payload = {
+        "iss": "https://accounts.google.com", "aud": CLIENT_ID, "sub": "g-42",
+        "email": "cook@example.com", "email_verified": True, "iat": now, "exp": now + 300, **claims,
+    }
+    return jwt.encode(payload, pem, algorithm="RS256", headers={"kid": kid})
+
+
+@pytest.mark.asyncio
+async def test_verifies_locally_with_one_jwks_fetch(monkeypatch):
+    monkeypatch.setattr(settings, "GOOGLE_CLIENT_ID", CLIENT_ID)
+    pem, public = make_key("k1")
+    jwks, fetches = make_jwks([public])
+
+    for _ in range(3):
+        claims = await verify_google_id_token(id_token(pem, "k1"), jwks=jwks)
+
+    assert claims["sub"] == "g-42" and claims["email"] == "cook@example.com"
+    assert len(fetches) == 1
+
+
+@pytest.mark.asyncio
+async def test_rejects_other_audiences_and_unknown_keys(monkeypatch):
+    monkeypatch.setattr(settings, "GOOGLE_CLIENT_ID", CLIENT_ID)
+    pem, public = make_key("k1")
+    other_pem, _ = make_key("k2")
+    jwks, _ = make_jwks([public])
+
+    with pytest.raises(HTTPException) as wrong_audience:
+        await verify_google_id_token(id_token(pem, "k1", aud="someone-else"), jwks=jwks)
+    with pytest.raises(HTTPException) as unknown_key:
+        await verify_google_id_token(id_token(other_pem, "k2"), jwks=jwks)
+
+    assert wrong_audience.value.status_code == unknown_key.value.status_code == 401
+
+
+def make_flaky_jwks(responses):
+    """A JWKS endpoint answering with `responses` in turn"""
+    fetches = []
+
+    def handler(request):
+        fetches.append(request.url)
+        return responses[min(len(fetches), len(responses)) - 1]
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return JwksCache("https://google.test/certs", client), fetches
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("response", [
+    httpx.Response(500),
+    httpx.Response(200, text="<html>oops</html>"),
+    httpx.Response(200, json={"keys": [{"kty": "RSA"}]}),
+    httpx.Response(200, json={"keys": []}),
+])
+async def test_key_set_failure_without_cached_keys_is_503(monkeypatch, response):
+    monkeypatch.setattr(settings, "GOOGLE_CLIENT_ID", CLIENT_ID)
+    pem, _ = make_key("k1")
+    jwks, _ = make_flaky_jwks([response])
+
+    with pytest.raises(HTTPException) as unavailable:
+        await verify_google_id_token(id_token(pem, "k1"), jwks=jwks)
+
+    assert unavailable.value.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_key_set_failure_keeps_serving_cached_keys(monkeypatch):
+    monkeypatch.setattr(settings, "GOOGLE_CLIENT_ID", CLIENT_ID)
+    pem, public = make_key("k1")
+    jwks, fetches = make_flaky_jwks([
+        httpx.Response(200, json={"keys": [public]}, headers={"Cache-Control": "max-age=3600"}),
+        httpx.Response(500),
+    ])
+    await verify_google_id_token(id_token(pem, "k1"), jwks=jwks)
+    jwks._expires_at = 0.0  # The cached key set goes stale
+
+    for _ in range(3):
+        claims = await verify_google_id_token(id_token(pem, "k1"), jwks=jwks)
+
+    assert claims["sub"] == "g-42"
+    assert len(fetches) == 2  # One failed refresh, then a pause before the next
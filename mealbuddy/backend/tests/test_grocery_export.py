@@ -0,0 +1,80 @@
+import asyncio
+import csv
+import io
+import json
+
+from app.services import grocery_export
+from app.services.grocery_export import get_cached_export, iter_csv, iter_html, iter_jsonl, iter_text, stream_export
+
+GROCERY_LIST = {
+    "items": [
+        {"item": "Tomatoes, cherry", "quantity": "2 cups", "estimated_price": 3.5},
+        {"item": 'Parmesan "Reggiano"', "quantity": "100 g", "estimated_price": 4.256},
+        {"item": "Salt & <pepper>", "quantity": "1 pinch\nor two", "estimated_price": 0},
+    ],
+    "total_estimated_cost": 7.756,
+    "budget_optimization": {"savings": 1.2},
+    "budget_optimization_message": "Swap <parmesan> for pecorino",
+    "unmatched_meals": ["Mystery stew"],
+}
+
+
+def _render(writer, grocery_list=GROCERY_LIST) -> str:
+    return "".join(writer(grocery_list))
+
+
+def test_csv_quotes_delimiters_quotes_and_newlines():
+    rows = list(csv.reader(io.StringIO(_render(iter_csv), newline="")))
+    assert rows == [
+        ["Item", "Quantity", "Estimated Price"],
+        ["Tomatoes, cherry", "2 cups", "3.50"],
+        ['Parmesan "Reggiano"', "100 g", "4.26"],
+        ["Salt & <pepper>", "1 pinch\nor two", "0.00"],
+    ]
+    assert '"Parmesan ""Reggiano"""' in _render(iter_csv)
+
+
+def test_csv_yields_chunks_of_rows(monkeypatch):
+    monkeypatch.setattr(grocery_export, "CHUNK_ROWS", 2)
+    chunks = list(iter_csv(GROCERY_LIST))
+    assert len(chunks) == 2
+    assert chunks[0].startswith("Item,")
+    assert chunks[1].startswith("Salt & <pepper>")
+
+
+def test_text():
+    text = _render(iter_text)
+    assert text.startswith("Your Grocery List:\n\n- Tomatoes, cherry: 2 cups\n")
+    assert "\nTotal Estimated Cost: $7.76\n" in text
+    assert text.endswith("\nSwap <parmesan> for pecorino\n")
+
+
+def test_jsonl_has_one_object_per_item_and_a_summary():
+    lines = [json.loads(line) for line in _render(iter_jsonl).splitlines()]
+    assert lines[:3] == GROCERY_LIST["items"]
+    assert lines[3] == {
+        "total_estimated_cost": 7.756,
+        "budget_optimization": {"savings": 1.2},
+        "unmatched_meals": ["Mystery stew"],
+    }
+
+
+def test_html_escapes_user_text():
+    page = _render(iter_html)
+    assert "<td>Salt &amp; &lt;pepper&gt;</td>" in page
+    assert "<td>Parmesan &quot;Reggiano&quot;</td>" in page
+    assert "<p>Swap &lt;parmesan&gt; for pecorino</p>" in page
+    assert "<pepper>" not in page
+    assert "$7.76" in page
+    assert page.endswith("</body></html>\n")
+
+
+def test_stream_export_caches_the_complete_export():
+    key = ("test", "csv")
+
+    async def collect():
+        return [chunk async for chunk in stream_export(GROCERY_LIST, "csv", key)]
+
+    chunks = asyncio.run(collect())
+    assert b"".join(chunks).decode("utf-8") == _render(iter_csv)
+    assert get_cached_export(key) == chunks
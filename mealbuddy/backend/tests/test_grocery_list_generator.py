@@ -0,0 +1,90 @@
+import pytest
+
+from app.services.grocery_list_generator import build_grocery_list
+from app.services.recipe_index import IndexedRecipe, RecipeIndex
+
+
+@pytest.fixture
+def index():
+    return RecipeIndex([
+        IndexedRecipe(
+            id=1, title="Chicken Salad", serving_size=2,
+            ingredients=(("chicken breast", "400g"), ("spinach", "1 bag"), ("eggs", "2")),
+            allergens=frozenset(),
+        ),
+        IndexedRecipe(
+            id=2, title="Chicken & Rice", serving_size=4,
+            ingredients=(("chicken breast", "0.8 kg"), ("rice", "2 cups")),
+            allergens=frozenset(), cost_estimate_cents=1200,
+        ),
+    ])
+
+
+def test_aggregates_and_scales_ingredients(index):
+    meal_plan = {
+        "monday": {"lunch": "Chicken Salad", "dinner": "Chicken & Rice"},
+        "tuesday": {"lunch": "chicken salad", "dinner": "Mystery Stew"},
+        "is_structured": True,
+    }
+
+    grocery_list = build_grocery_list(meal_plan, index, household_size=2)
+    items = {item["item"]: item for item in grocery_list["items"]}
+
+    # 2 x 400g (two salads for two people) + 400g (half a batch of chicken & rice)
+    assert items["chicken breast"]["amount"] == 1200
+    assert items["chicken breast"]["quantity"] == "1.20 kg"
+    assert items["chicken breast"]["estimated_price"] == 15.0
+    assert items["eggs"]["amount"] == 4
+    assert items["spinach"]["quantity"] == "570g"  # two 285g bags
+    assert grocery_list["unmatched_meals"] == ["Mystery Stew"]
+    assert grocery_list["total_estimated_cost"] == pytest.approx(
+        sum(item["estimated_price"] for item in grocery_list["items"])
+    )
+
+
+def test_subtracts_pantry(index):
+    meal_plan = {"monday": {"lunch": "Chicken Salad"}, "is_structured": True}
+    pantry = [{"item": "Chicken Breast", "quantity": "1 kg"}, {"item": "eggs", "quantity": "1"}]
+
+    grocery_list = build_grocery_list(meal_plan, index, pantry, household_size=2)
+    items = {item["item"]: item for item in grocery_list["items"]}
+
+    assert "chicken breast" not in items
+    assert items["eggs"]["amount"] == 1
+
+
+def test_unstructured_plan_yields_empty_list(index):
+    grocery_list = build_grocery_list({"unstructured_plan_text": "...", "is_structured": False}, index)
+    assert grocery_list["items"] == []
+    assert grocery_list["total_estimated_cost"] == 0
+
+
+def test_budget_optimizer_suggests_substitutions():
+    index = RecipeIndex([
+        IndexedRecipe(
+            id=1, title="Salmon Bowl", serving_size=1,
+            ingredients=(("salmon fillets", "300g"), ("quinoa", "150g"), ("spinach", "1 bag")),
+            allergens=frozenset({"fish"}),
+        ),
+    ])
+    meal_plan = {day: {"dinner": "Salmon Bowl"} for day in ("monday", "tuesday", "wednesday")}
+    meal_plan["is_structured"] = True
+
+    grocery_list = build_grocery_list(meal_plan, index, weekly_budget_cents=3500)
+    budget = grocery_list["budget_optimization"]
+
+    # $38.40 of groceries: swapping quinoa for brown rice is the closest way to save $3.40
+    assert grocery_list["total_estimated_cost"] == 38.4
+    assert [(s["item"], s["substitute"]) for s in budget["substitutions"]] == [("quinoa", "brown rice")]
+    assert budget["within_budget"]
+    assert budget["optimized_total"] == pytest.approx(38.4 - budget["substitutions"][0]["savings"])
+
+    # Disliked substitutes are never suggested
+    disliked = build_grocery_list(meal_plan, index, weekly_budget_cents=3500, disliked_ingredients=["Brown Rice"])
+    substitutes = {s["substitute"] for s in disliked["budget_optimization"]["substitutions"]}
+    assert "brown rice" not in substitutes
+    assert disliked["budget_optimization"]["within_budget"]
+
+    roomy = build_grocery_list(meal_plan, index, weekly_budget_cents=100_00)
+    assert roomy["budget_optimization"]["substitutions"] == []
+    assert roomy["budget_optimization"]["within_budget"]
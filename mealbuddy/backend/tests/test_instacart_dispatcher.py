@@ -0,0 +1,163 @@
+from datetime import datetime, timedelta, timezone
+
+import httpx
+import pytest
+
+from app.models.instacart_order import InstacartOrder, InstacartOrderStatus
+from app.services.instacart_service import InstacartClient, InstacartDispatcher, default_idempotency_key
+from app.services.instacart_stub import create_stub_app
+
+
+def make_dispatcher(stub):
+    http = httpx.AsyncClient(transport=httpx.ASGITransport(app=stub), base_url="http://instacart.test")
+    return InstacartDispatcher(session_factory=None, client=InstacartClient(http))
+
+
+def make_order(key, items, attempts=1):
+    return InstacartOrder(
+        id=1, user_id=1, idempotency_key=key, status=InstacartOrderStatus.SUBMITTING,
+        status_history=[], items=items, attempts=attempts,
+    )
+
+
+ITEMS = [
+    {"item": "eggs", "quantity": "12", "amount": 12, "unit": "each"},
+    {"item": "dragon fruit", "quantity": "2", "amount": 2, "unit": "each"},
+]
+
+
+@pytest.mark.asyncio
+async def test_places_order_and_reports_unavailable_items():
+    dispatcher = make_dispatcher(create_stub_app())
+    order = make_order("key-1", ITEMS)
+
+    await dispatcher.process_batch([order])
+
+    assert order.status == InstacartOrderStatus.PLACED
+    assert order.instacart_order_id
+    assert order.total_cost_cents == 450  # one dozen eggs
+    assert order.next_attempt_at is None
+    assert "dragon fruit" in order.status_history[-1]["detail"]
+
+
+@pytest.mark.asyncio
+async def test_transient_failure_is_retried_with_the_same_idempotency_key():
+    stub = create_stub_app(fail_first_orders=1)
+    dispatcher = make_dispatcher(stub)
+    order = make_order("key-2", ITEMS)
+
+    await dispatcher.process_batch([order])
+    assert order.status == InstacartOrderStatus.RETRYING
+    assert order.next_attempt_at is not None
+    assert "503" in order.last_error
+
+    order.attempts += 1
+    await dispatcher.process_batch([order])
+    first_id = order.instacart_order_id
+    assert order.status == InstacartOrderStatus.PLACED
+
+    # A resend after a lost response gets the original order back
+    duplicate = make_order("key-2", ITEMS, attempts=3)
+    await dispatcher.process_batch([duplicate])
+    assert duplicate.instacart_order_id == first_id
+    assert [h["status"] for h in order.status_history] == ["retrying", "placed"]
+
+
+@pytest.mark.asyncio
+async def test_gives_up_after_max_attempts(monkeypatch):
+    monkeypatch.setattr("app.services.instacart_service.settings.INSTACART_MAX_ATTEMPTS", 2)
+    dispatcher = make_dispatcher(create_stub_app(fail_first_orders=5))
+    order = make_order("key-3", ITEMS, attempts=2)
+
+    await dispatcher.process_batch([order])
+
+    assert order.status == InstacartOrderStatus.FAILED
+    assert order.next_attempt_at is None
+
+
+def scripted_dispatcher(order_responses):
+    """Dispatcher whose Instacart answers each order by its idempotency key"""
+    async def handler(request):
+        if request.url.path == "/v1/products/lookup":
+            return httpx.Response(200, json={"matches": [{"query": "eggs", "product_id": "p-eggs"}]})
+        return order_responses[request.headers["idempotency-key"]]
+
+    http = httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://instacart.test")
+    return InstacartDispatcher(session_factory=None, client=InstacartClient(http))
+
+
+@pytest.mark.asyncio
+async def test_unreadable_responses_are_retried_without_losing_other_orders():
+    dispatcher = scripted_dispatcher({
+        "good": httpx.Response(200, json={"order_id": "ic-1", "total_cents": 450}),
+        "garbled": httpx.Response(200, text="<html>Bad gateway</html>"),
+        "malformed": httpx.Response(200, json={"total_cents": "lots"}),
+    })
+    orders = [make_order(key, ITEMS[:1]) for key in ("good", "garbled", "malformed")]
+    # A bug while building the request only affects its own order
+    broken = make_order("broken", [{"item": "eggs"}])
+
+    await dispatcher.process_batch([*orders, broken])
+
+    good, garbled, malformed = orders
+    assert broken.status == InstacartOrderStatus.RETRYING
+    assert "KeyError" in broken.last_error
+    assert good.status == InstacartOrderStatus.PLACED
+    assert good.instacart_order_id == "ic-1" and good.total_cost_cents == 450
+    for order in (garbled, malformed):
+        assert order.status == InstacartOrderStatus.RETRYING
+        assert order.next_attempt_at is not None
+    assert "Invalid JSON" in garbled.last_error
+    assert "Malformed order response" in malformed.last_error
+
+
+class ClaimSession:
+    """Stands in for the dispatcher's session: the claim query returns `orders`"""
+
+    def __init__(self, orders):
+        self.orders = orders
+        self.commits = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def execute(self, statement):
+        orders = self.orders
+
+        class Result:
+            def scalars(self):
+                return orders
+        return Result()
+
+    async def commit(self):
+        self.commits += 1
+
+
+@pytest.mark.asyncio
+async def test_orders_out_of_attempts_fail_instead_of_being_resent(monkeypatch):
+    monkeypatch.setattr("app.services.instacart_service.settings.INSTACART_MAX_ATTEMPTS", 3)
+    dispatcher = scripted_dispatcher({"fresh": httpx.Response(200, json={"order_id": "ic-2"})})
+    # A lease that expired on the last attempt, and an order with attempts left
+    stuck = make_order("stuck", ITEMS[:1], attempts=3)
+    fresh = make_order("fresh", ITEMS[:1], attempts=0)
+    session = ClaimSession([stuck, fresh])
+    dispatcher._session_factory = lambda: session
+
+    assert await dispatcher.dispatch_due_orders() == 2
+
+    assert stuck.status == InstacartOrderStatus.FAILED
+    assert stuck.attempts == 3 and stuck.next_attempt_at is None
+    assert fresh.status == InstacartOrderStatus.PLACED and fresh.attempts == 1
+    assert session.commits == 2
+
+
+def test_derived_key_dedupes_a_list_only_within_the_window():
+    now = datetime(2026, 10, 19, 12, 0, 5, tzinfo=timezone.utc)
+    key = default_idempotency_key(1, ITEMS, now)
+    assert default_idempotency_key(1, ITEMS, now + timedelta(minutes=30)) == key
+    assert default_idempotency_key(1, ITEMS, now + timedelta(days=7)) != key
+    assert default_idempotency_key(2, ITEMS, now) != key
+    assert default_idempotency_key(1, ITEMS[:1], now) != key
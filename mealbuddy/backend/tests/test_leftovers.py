@@ -0,0 +1,89 @@
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.models.meal_plan import MealPlanEntry
+from app.services.meal_planner.leftovers import estimate_leftovers, rank_leftover_recipes
+from app.services.recipe_index import IndexedRecipe, RecipeIndex
+
+TODAY = date(2026, 10, 19)
+LOGGED = datetime(2026, 10, 18, 20, tzinfo=timezone.utc)
+
+
+def recipe(id, title, serving_size, *ingredients, allergens=()):
+    return IndexedRecipe(
+        id=id, title=title, serving_size=serving_size,
+        ingredients=tuple((name, "1") for name in ingredients), allergens=frozenset(allergens),
+    )
+
+
+@pytest.fixture
+def index():
+    return RecipeIndex([
+        recipe(1, "Roast Chicken", 4, "chicken", "potatoes", "rosemary"),
+        recipe(2, "Lentil Soup", 6, "lentils", "carrots", "onion"),
+        recipe(3, "Chicken Hash", 2, "chicken", "potatoes", "eggs", allergens=["eggs"]),
+        recipe(4, "Carrot Salad", 2, "carrots", "raisins"),
+        recipe(5, "Pancakes", 4, "flour", "eggs", "milk"),
+    ])
+
+
+def entry(day, meal_type, recipe_name, recipe_id=None, servings=None, logged_at=None):
+    return MealPlanEntry(
+        user_id=1, date=date(2026, 10, day), meal_type=meal_type, recipe_id=recipe_id,
+        recipe_name=recipe_name, servings=servings, logged_at=logged_at,
+    )
+
+
+def test_estimates_leftovers_from_eaten_meals(index):
+    entries = [
+        # Half a batch left two days ago
+        entry(17, "dinner", "Roast Chicken", recipe_id=1, servings=2, logged_at=LOGGED),
+        # Planned but replaced by the logged pancakes, which were all eaten
+        entry(18, "lunch", "Lentil Soup", recipe_id=2, servings=2),
+        entry(18, "lunch", "Pancakes", recipe_id=5, servings=4, logged_at=LOGGED),
+        # Planned and not logged, resolved by title: five of six portions left yesterday
+        entry(18, "dinner", "lentil soup", servings=1),
+        # Not eaten yet, and not in the catalog
+        entry(19, "dinner", "Carrot Salad", recipe_id=4, servings=1),
+        entry(17, "lunch", "Mystery Stew", servings=1, logged_at=LOGGED),
+    ]
+
+    leftovers = estimate_leftovers(entries, index, household_size=2, today=TODAY)
+
+    assert leftovers == pytest.approx({
+        "chicken": 1.0, "potatoes": 1.0, "rosemary": 1.0,  # 2/4 spare x (1 + 0.5 x 2 days)
+        "lentils": 1.25, "carrots": 1.25, "onion": 1.25,  # 5/6 spare x (1 + 0.5 x 1 day)
+    })
+
+
+def test_missing_servings_use_the_household_size(index):
+    entries = [entry(18, "dinner", "Lentil Soup", recipe_id=2, logged_at=LOGGED)]
+    assert estimate_leftovers(entries, index, household_size=6, today=TODAY) == {}
+    assert estimate_leftovers(entries, index, household_size=3, today=TODAY)["lentils"] == pytest.approx(0.75)
+
+
+LEFTOVERS = {"chicken": 1.0, "potatoes": 1.0, "rosemary": 1.0, "lentils": 1.25, "carrots": 1.25, "onion": 1.25}
+
+
+def test_ranks_recipes_by_leftover_weight_used(index):
+    # Chicken Hash: 2 x (0.5 + 2/3 coverage); Carrot Salad: 1.25 x (0.5 + 1/2)
+    assert rank_leftover_recipes(LEFTOVERS, index, exclude_recipe_ids=[1, 2]) == ["Chicken Hash", "Carrot Salad"]
+    assert rank_leftover_recipes(LEFTOVERS, index, exclude_recipe_ids=[1, 2], limit=1) == ["Chicken Hash"]
+    assert rank_leftover_recipes({"flour": 1.0}, index) == ["Pancakes"]
+    assert rank_leftover_recipes({"saffron": 1.0}, index) == []
+
+
+def test_skips_allergens_and_disliked_ingredients(index):
+    assert rank_leftover_recipes(
+        LEFTOVERS, index, exclude_recipe_ids=[1, 2], allergies=["Eggs"], disliked_ingredients=[" Raisins "],
+    ) == []
+
+
+def test_staples_do_not_match(index):
+    salty = RecipeIndex([
+        *index.by_id.values(),
+        *(recipe(100 + i, f"Salted dish {i}", 2, "salt", f"garnish {i}") for i in range(60)),
+    ])
+    assert rank_leftover_recipes({"salt": 10.0}, salty) == []
+    assert rank_leftover_recipes({"salt": 10.0, "garnish 7": 0.1}, salty) == ["Salted dish 7"]
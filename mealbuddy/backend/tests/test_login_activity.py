@@ -0,0 +1,48 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.user import User
+from app.services.login_activity import LoginActivityRecorder, build_flush_statement
+
+
+class FailingSession:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def execute(self, statement):
+        raise ConnectionError("database unavailable")
+
+
+def test_logins_are_merged_per_user_into_one_update():
+    recorder = LoginActivityRecorder()
+    first = datetime(2026, 10, 19, 8, tzinfo=timezone.utc)
+    alice = User(id=1, email="alice@example.com")
+    recorder.record(alice, first)
+    recorder.record(alice, first + timedelta(hours=1))
+    recorder.record(User(id=2, email="bob@example.com"), first)
+
+    assert len(recorder) == 2
+    sql = str(build_flush_statement(recorder._pending).compile(dialect=postgresql.dialect()))
+    assert sql.startswith("UPDATE users SET")
+    assert "FROM (VALUES" in sql
+    assert recorder._pending[1].count == 2
+    assert recorder._pending[1].last_login == first + timedelta(hours=1)
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_logins_for_the_next_attempt():
+    recorder = LoginActivityRecorder()
+    recorder._session_factory = FailingSession
+    recorder.record(User(id=1, email="alice@example.com"))
+
+    with pytest.raises(ConnectionError):
+        await recorder.flush()
+    recorder.record(User(id=1, email="alice@example.com"))
+
+    assert len(recorder) == 1
+    assert recorder._pending[1].count == 2
@@ -0,0 +1,53 @@
+import base64
+import json
+
+import pytest
+
+from app.core.pagination import decode_cursor, encode_cursor
+from app.services.recipe_search import decode_search_cursor
+
+
+def raw_cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("2026-10-19T07:00:00+00:00", 42)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, 2) == ("2026-10-19T07:00:00+00:00", 42)
+    assert decode_cursor(encode_cursor(0.125, 7), 2) == (0.125, 7)
+
+
+@pytest.mark.parametrize("cursor", [
+    "",
+    "not base64!",
+    base64.urlsafe_b64encode(b"\xff\xfe").decode("ascii"),
+    raw_cursor({"id": 1}),
+    raw_cursor([1]),
+    raw_cursor([1, 2, 3]),
+])
+def test_malformed_cursors_raise_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, 2)
+
+
+def test_search_cursor_types():
+    assert decode_search_cursor(encode_cursor(0.5, 10), ranked=True) == (0.5, 10)
+    assert decode_search_cursor(encode_cursor(1, 10), ranked=True) == (1.0, 10)
+    assert decode_search_cursor(encode_cursor(10), ranked=False) == (10,)
+
+
+@pytest.mark.parametrize("values, ranked", [
+    (["0.5", 10], True),
+    ([None, 10], True),
+    ([0.5, "10"], True),
+    ([0.5, 10.5], True),
+    ([True, 10], True),
+    ([0.5, {"id": 10}], True),
+    (["10"], False),
+    ([False], False),
+    ([0.5, 10], False),
+])
+def test_search_cursor_rejects_wrong_types(values, ranked):
+    with pytest.raises(ValueError):
+        decode_search_cursor(raw_cursor(values), ranked=ranked)
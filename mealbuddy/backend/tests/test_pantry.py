@@ -0,0 +1,32 @@
+import asyncio
+
+from app.models.user import User
+from app.repositories.pantry import get_pantry, set_pantry
+
+
+class RecordingSession:
+    def __init__(self):
+        self.calls = []
+
+    def add(self, obj):
+        self.calls.append(("add", obj))
+
+    async def commit(self):
+        self.calls.append(("commit",))
+
+    async def refresh(self, obj):
+        self.calls.append(("refresh", obj))
+
+
+def test_pantry_round_trip():
+    user = User(id=1, email="cook@example.com")
+    assert get_pantry(user) == []
+
+    db = RecordingSession()
+    inventory = [{"item": "rice", "quantity": "2 kg"}, {"item": "eggs", "quantity": "6"}]
+    assert asyncio.run(set_pantry(db, user, inventory)) == inventory
+    assert get_pantry(user) == inventory
+    assert db.calls == [("add", user), ("commit",), ("refresh", user)]
+
+    assert asyncio.run(set_pantry(db, user, [])) == []
+    assert get_pantry(user) == []
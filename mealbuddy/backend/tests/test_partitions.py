@@ -0,0 +1,61 @@
+import asyncio
+from datetime import date, datetime, timezone
+
+from app.db.partitions import add_months, ensure_partitions, partition_month, partition_name
+from app.repositories.feedback import list_feedback
+
+
+class RecordingConnection:
+    def __init__(self, existing):
+        self.existing = existing
+        self.statements = []
+
+    async def execute(self, statement, params=None):
+        if params is not None:
+            table = params["table"]
+            rows = [name for name in self.existing if name.startswith(table)]
+
+            class Result:
+                def scalars(self):
+                    return rows
+            return Result()
+        self.statements.append(str(statement))
+
+
+def test_month_arithmetic_and_names():
+    assert add_months(date(2026, 11, 1), 2) == date(2027, 1, 1)
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1)
+    name = partition_name("user_weight_log", date(2026, 3, 1))
+    assert name == "user_weight_log_p2026_03"
+    assert partition_month("user_weight_log", name) == date(2026, 3, 1)
+    assert partition_month("user_weight_log", "user_weight_log_default") is None
+
+
+def test_ensure_partitions_creates_only_missing_months():
+    this_month = datetime.now(timezone.utc).date().replace(day=1)
+    conn = RecordingConnection({
+        "user_weight_log_default",
+        partition_name("user_weight_log", this_month),
+        "recipe_feedback_default",
+    })
+    created = asyncio.run(ensure_partitions(conn, months_ahead=2))
+    assert partition_name("user_weight_log", this_month) not in created
+    assert len([name for name in created if name.startswith("user_weight_log")]) == 2
+    assert len([name for name in created if name.startswith("recipe_feedback")]) == 3
+    assert all("00:00+00" in statement for statement in conn.statements)
+
+
+def test_feedback_is_listed_by_partition_key():
+    class Session:
+        async def execute(self, statement):
+            self.statement = statement
+
+            class Result:
+                def scalars(self):
+                    return []
+            return Result()
+
+    session = Session()
+    asyncio.run(list_feedback(session, 7))
+    sql = str(session.statement)
+    assert sql.endswith("ORDER BY recipe_feedback.created_at DESC, recipe_feedback.id DESC")
@@ -0,0 +1,42 @@
+import pytest
+
+from app.services.price_catalog import PriceCatalog, ingest_observations
+
+
+def rows(day_prices, ingredient="chicken breast", region="north", quantity="1 kg"):
+    return [
+        {"ingredient": ingredient, "region": region, "date": f"2026-{month:02d}-{day:02d}", "price": price, "quantity": quantity}
+        for (month, day), price in day_prices
+    ]
+
+
+def test_ingest_current_price_and_trend(tmp_path):
+    # Chicken breast climbs from $10/kg to $12/kg over two months
+    history = [((7 + (d // 30), d % 30 + 1), 10 + 2 * d / 59) for d in range(60)]
+    stats = ingest_observations(
+        rows(history) + rows([((8, 28), 9.0)], region="south") + [{"ingredient": "eggs", "price": "oops"}],
+        tmp_path,
+    )
+    assert stats["ingested"] == 61
+    assert stats["skipped"] == 1
+
+    catalog = PriceCatalog(tmp_path / (tmp_path / "CURRENT").read_text())
+    assert catalog.current_price("chicken breast", "g", "north") == pytest.approx(0.0118, rel=0.02)
+    assert catalog.current_price("Chicken Breast", "g", "south") == pytest.approx(0.009)
+    # Unknown regions fall back to the national series
+    assert catalog.current_price("chicken breast", "g", "east") is not None
+    assert catalog.current_price("tofu", "g") is None
+
+    trend = catalog.price_trend("chicken breast", "g", "north", 90)
+    assert trend["observations"] == 60
+    assert trend["change_pct"] > 15
+    assert trend["slope_pct_per_30_days"] > 0
+
+
+def test_reingesting_the_same_dump_is_idempotent(tmp_path):
+    dump = rows([((7, 1), 10.0), ((7, 2), 11.0)])
+    ingest_observations(dump, tmp_path)
+    stats = ingest_observations(dump, tmp_path)
+    # Two observations, each in the regional and the national series
+    assert stats["observations"] == 4
+    assert len([p for p in tmp_path.iterdir() if p.is_dir()]) == 2
@@ -0,0 +1,66 @@
+import asyncio
+
+from app.db import routing
+from app.models.user import User
+from app.services import principal_cache
+from app.services.principal_cache import PrincipalCache
+
+
+def _user(email: str) -> User:
+    return User(id=1, email=email, hashed_password="x", is_active=True)
+
+
+def test_lru_eviction_and_hit_rate():
+    cache = PrincipalCache(ttl_seconds=60, max_entries=2)
+    for email in ("a@x.io", "b@x.io"):
+        cache.put(email, _user(email))
+    assert cache.get("a@x.io")["email"] == "a@x.io"  # a becomes most recent
+    cache.put("c@x.io", _user("c@x.io"))
+
+    assert cache.get("b@x.io") is None
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["evictions"] == 1
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_rate"] == 0.5
+
+
+def test_expired_and_invalidated_entries_miss():
+    cache = PrincipalCache(ttl_seconds=-1, max_entries=10)
+    cache.put("a@x.io", _user("a@x.io"))
+    assert cache.get("a@x.io") is None
+
+    cache.ttl_seconds = 60
+    cache.put("a@x.io", _user("a@x.io"))
+    cache.invalidate("a@x.io")
+    assert cache.get("a@x.io") is None
+    assert cache.stats()["invalidations"] == 1
+
+
+class _Result:
+    def __init__(self, user):
+        self.user = user
+
+    def scalar_one_or_none(self):
+        return self.user
+
+
+class _Session:
+    def __init__(self, bind, user):
+        self.bind = bind
+        self.user = user
+
+    async def execute(self, statement):
+        return _Result(self.user)
+
+
+def test_users_loaded_from_the_replica_are_not_cached(monkeypatch):
+    replica = object()
+    monkeypatch.setattr(routing, "replica_engine", replica)
+    cache = PrincipalCache(ttl_seconds=60, max_entries=10)
+    monkeypatch.setattr(principal_cache, "principal_cache", cache)
+
+    user = asyncio.run(principal_cache.get_user_by_subject(_Session(replica, _user("a@x.io")), "a@x.io"))
+    assert user.email == "a@x.io"
+    assert cache.get("a@x.io") is None
+
+    asyncio.run(principal_cache.get_user_by_subject(_Session(object(), _user("a@x.io")), "a@x.io"))
+    assert cache.get("a@x.io")["email"] == "a@x.io"
@@ -0,0 +1,88 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.core.rate_limit import InMemoryTokenBuckets, RateLimitMiddleware, parse_route_limit
+from app.core.security import create_access_token
+
+
+def test_bucket_refills_continuously():
+    buckets = InMemoryTokenBuckets()
+    rate = parse_route_limit("user:2/minute").user
+
+    assert buckets.take("k", rate, now=0.0) == 0
+    assert buckets.take("k", rate, now=0.0) == 0
+    assert buckets.take("k", rate, now=0.0) == pytest.approx(30.0)
+    assert buckets.take("k", rate, now=30.0) == 0
+
+
+def test_rejected_requests_take_no_tokens():
+    buckets = InMemoryTokenBuckets()
+    limit = parse_route_limit("user:1/minute, ip:2/minute")
+    alice, bob, carol = (("user:" + name, limit.user) for name in ("alice", "bob", "carol"))
+    ip = ("ip:10.0.0.1", limit.ip)
+
+    assert buckets.take_all([alice, ip], now=0.0) == 0
+    # Alice is over her limit; the shared IP keeps its token
+    assert buckets.take_all([alice, ip], now=0.0) == pytest.approx(60.0)
+    assert buckets.take_all([bob, ip], now=0.0) == 0
+    # Now the IP is over its limit; Carol keeps her token
+    assert buckets.take_all([carol, ip], now=0.0) == pytest.approx(30.0)
+    assert buckets.take_all([carol], now=0.0) == 0
+
+
+@pytest.mark.asyncio
+async def test_limits_each_user_separately_and_sets_retry_after():
+    api = FastAPI()
+
+    @api.post("/api/v1/users/recipes/match")
+    async def match():
+        return {"ok": True}
+
+    @api.get("/api/v1/users/recipes/search")
+    async def search():
+        return {"ok": True}
+
+    limits = {"POST /users/recipes/match": parse_route_limit("user:2/minute, ip:100/minute")}
+    app = RateLimitMiddleware(api, limits=limits, backend=InMemoryTokenBuckets())
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        alice = {"Authorization": f"Bearer {create_access_token({'sub': 'alice@example.com'})}"}
+        statuses = [(await client.post("/api/v1/users/recipes/match", headers=alice)).status_code for _ in range(3)]
+        # A refreshed token is the same user
+        refreshed = {"Authorization": f"Bearer {create_access_token({'sub': 'alice@example.com', 'n': 2})}"}
+        rejected = await client.post("/api/v1/users/recipes/match", headers=refreshed)
+        bob_token = create_access_token({"sub": "bob@example.com"})
+        bob = await client.post("/api/v1/users/recipes/match", headers={"Authorization": f"Bearer {bob_token}"})
+        unlimited = await client.get("/api/v1/users/recipes/search", headers=alice)
+
+    assert statuses == [200, 200, 429]
+    assert rejected.status_code == 429 and int(rejected.headers["retry-after"]) >= 1
+    assert bob.status_code == 200
+    assert unlimited.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_unverified_tokens_only_count_against_the_ip():
+    api = FastAPI()
+
+    @api.post("/api/v1/users/recipes/match")
+    async def match():
+        return {"ok": True}
+
+    limits = {"POST /users/recipes/match": parse_route_limit("user:1/minute, ip:3/minute")}
+    app = RateLimitMiddleware(api, limits=limits, backend=InMemoryTokenBuckets())
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        forged = {"Authorization": "Bearer not-a-jwt"}
+        statuses = [(await client.post("/api/v1/users/recipes/match", headers=forged)).status_code for _ in range(4)]
+
+    assert statuses == [200, 200, 200, 429]
+
+
+def test_cors_headers_wrap_rate_limited_responses():
+    from fastapi.middleware.cors import CORSMiddleware
+
+    from app.main import app
+
+    # user_middleware lists the outermost middleware first
+    stack = [middleware.cls for middleware in app.user_middleware]
+    assert stack.index(CORSMiddleware) < stack.index(RateLimitMiddleware)
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.models.recipe_rating_stats import RecipeRatingStats
+from app.repositories.rating_stats import _bayesian_average, change_rating, record_rating
+from app.schemas.recipe_feedback import RecipeFeedbackUpdate
+
+
+class RecordingSession:
+    def __init__(self):
+        self.statements = []
+
+    async def execute(self, stmt):
+        self.statements.append(stmt)
+
+
+def test_bayesian_average_shrinks_few_ratings_towards_the_prior():
+    prior = settings.RATING_PRIOR_MEAN
+    assert _bayesian_average(0, 0) == pytest.approx(prior)
+    few_perfect = _bayesian_average(2, 10)
+    many_good = _bayesian_average(200, 900)
+    assert prior < few_perfect < many_good < 4.5
+
+
+def test_rating_deltas():
+    db = RecordingSession()
+    asyncio.run(record_rating(db, "soup", 4))
+    asyncio.run(change_rating(db, "soup", 4, 2))
+    asyncio.run(change_rating(db, "soup", 2, 2))  # Unchanged: no write
+    inserted, changed = [stmt.compile().params for stmt in db.statements]
+    assert (inserted["rating_count"], inserted["rating_sum"], inserted["rating_sum_squares"]) == (1, 4, 16)
+    assert (changed["rating_count"], changed["rating_sum"], changed["rating_sum_squares"]) == (0, -2, -12)
+
+
+def test_stats_properties():
+    stats = RecipeRatingStats(rating_count=4, rating_sum=14, rating_sum_squares=52, bayesian_average=3.6)
+    assert stats.average_rating == 3.5
+    assert stats.rating_stddev == pytest.approx(0.866, abs=1e-3)
+
+
+def test_feedback_update_rejects_a_null_rating():
+    assert RecipeFeedbackUpdate(comment=None).dict(exclude_unset=True) == {"comment": None}
+    assert RecipeFeedbackUpdate(rating=2).rating == 2
+    with pytest.raises(ValidationError):
+        RecipeFeedbackUpdate(rating=None)
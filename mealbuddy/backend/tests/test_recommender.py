@@ -0,0 +1,34 @@
+from app.services.recommender import Recommender, train_recommender
+
+
+def ratings():
+    # Two taste groups: users 1-6 love curries, users 11-16 love salads
+    rows = []
+    for user in range(1, 7):
+        rows += [(user, "chicken curry", 5), (user, "dal", 5), (user, "caesar salad", 1)]
+    for user in range(11, 17):
+        rows += [(user, "caesar salad", 5), (user, "greek salad", 5), (user, "dal", 1)]
+    rows.remove((6, "dal", 5))
+    rows.remove((16, "greek salad", 5))
+    rows.append((6, "chicken curry", 4))  # Re-rated: the last rating counts
+    return rows
+
+
+def test_recommends_what_similar_users_liked(tmp_path):
+    stats = train_recommender(ratings(), tmp_path, factors=4, iterations=10)
+    assert stats["ratings"] == 34
+    model = Recommender(tmp_path / (tmp_path / "CURRENT").read_text())
+
+    curry_fan = model.recommend(6, limit=5)
+    assert curry_fan[0][0] == "dal"
+    assert {name for name, _ in curry_fan} == {"dal", "greek salad"}  # Rated recipes are left out
+    assert dict(curry_fan)["dal"] > dict(curry_fan)["greek salad"]
+
+    salad_fan = model.recommend(16, limit=5)
+    assert salad_fan[0][0] == "greek salad"
+
+    # Candidates restrict scoring; unknown names are skipped
+    assert [name for name, _ in model.recommend(6, candidates=["greek salad", "tofu"])] == ["greek salad"]
+    # Unknown users get recipes ranked by their bias
+    assert len(model.recommend(999, limit=10)) == 4
+    assert all(1 <= rating <= 5 for _, rating in model.recommend(6, include_rated=True))
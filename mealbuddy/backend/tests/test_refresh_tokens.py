@@ -0,0 +1,36 @@
+from datetime import datetime, timezone
+
+from fastapi import status
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.main import app
+from app.models.user import RefreshToken, User
+from app.services.refresh_tokens import hash_refresh_token, issue_refresh_token
+
+
+class CollectingSession:
+    def __init__(self):
+        self.added = []
+
+    def add(self, obj):
+        self.added.append(obj)
+
+
+def test_only_the_token_hash_is_stored():
+    db = CollectingSession()
+    token = issue_refresh_token(db, User(id=7, email="a@example.com"))
+    successor = issue_refresh_token(db, User(id=7, email="a@example.com"), family_id=db.added[0].family_id)
+
+    first, second = db.added
+    assert isinstance(first, RefreshToken)
+    assert first.token_hash == hash_refresh_token(token) != token
+    assert second.token_hash == hash_refresh_token(successor)
+    assert second.family_id == first.family_id
+    assert first.expires_at > datetime.now(timezone.utc)
+
+
+def test_refresh_requires_a_refresh_token_not_an_access_token():
+    response = TestClient(app).post(f"{settings.API_V1_STR}/auth/refresh-token")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+    assert response.json()["detail"] == "Refresh token missing"
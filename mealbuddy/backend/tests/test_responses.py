@@ -0,0 +1,47 @@
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+from typing import List
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+
+from app.core.responses import FastJSONResponse, FastJSONRoute
+
+
+class Item(BaseModel):
+    name: str
+    logged_at: datetime
+
+
+def make_client() -> TestClient:
+    router = APIRouter(route_class=FastJSONRoute)
+
+    @router.get("/items", response_model=List[Item], response_model_exclude={0: {"logged_at"}})
+    async def items():
+        return [{"name": "a", "logged_at": datetime(2026, 1, 1, tzinfo=timezone.utc)}]
+
+    @router.get("/plan")
+    async def plan():
+        return {"price": Decimal("1.50"), "tags": {"x"}, "item": Item(name="b", logged_at=datetime(2026, 1, 2)), 3: None}
+
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.include_router(router)
+    return TestClient(app)
+
+
+def test_response_models_are_dumped_straight_to_json():
+    response = make_client().get("/items")
+    assert response.headers["content-type"] == "application/json"
+    assert response.json() == [{"name": "a"}]
+
+
+def test_unmodelled_responses_encode_like_jsonable_encoder():
+    response = make_client().get("/plan")
+    assert json.loads(response.content) == {
+        "price": 1.5,
+        "tags": ["x"],
+        "item": {"name": "b", "logged_at": "2026-01-02T00:00:00"},
+        "3": None,
+    }
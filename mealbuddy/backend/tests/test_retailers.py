@@ -0,0 +1,135 @@
+import httpx
+import pytest
+
+from app.services.retailers.base import PriceRequest, RetailerAdapter, RetailerError, RetailerQuote
+from app.services.retailers.comparison import compare_retailer_prices, price_cache
+from app.services.retailers.fake import FakeRetailerAdapter
+from app.services.retailers.http import HttpRetailerAdapter
+
+
+class FixedPriceRetailer(RetailerAdapter):
+    """Prices keyed by (item, unit); anything else is out of stock"""
+
+    def __init__(self, name, prices, fail=False):
+        self.name = name
+        self.prices = prices
+        self.fail = fail
+        self.calls = 0
+
+    async def quote(self, requests):
+        self.calls += 1
+        if self.fail:
+            raise RetailerError("down")
+        return [RetailerQuote(self.name, r.item, self.prices.get((r.item, r.unit))) for r in requests]
+
+
+@pytest.fixture(autouse=True)
+def empty_price_cache():
+    price_cache.clear()
+    yield
+    price_cache.clear()
+
+
+ITEMS = [
+    {"item": "eggs", "amount": 12, "unit": "each"},
+    {"item": "eggs", "amount": 100, "unit": "g"},
+    {"item": "saffron", "amount": 1, "unit": "g"},
+]
+
+
+def test_adapters_must_implement_quote():
+    with pytest.raises(TypeError):
+        RetailerAdapter()
+
+
+@pytest.mark.asyncio
+async def test_compares_totals_and_splits_by_line():
+    cheap_dozen = FixedPriceRetailer("a", {("eggs", "each"): 4.0, ("eggs", "g"): 1.0})
+    cheap_grams = FixedPriceRetailer("b", {("eggs", "each"): 5.0, ("eggs", "g"): 0.5})
+    partial = FixedPriceRetailer("c", {("eggs", "each"): 3.0})
+    down = FixedPriceRetailer("d", {}, fail=True)
+
+    result = await compare_retailer_prices(ITEMS, [cheap_dozen, cheap_grams, partial, down])
+
+    assert result["retailers"] == [
+        {"retailer": "a", "available": True, "total": 5.0, "missing_items": ["saffron"]},
+        {"retailer": "b", "available": True, "total": 5.5, "missing_items": ["saffron"]},
+        {"retailer": "c", "available": True, "total": 3.0, "missing_items": ["eggs", "saffron"]},
+        {"retailer": "d", "available": False, "total": None, "missing_items": []},
+    ]
+    # c is cheapest but lacks the eggs by weight, which others stock
+    assert result["cheapest_single_retailer"] == "a"
+    split = result["cheapest_split"]
+    assert split["total"] == 3.5
+    assert split["unavailable_items"] == ["saffron"]
+    assert split["baskets"] == [
+        {"retailer": "c", "items": [{"item": "eggs", "amount": 12.0, "unit": "each", "price": 3.0}], "total": 3.0},
+        {"retailer": "b", "items": [{"item": "eggs", "amount": 100.0, "unit": "g", "price": 0.5}], "total": 0.5},
+    ]
+
+
+@pytest.mark.asyncio
+async def test_cached_quotes_are_not_requested_again():
+    retailer = FixedPriceRetailer("a", {("eggs", "each"): 4.0})
+    await compare_retailer_prices(ITEMS[:1], [retailer])
+    result = await compare_retailer_prices(ITEMS, [retailer])
+
+    assert retailer.calls == 2
+    assert result["retailers"][0]["total"] == 4.0
+    await compare_retailer_prices(ITEMS, [retailer])
+    assert retailer.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_fake_retailer_is_deterministic():
+    requests = [PriceRequest("eggs", 12, "each"), PriceRequest("unobtainium", 1, "g")]
+    fake = FakeRetailerAdapter("freshmart", latency=0, out_of_stock_rate=0)
+    quotes = await fake.quote(requests)
+
+    assert quotes == await fake.quote(requests)
+    eggs, unknown = quotes
+    assert eggs.available and 4.5 * 0.85 <= eggs.price <= 4.5 * 1.15
+    assert eggs.product_name == "freshmart eggs"
+    assert not unknown.available
+    everything_out = FakeRetailerAdapter("freshmart", latency=0, out_of_stock_rate=1.0)
+    assert not any(quote.available for quote in await everything_out.quote(requests))
+
+
+def http_adapter(handler):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return HttpRetailerAdapter("shop", "http://shop.test/", client=client)
+
+
+@pytest.mark.asyncio
+async def test_http_retailer_matches_prices_by_position():
+    def handler(request):
+        assert request.url == "http://shop.test/v1/prices"
+        return httpx.Response(200, json={"prices": [
+            {"item": "eggs", "price": "4.20", "product_name": "Dozen eggs"},
+            {"item": "eggs", "price": 0.8},
+            {"item": "saffron", "price": None},
+        ]})
+
+    requests = [PriceRequest(item["item"], item["amount"], item["unit"]) for item in ITEMS]
+    quotes = await http_adapter(handler).quote(requests)
+
+    assert quotes == [
+        RetailerQuote("shop", "eggs", 4.2, "Dozen eggs"),
+        RetailerQuote("shop", "eggs", 0.8, None),
+        RetailerQuote("shop", "saffron", None, None),
+    ]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("response", [
+    httpx.Response(503),
+    httpx.Response(200, text="not json"),
+    httpx.Response(200, json={"quotes": []}),
+    httpx.Response(200, json={"prices": []}),
+    httpx.Response(200, json={"prices": [{"item": "milk", "price": 1}]}),
+    httpx.Response(200, json={"prices": [{"item": "eggs", "price": "cheap"}]}),
+])
+async def test_http_retailer_raises_retailer_error_on_bad_responses(response):
+    adapter = http_adapter(lambda request: response)
+    with pytest.raises(RetailerError):
+        await adapter.quote([PriceRequest("eggs", 12, "each")])
@@ -0,0 +1,49 @@
+import pytest
+
+from app.services.units import (
+    Quantity,
+    UnitConversionError,
+    convert,
+    parse_quantity,
+    to_canonical,
+)
+
+
+@pytest.mark.parametrize("text,expected", [
+    ("1 kg", Quantity(1.0, "kg")),
+    ("500g", Quantity(500.0, "g")),
+    ("1 can", Quantity(1.0, "can")),
+    ("1 dozen", Quantity(1.0, "dozen")),
+    ("2", Quantity(2.0, "each")),
+    ("1 1/2 cups", Quantity(1.5, "cup")),
+    ("½ cup", Quantity(0.5, "cup")),
+    ("3 Tablespoons", Quantity(3.0, "tbsp")),
+    ("1 can (15 oz)", Quantity(1.0, "can")),
+    ("2-3 tins", Quantity(2.0, "can")),
+    ("loaf", Quantity(1.0, "loaf")),
+    ("1/0 cup", Quantity(1.0, "1/0 cup")),
+])
+def test_parse_quantity(text, expected):
+    assert parse_quantity(text) == expected
+
+
+def test_convert_within_dimension():
+    assert convert(1, "kg", "g") == 1000
+    assert convert(3, "tsp", "tbsp") == pytest.approx(1.0)
+    assert convert(1, "dozen", "each") == 12
+
+
+def test_convert_across_dimensions_uses_ingredient_data():
+    assert convert(2, "each", "g", "eggs") == 100
+    assert convert(1, "can", "g", "black beans") == 425
+    assert convert(1, "cup", "g", "flour") == pytest.approx(125.39, rel=1e-3)
+    with pytest.raises(UnitConversionError):
+        convert(1, "cup", "g", "mystery powder")
+
+
+def test_to_canonical_merges_units_per_ingredient():
+    assert to_canonical("eggs", "1 dozen") == Quantity(12.0, "each")
+    assert to_canonical("Eggs", "100g") == Quantity(2.0, "each")
+    assert to_canonical("chicken breast", "1 kg") == Quantity(1000.0, "g")
+    assert to_canonical("spinach", "1 bag") == Quantity(285.0, "g")
+    assert to_canonical("mystery", "1 jar") == Quantity(1.0, "jar")
@@ -0,0 +1,39 @@
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from app.api.v1.endpoints import weight_tracking
+from app.repositories.weight_logs import pick_bucket
+
+
+def at(year, month, day):
+    return datetime(year, month, day, tzinfo=timezone.utc)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("since, until, expected", [
+    (at(2026, 9, 1), at(2026, 10, 1), "day"),
+    (at(2025, 10, 1), at(2026, 10, 1), "week"),
+    (at(2016, 10, 1), at(2026, 10, 1), "month"),
+])
+async def test_picks_the_finest_bucket_within_the_point_cap(since, until, expected):
+    # With both bounds given no query is needed
+    assert await pick_bucket(None, user_id=1, max_points=180, since=since, until=until) == expected
+
+
+@pytest.mark.asyncio
+async def test_summary_takes_bounds_without_an_offset_as_utc(monkeypatch):
+    seen = {}
+
+    async def summarize(db, user_id, bucket, points, since=None, until=None):
+        seen.update(since=since, until=until)
+        return []
+
+    monkeypatch.setattr(weight_tracking, "summarize_weight_logs", summarize)
+    summary = await weight_tracking.get_user_weight_summary(
+        bucket=None, points=180, since=datetime(2026, 9, 1), until=at(2026, 10, 1),
+        db=None, current_user=SimpleNamespace(id=1),
+    )
+    assert summary == {"bucket": "day", "points": []}
+    assert seen == {"since": at(2026, 9, 1), "until": at(2026, 10, 1)}
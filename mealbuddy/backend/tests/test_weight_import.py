@@ -0,0 +1,45 @@
+import asyncio
+from datetime import datetime, timezone
+
+from app.services.weight_import import MAX_ERRORS_REPORTED, parse_readings
+
+
+async def _chunks(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def _parse(data: bytes, fmt: str, chunk_size: int = 7):
+    async def run():
+        report = {}
+        readings = [r async for batch in parse_readings(_chunks(data, chunk_size), fmt, report, batch_size=2) for r in batch]
+        return readings, report
+    return asyncio.run(run())
+
+
+def test_csv_with_units_and_split_chunks():
+    data = (
+        "\ufeffDate,Weight,Unit\r\n"
+        "2026-01-01T07:00:00Z,80.5,kg\r\n"
+        "2026-01-02 07:00:00,176.4,lb\r\n"
+        "\r\n"
+        "2026-01-03T07:00:00+01:00,heavy,kg\r\n"
+        "2026-01-04T07:00:00Z,80,stone\r\n"
+    ).encode("utf-8")
+    readings, report = _parse(data, "csv")
+    assert readings == [
+        (datetime(2026, 1, 1, 7, tzinfo=timezone.utc), 80.5),
+        (datetime(2026, 1, 2, 7, tzinfo=timezone.utc), 80.014),
+    ]
+    assert report["invalid"] == 2
+    assert report["errors"][0].startswith("line 5:")
+
+
+def test_jsonl_epoch_timestamps_and_error_cap():
+    good = b'{"timestamp": 1767254400, "weight_kg": 81.2}\n{"timestamp": 1767340800000, "weight_kg": 81.0}\n'
+    bad = b"not json\n" * (MAX_ERRORS_REPORTED + 5)
+    readings, report = _parse(good + bad + b'["list"]', "jsonl")
+    assert [r.logged_at.day for r in readings] == [1, 2]
+    assert report["invalid"] == MAX_ERRORS_REPORTED + 6
+    assert len(report["errors"]) == MAX_ERRORS_REPORTED
+    assert report["errors"][0] == "line 3: malformed line"